@@ -17,6 +17,14 @@ CONFIG_KEYS = [
     "PIPER_PATH",
     "PIPER_MODEL_PATH",
     "PIPER_VOICES_DIR",
+    "PIPER_POOL_ENABLED",
+    "PIPER_POOL_SIZE",
+    "TTS_BEAT_WORKERS",
+    "TTS_BEAT_GAP_SECONDS",
+    "VOICE_MASTER_IN_RENDER",
+    "TTS_STREAMING",
+    "TTS_CACHE_ENABLED",
+    "TTS_CACHE_MAX_MB",
     "LLM_BACKEND",
     "LLM_MODEL_PATH",
     "LLM_HOOK_MODEL_PATH",
@@ -26,12 +34,47 @@ CONFIG_KEYS = [
     "LLM_MAX_TOKENS",
     "LLM_TEMPERATURE",
     "LLM_N_GPU_LAYERS",
+    "LLM_POOL_MAX_MODELS",
+    "LLM_POOL_MEMORY_GB",
+    "LLM_TORCH_THREADS",
+    "LLM_BATCH_CANDIDATES",
+    "LLM_PREFIX_CACHE_SIZE",
+    "LLM_CONSTRAINED_JSON",
+    "LLM_STREAMING",
+    "LLM_PROGRESS_INTERVAL_SECONDS",
+    "LLM_SESSION_MODE",
+    "LLM_SERVER_ENABLED",
+    "LLM_SERVER_PORT",
+    "LLM_SERVER_BATCH_WINDOW_MS",
+    "LLM_SERVER_TIMEOUT_SECONDS",
+    "LLM_BREAKER_BASE_SECONDS",
+    "LLM_BREAKER_MAX_SECONDS",
+    "LLM_CACHE_ENABLED",
+    "LLM_CACHE_TTL_HOURS",
+    "LLM_CACHE_MAX_ENTRIES",
     "WHISPER_MODEL_SIZE",
     "WHISPER_MODEL_PATH",
     "WHISPER_DEVICE",
     "WHISPER_COMPUTE_TYPE",
+    "WHISPER_CPU_THREADS",
+    "WHISPER_NUM_WORKERS",
+    "WHISPER_PINNED_PROCESS",
+    "CPU_BUDGET_CORES",
+    "CPU_PINNING",
+    "FFMPEG_CPU_THREADS",
+    "WHISPER_IDLE_SECONDS",
+    "WHISPER_PRELOAD",
+    "WHISPER_BATCHING",
+    "WHISPER_BATCH_WINDOW_MS",
+    "WHISPER_BATCH_SIZE",
+    "TRANSCRIPT_CACHE_ENABLED",
+    "TRANSCRIPT_CACHE_MAX_ENTRIES",
     "CAPTION_FONT",
     "CAPTION_FONT_SIZE",
+    "CAPTION_REWRITE_CHUNK_SIZE",
+    "CAPTION_REWRITE_WORKERS",
+    "CAPTION_OVERLAY_ENABLED",
+    "CAPTION_OVERLAY_MAX_ENTRIES",
     "ASSETS_DIR",
     "BG_CLIPS_DIR",
     "FONTS_DIR",
@@ -106,6 +149,14 @@ def _default_for_key(settings, key: str) -> str:
         "PIPER_PATH": settings.PIPER_PATH,
         "PIPER_MODEL_PATH": settings.PIPER_MODEL_PATH,
         "PIPER_VOICES_DIR": settings.PIPER_VOICES_DIR,
+        "PIPER_POOL_ENABLED": "true" if settings.PIPER_POOL_ENABLED else "false",
+        "PIPER_POOL_SIZE": str(settings.PIPER_POOL_SIZE),
+        "TTS_BEAT_WORKERS": str(settings.TTS_BEAT_WORKERS),
+        "TTS_BEAT_GAP_SECONDS": str(settings.TTS_BEAT_GAP_SECONDS),
+        "VOICE_MASTER_IN_RENDER": "true" if settings.VOICE_MASTER_IN_RENDER else "false",
+        "TTS_STREAMING": "true" if settings.TTS_STREAMING else "false",
+        "TTS_CACHE_ENABLED": "true" if settings.TTS_CACHE_ENABLED else "false",
+        "TTS_CACHE_MAX_MB": str(settings.TTS_CACHE_MAX_MB),
         "LLM_BACKEND": settings.LLM_BACKEND,
         "LLM_MODEL_PATH": settings.LLM_MODEL_PATH,
         "LLM_HOOK_MODEL_PATH": settings.LLM_HOOK_MODEL_PATH,
@@ -115,12 +166,47 @@ def _default_for_key(settings, key: str) -> str:
         "LLM_MAX_TOKENS": str(settings.LLM_MAX_TOKENS),
         "LLM_TEMPERATURE": str(settings.LLM_TEMPERATURE),
         "LLM_N_GPU_LAYERS": str(settings.LLM_N_GPU_LAYERS),
+        "LLM_POOL_MAX_MODELS": str(settings.LLM_POOL_MAX_MODELS),
+        "LLM_POOL_MEMORY_GB": str(settings.LLM_POOL_MEMORY_GB),
+        "LLM_TORCH_THREADS": str(settings.LLM_TORCH_THREADS),
+        "LLM_BATCH_CANDIDATES": "true" if settings.LLM_BATCH_CANDIDATES else "false",
+        "LLM_PREFIX_CACHE_SIZE": str(settings.LLM_PREFIX_CACHE_SIZE),
+        "LLM_CONSTRAINED_JSON": "true" if settings.LLM_CONSTRAINED_JSON else "false",
+        "LLM_STREAMING": "true" if settings.LLM_STREAMING else "false",
+        "LLM_PROGRESS_INTERVAL_SECONDS": str(settings.LLM_PROGRESS_INTERVAL_SECONDS),
+        "LLM_SESSION_MODE": "true" if settings.LLM_SESSION_MODE else "false",
+        "LLM_SERVER_ENABLED": "true" if settings.LLM_SERVER_ENABLED else "false",
+        "LLM_SERVER_PORT": str(settings.LLM_SERVER_PORT),
+        "LLM_SERVER_BATCH_WINDOW_MS": str(settings.LLM_SERVER_BATCH_WINDOW_MS),
+        "LLM_SERVER_TIMEOUT_SECONDS": str(settings.LLM_SERVER_TIMEOUT_SECONDS),
+        "LLM_BREAKER_BASE_SECONDS": str(settings.LLM_BREAKER_BASE_SECONDS),
+        "LLM_BREAKER_MAX_SECONDS": str(settings.LLM_BREAKER_MAX_SECONDS),
+        "LLM_CACHE_ENABLED": "true" if settings.LLM_CACHE_ENABLED else "false",
+        "LLM_CACHE_TTL_HOURS": str(settings.LLM_CACHE_TTL_HOURS),
+        "LLM_CACHE_MAX_ENTRIES": str(settings.LLM_CACHE_MAX_ENTRIES),
         "WHISPER_MODEL_SIZE": settings.WHISPER_MODEL_SIZE,
         "WHISPER_MODEL_PATH": settings.WHISPER_MODEL_PATH,
         "WHISPER_DEVICE": settings.WHISPER_DEVICE,
         "WHISPER_COMPUTE_TYPE": settings.WHISPER_COMPUTE_TYPE,
+        "WHISPER_CPU_THREADS": str(settings.WHISPER_CPU_THREADS),
+        "WHISPER_NUM_WORKERS": str(settings.WHISPER_NUM_WORKERS),
+        "WHISPER_PINNED_PROCESS": "true" if settings.WHISPER_PINNED_PROCESS else "false",
+        "CPU_BUDGET_CORES": str(settings.CPU_BUDGET_CORES),
+        "CPU_PINNING": "true" if settings.CPU_PINNING else "false",
+        "FFMPEG_CPU_THREADS": str(settings.FFMPEG_CPU_THREADS),
+        "WHISPER_IDLE_SECONDS": str(settings.WHISPER_IDLE_SECONDS),
+        "WHISPER_PRELOAD": "true" if settings.WHISPER_PRELOAD else "false",
+        "WHISPER_BATCHING": "true" if settings.WHISPER_BATCHING else "false",
+        "WHISPER_BATCH_WINDOW_MS": str(settings.WHISPER_BATCH_WINDOW_MS),
+        "WHISPER_BATCH_SIZE": str(settings.WHISPER_BATCH_SIZE),
+        "TRANSCRIPT_CACHE_ENABLED": "true" if settings.TRANSCRIPT_CACHE_ENABLED else "false",
+        "TRANSCRIPT_CACHE_MAX_ENTRIES": str(settings.TRANSCRIPT_CACHE_MAX_ENTRIES),
         "CAPTION_FONT": settings.CAPTION_FONT,
         "CAPTION_FONT_SIZE": str(settings.CAPTION_FONT_SIZE),
+        "CAPTION_REWRITE_CHUNK_SIZE": str(settings.CAPTION_REWRITE_CHUNK_SIZE),
+        "CAPTION_REWRITE_WORKERS": str(settings.CAPTION_REWRITE_WORKERS),
+        "CAPTION_OVERLAY_ENABLED": "true" if settings.CAPTION_OVERLAY_ENABLED else "false",
+        "CAPTION_OVERLAY_MAX_ENTRIES": str(settings.CAPTION_OVERLAY_MAX_ENTRIES),
         "ASSETS_DIR": str(settings.ASSETS_DIR),
         "BG_CLIPS_DIR": str(settings.BG_CLIPS_DIR),
         "FONTS_DIR": str(settings.FONTS_DIR),
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from fastapi import APIRouter
+
+from ..llm_cache import cache_stats, clear_cache
+
+router = APIRouter()
+_context: Dict[str, object] = {}
+
+
+def init_context(settings) -> None:
+    _context["settings"] = settings
+
+
+@router.get("/llm_cache/stats")
+def llm_cache_stats() -> Dict:
+    settings = _context["settings"]
+    return cache_stats(settings)
+
+
+@router.delete("/llm_cache")
+def llm_cache_clear() -> Dict:
+    settings = _context["settings"]
+    removed = clear_cache(settings)
+    return {"ok": True, "removed": removed}
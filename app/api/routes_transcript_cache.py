@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Dict
+
+from fastapi import APIRouter
+
+from ..transcript_cache import cache_stats, clear_cache
+
+router = APIRouter()
+_context: Dict[str, object] = {}
+
+
+def init_context(settings) -> None:
+    _context["settings"] = settings
+
+
+@router.get("/transcript_cache/stats")
+def transcript_cache_stats() -> Dict:
+    settings = _context["settings"]
+    return cache_stats(settings)
+
+
+@router.delete("/transcript_cache")
+def transcript_cache_clear() -> Dict:
+    settings = _context["settings"]
+    removed = clear_cache(settings)
+    return {"ok": True, "removed": removed}
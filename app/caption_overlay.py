@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+from .utils import ensure_dir, ffmpeg_filter_path, run_subprocess
+
+WIDTH = 1080
+HEIGHT = 1920
+FPS = 30
+
+_LOCK = threading.Lock()
+_KEY_LOCKS: Dict[str, threading.Lock] = {}
+_STATS: Dict[str, float] = {"hits": 0, "misses": 0, "failures": 0, "render_seconds": 0.0}
+
+
+def overlay_dir(settings) -> Path:
+    return settings.OUTPUTS_DIR / "caption_overlays"
+
+
+def overlay_key(settings, ass_path: Path, duration: float) -> str:
+    """Hash of the ASS content, the fonts libass can see, the canvas and the overlay length."""
+    digest = hashlib.sha256()
+    digest.update(ass_path.read_bytes())
+    fonts_dir = settings.FONTS_DIR
+    if fonts_dir.exists():
+        for font in sorted(fonts_dir.iterdir()):
+            if font.is_file():
+                stat = font.stat()
+                digest.update(f"{font.name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    digest.update(f"{WIDTH}x{HEIGHT}@{FPS}:{duration:.2f}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prerender_overlay(settings, ass_path: Path, duration: float, job_id: str | None = None) -> Path:
+    """Rasterize ass_path once into a transparent qtrle MOV and return the cached file."""
+    key = overlay_key(settings, ass_path, duration)
+    target = overlay_dir(settings) / f"{key}.mov"
+    with _LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        if target.exists():
+            os.utime(target)
+            _bump("hits")
+            return target
+        _bump("misses")
+        ensure_dir(target.parent)
+        temp_path = target.with_suffix(".tmp.mov")
+        start = time.time()
+        try:
+            run_subprocess(
+                [
+                    settings.FFMPEG_PATH,
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    f"color=c=black@0.0:s={WIDTH}x{HEIGHT}:r={FPS}:d={duration:.2f},format=rgba",
+                    "-vf",
+                    f"subtitles='{ffmpeg_filter_path(ass_path)}':"
+                    f"fontsdir='{ffmpeg_filter_path(settings.FONTS_DIR)}':alpha=1",
+                    "-c:v",
+                    "qtrle",
+                    "-pix_fmt",
+                    "argb",
+                    str(temp_path),
+                ],
+                job_id=job_id,
+            )
+            temp_path.replace(target)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            _bump("failures")
+            raise
+        _bump("render_seconds", time.time() - start)
+    _prune(settings)
+    return target
+
+
+def overlay_stats() -> Dict[str, object]:
+    with _LOCK:
+        stats = dict(_STATS)
+    stats["render_seconds"] = round(stats["render_seconds"], 3)
+    return stats
+
+
+def _prune(settings) -> None:
+    files = [path for path in overlay_dir(settings).glob("*.mov") if not path.name.endswith(".tmp.mov")]
+    files.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale in files[max(1, settings.CAPTION_OVERLAY_MAX_ENTRIES) :]:
+        stale.unlink(missing_ok=True)
+
+
+def _bump(name: str, amount: float = 1) -> None:
+    with _LOCK:
+        _STATS[name] = _STATS.get(name, 0) + amount
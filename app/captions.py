@@ -1,21 +1,47 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
 from pathlib import Path
-from typing import List
 
+from . import transcript_cache
+from .cpu_budget import get_cpu_budget, pin_to, whisper_threads
+from .model_ops.whisper_cache import WhisperKey, get_whisper_cache
+from .subtitle_engine import (
+    WordIndex,
+    compile_header,
+    escape_ass,
+    karaoke_events,
+    write_ass,
+)
 
-def _format_ass_time(seconds: float) -> str:
-    total = max(0.0, seconds)
-    hours = int(total // 3600)
-    minutes = int((total % 3600) // 60)
-    secs = total % 60
-    centiseconds = int(round((secs - int(secs)) * 100))
-    return f"{hours}:{minutes:02d}:{int(secs):02d}.{centiseconds:02d}"
 
+_TIMINGS = threading.local()
 
-def _escape_ass(text: str) -> str:
-    return text.replace("{", "\\{").replace("}", "\\}").replace("\n", " ").strip()
+
+@lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    try:
+        import ctranslate2  # type: ignore
+
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=1)
+def batching_available() -> bool:
+    """Whether faster-whisper ships BatchedInferencePipeline (1.1.0 and later)."""
+    try:
+        from faster_whisper import BatchedInferencePipeline  # noqa: F401
+
+        return True
+    except Exception:
+        return False
 
 
 def _select_device(settings) -> tuple[str, str]:
@@ -23,76 +49,326 @@ def _select_device(settings) -> tuple[str, str]:
     compute = settings.WHISPER_COMPUTE_TYPE
     if device != "auto":
         return device, compute if compute != "auto" else "int8"
-    try:
-        from faster_whisper import WhisperModel  # noqa: F401
-
+    if _cuda_available():
         return "cuda", "float16" if compute == "auto" else compute
-    except Exception:
-        return "cpu", "int8"
-
+    return "cpu", "int8" if compute == "auto" else compute
 
-def transcribe_words(settings, audio_path: Path):
-    from faster_whisper import WhisperModel
 
-    resolved_path = settings.resolve_whisper_model_path()
-    model_name = resolved_path or settings.WHISPER_MODEL_SIZE
+def _whisper_key(settings) -> WhisperKey:
+    model_name = settings.resolve_whisper_model_path() or settings.WHISPER_MODEL_SIZE
     device, compute = _select_device(settings)
+    cpu_threads = whisper_threads(settings) if device == "cpu" else 0
+    return (str(model_name), device, compute, cpu_threads, max(1, settings.WHISPER_NUM_WORKERS))
+
+
+def _load_whisper(key: WhisperKey):
+    from faster_whisper import WhisperModel
 
+    model_name, device, compute, cpu_threads, num_workers = key
     try:
-        model = WhisperModel(model_name, device=device, compute_type=compute)
+        return WhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+        )
     except Exception:
-        model = WhisperModel(model_name, device="cpu", compute_type="int8")
+        return WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+        )
 
-    segments, _info = model.transcribe(
-        str(audio_path),
-        word_timestamps=True,
-        beam_size=5,
-    )
 
-    words = []
-    segments_out = []
-    for segment in segments:
-        segments_out.append(segment)
-        if segment.words:
-            for word in segment.words:
-                words.append(
-                    {
-                        "start": float(word.start),
-                        "end": float(word.end),
-                        "text": word.word.strip(),
-                    }
+def warm_up_whisper(settings) -> float:
+    """Load the configured Whisper model into the cache; returns the load time."""
+    cache = get_whisper_cache(settings)
+    key = _whisper_key(settings)
+    _model, load_seconds = cache.acquire(key, lambda: _load_whisper(key))
+    cache.release(key)
+    return load_seconds
+
+
+def last_transcription_timings() -> dict:
+    return dict(getattr(_TIMINGS, "last", {}) or {})
+
+
+@dataclass
+class TranscriptSegment:
+    start: float
+    end: float
+    text: str
+
+
+def _word_dict(word, offset: float = 0.0) -> dict:
+    return {
+        "start": float(word.start) - offset,
+        "end": float(word.end) - offset,
+        "text": word.word.strip(),
+    }
+
+
+def _words_from_segment(segment) -> list[dict]:
+    return [_word_dict(word) for word in segment.words or []]
+
+
+def _transcribe_direct(settings, key: WhisperKey, audio_path: Path, options: dict):
+    cache = get_whisper_cache(settings)
+    model, load_seconds = cache.acquire(key, lambda: _load_whisper(key))
+    try:
+        start = time.time()
+        segments, _info = model.transcribe(str(audio_path), word_timestamps=True, **options)
+
+        words = []
+        segments_out = []
+        for segment in segments:
+            segments_out.append(TranscriptSegment(float(segment.start), float(segment.end), segment.text))
+            words.extend(_words_from_segment(segment))
+        transcribe_seconds = time.time() - start
+    finally:
+        cache.release(key)
+    timings = {
+        "load_seconds": round(load_seconds, 3),
+        "transcribe_seconds": round(transcribe_seconds, 3),
+    }
+    return words, segments_out, timings
+
+
+_PINNED_LOCK = threading.Lock()
+_PINNED_EXECUTOR = None
+
+
+def _transcribe_pinned(key: WhisperKey, audio_path: Path, options: dict, cores, budget):
+    """Run the transcription in a worker process, pinned to the leased cores with CPU_PINNING.
+
+    With pinning the single worker is started with the first lease's cores; whisper
+    leases ask for the same low-numbered cores then, so later calls land there too
+    and queue on that lease anyway. Without pinning there is one unpinned worker per
+    lease the budget can hold, so concurrent jobs are not serialized.
+    """
+    global _PINNED_EXECUTOR
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _PINNED_LOCK:
+        if _PINNED_EXECUTOR is None:
+            if budget.pinning:
+                _PINNED_EXECUTOR = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=pin_to,
+                    initargs=(tuple(cores),),
                 )
-    return words, segments_out
+            else:
+                _PINNED_EXECUTOR = ProcessPoolExecutor(
+                    max_workers=max(1, budget.total // max(1, len(cores))),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        executor = _PINNED_EXECUTOR
+    words, segments, timings = executor.submit(_pinned_worker, key, str(audio_path), options).result()
+    return words, [TranscriptSegment(**segment) for segment in segments], timings
+
+
+def _pinned_worker(key: WhisperKey, audio_path: str, options: dict):
+    from .config import Settings
+
+    words, segments, timings = _transcribe_direct(Settings(), key, Path(audio_path), options)
+    return words, [asdict(segment) for segment in segments], timings
+
+
+def shutdown_pinned_worker() -> None:
+    global _PINNED_EXECUTOR
+    with _PINNED_LOCK:
+        executor = _PINNED_EXECUTOR
+        _PINNED_EXECUTOR = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
-def load_caption_style(settings, style_name: str, plugin_manager) -> dict:
-    style_path = settings.CAPTION_STYLES_DIR / f"{style_name}.json"
-    style = {}
-    if style_path.exists():
+def _run_whisper(settings, audio_path: Path, use_cache: bool = True, batched: bool = False, **options):
+    key = _whisper_key(settings)
+    cache_key = None
+    if use_cache and settings.TRANSCRIPT_CACHE_ENABLED:
+        cache_key = transcript_cache.make_key(audio_path, key[0], key[2], options)
+        cached = transcript_cache.get_cached(settings, cache_key)
+        if cached is not None:
+            words, segments = cached
+            _TIMINGS.last = {
+                "model": key[0],
+                "device": key[1],
+                "compute_type": key[2],
+                "load_seconds": 0.0,
+                "transcribe_seconds": 0.0,
+                "cached": True,
+            }
+            return words, [TranscriptSegment(**segment) for segment in segments]
+
+    result = None
+    if batched:
+        from .transcription_service import get_transcription_service
+
         try:
-            style = json.loads(style_path.read_text(encoding="utf-8"))
+            result = get_transcription_service(settings).transcribe(audio_path)
         except Exception:
-            style = {}
-    if not style:
-        style = {
-            "name": style_name,
-            "font": settings.CAPTION_FONT,
-            "font_size": settings.CAPTION_FONT_SIZE,
-            "primary_color": "&H00FFFFFF",
-            "secondary_color": "&H0000FFFF",
-            "outline_color": "&H00000000",
-            "back_color": "&H64000000",
-            "bold": -1,
-            "outline": 6,
-            "shadow": 3,
-            "alignment": 2,
-            "margin_l": 60,
-            "margin_r": 60,
-            "margin_v": 180,
-            "bounce_scale": 112,
+            # A failed batch (or this file failing to decode in it) retries on the direct path.
+            result = None
+    if result is not None:
+        words, segments_out, timings = result
+    elif key[1] != "cpu":
+        words, segments_out, timings = _transcribe_direct(settings, key, audio_path, options)
+    else:
+        budget = get_cpu_budget(settings)
+        preferred = list(range(key[3])) if budget.pinning else None
+        with budget.lease("whisper", key[3], preferred=preferred) as lease:
+            if settings.WHISPER_PINNED_PROCESS:
+                words, segments_out, timings = _transcribe_pinned(key, audio_path, options, lease.cores, budget)
+            else:
+                words, segments_out, timings = _transcribe_direct(settings, key, audio_path, options)
+        timings = {
+            **timings,
+            "cpu_threads": lease.threads,
+            "cpu_wait_seconds": round(lease.wait_seconds, 3),
+            "pinned_process": settings.WHISPER_PINNED_PROCESS,
         }
-    context = {"caption_style": style_name}
-    return plugin_manager.apply_caption_style(style, context)
+    _TIMINGS.last = {"model": key[0], "device": key[1], "compute_type": key[2], **timings}
+    if cache_key:
+        transcript_cache.put_cached(
+            settings, cache_key, key[0], words, [asdict(segment) for segment in segments_out]
+        )
+    return words, segments_out
+
+
+def transcribe_words(settings, audio_path: Path, use_cache: bool = True):
+    return _run_whisper(
+        settings,
+        audio_path,
+        use_cache=use_cache,
+        batched=settings.WHISPER_BATCHING and batching_available(),
+        beam_size=5,
+    )
+
+
+def align_words(settings, audio_path: Path, script_text: str, use_cache: bool = True) -> list[dict]:
+    """Word timings for a known script: a greedy, VAD-filtered Whisper pass primed
+    with the script, whose timestamps are mapped back onto the script words."""
+    script_words = script_text.split()
+    if not script_words:
+        return []
+    decoded, _segments = _run_whisper(
+        settings,
+        audio_path,
+        use_cache=use_cache,
+        beam_size=1,
+        best_of=1,
+        temperature=0.0,
+        initial_prompt=script_text,
+        condition_on_previous_text=False,
+        vad_filter=True,
+    )
+    _TIMINGS.last["mode"] = "forced_alignment"
+    return map_to_script(script_words, decoded)
+
+
+def _norm_token(text: str) -> str:
+    return "".join(char for char in text.lower() if char.isalnum())
+
+
+def map_to_script(script_words: list[str], decoded: list[dict]) -> list[dict]:
+    """Carry decoded word timestamps over to the script's own word sequence.
+
+    Matched runs copy timings directly, substituted runs share the decoded span,
+    and script words Whisper dropped are interpolated between their neighbours.
+    """
+    timings: list[tuple[float, float] | None] = [None] * len(script_words)
+    matcher = SequenceMatcher(
+        None,
+        [_norm_token(word) for word in script_words],
+        [_norm_token(word["text"]) for word in decoded],
+        autojunk=False,
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(i2 - i1):
+                item = decoded[j1 + offset]
+                timings[i1 + offset] = (float(item["start"]), float(item["end"]))
+        elif tag == "replace":
+            span_start = float(decoded[j1]["start"])
+            span_end = float(decoded[j2 - 1]["end"])
+            step = (span_end - span_start) / (i2 - i1)
+            for offset in range(i2 - i1):
+                timings[i1 + offset] = (span_start + step * offset, span_start + step * (offset + 1))
+
+    idx = 0
+    while idx < len(timings):
+        if timings[idx] is not None:
+            idx += 1
+            continue
+        gap_end = idx
+        while gap_end < len(timings) and timings[gap_end] is None:
+            gap_end += 1
+        left = timings[idx - 1][1] if idx > 0 else 0.0
+        right = timings[gap_end][0] if gap_end < len(timings) else left + 0.3 * (gap_end - idx)
+        right = max(right, left)
+        step = (right - left) / (gap_end - idx)
+        for offset in range(gap_end - idx):
+            timings[idx + offset] = (left + step * offset, left + step * (offset + 1))
+        idx = gap_end
+
+    words = []
+    previous_end = 0.0
+    for word, (start, end) in zip(script_words, timings):
+        start = max(start, previous_end)
+        end = max(end, start + 0.01)
+        words.append({"start": round(start, 3), "end": round(end, 3), "text": word})
+        previous_end = end
+    return words
+
+
+def words_from_alignment(alignment: dict) -> list[dict]:
+    """Spread each aligned sentence across its words, weighted by letter count.
+
+    Boundaries are in raw Piper time, so they are divided by the atempo factor the
+    voice was rendered with.
+    """
+    speed = float(alignment.get("speech_speed") or 1.0)
+    if abs(speed - 1.0) < 0.01:
+        speed = 1.0
+    words = []
+    for sentence in alignment.get("sentences", []):
+        tokens = str(sentence.get("text", "")).split()
+        if not tokens:
+            continue
+        start = float(sentence.get("start", 0.0))
+        end = float(sentence.get("end", start))
+        weights = [
+            max(1, sum(char.isalnum() for char in token)) + (2 if token[-1] in ",;:" else 0)
+            for token in tokens
+        ]
+        total = float(sum(weights))
+        cursor = start
+        for token, weight in zip(tokens, weights):
+            duration = (end - start) * weight / total
+            words.append(
+                {
+                    "start": round(cursor / speed, 3),
+                    "end": round((cursor + duration) / speed, 3),
+                    "text": token,
+                }
+            )
+            cursor += duration
+    return words
+
+
+def load_alignment_words(alignment_path: Path) -> list[dict]:
+    if not alignment_path.exists():
+        return []
+    try:
+        return words_from_alignment(json.loads(alignment_path.read_text(encoding="utf-8")))
+    except Exception:
+        return []
 
 
 def build_ass(
@@ -105,91 +381,33 @@ def build_ass(
     preview_start: float | None = None,
     preview_duration: float | None = None,
 ) -> Path:
-    style = load_caption_style(settings, caption_style, plugin_manager)
-
-    header = [
-        "[Script Info]",
-        "ScriptType: v4.00+",
-        "PlayResX: 1080",
-        "PlayResY: 1920",
-        "ScaledBorderAndShadow: yes",
-        "",
-        "[V4+ Styles]",
-        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour,"
-        " BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing,"
-        " Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
-        (
-            "Style: Default,"
-            f"{style.get('font')},{style.get('font_size')},"
-            f"{style.get('primary_color')},{style.get('secondary_color')},"
-            f"{style.get('outline_color')},{style.get('back_color')},"
-            f"{style.get('bold', -1)},0,0,0,100,100,0,0,1,"
-            f"{style.get('outline')},{style.get('shadow')},"
-            f"{style.get('alignment')},{style.get('margin_l')},"
-            f"{style.get('margin_r')},{style.get('margin_v')},1"
-        ),
-        "",
-        "[Events]",
-        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
-    ]
-
-    events: List[str] = []
-    bounce_scale = int(style.get("bounce_scale", 110))
-    if preview_start is not None and preview_duration is not None:
-        words = [
-            {
-                "start": word["start"] - preview_start,
-                "end": word["end"] - preview_start,
-                "text": word["text"],
-            }
-            for word in words
-            if preview_start <= word["start"] <= preview_start + preview_duration
-        ]
+    """Write subtitles for words (karaoke) or, without words, plain segment events.
+
+    words may be a list of word dicts or a prebuilt WordIndex; previews slice it
+    by start time instead of scanning every word.
+    """
+    header = compile_header(settings, caption_style, plugin_manager)
+    previewing = preview_start is not None and preview_duration is not None
+    if previewing:
+        index = words if isinstance(words, WordIndex) else WordIndex(words)
+        words = index.window(preview_start, preview_duration)
+    elif isinstance(words, WordIndex):
+        words = words.words
     if words:
-        current_segment = []
-        segment_start = words[0]["start"]
-        last_end = words[0]["end"]
-        for word in words:
-            if word["start"] - last_end > 0.8 and current_segment:
-                events.append(_karaoke_event(segment_start, last_end, current_segment, bounce_scale))
-                current_segment = []
-                segment_start = word["start"]
-            current_segment.append(word)
-            last_end = word["end"]
-        if current_segment:
-            events.append(_karaoke_event(segment_start, last_end, current_segment, bounce_scale))
+        events = karaoke_events(words, header.bounce_scale)
     else:
-        for segment in segments:
-            start_time = float(segment.start)
-            end_time = float(segment.end)
-            if preview_start is not None and preview_duration is not None:
-                if end_time < preview_start or start_time > preview_start + preview_duration:
-                    continue
-                start_time = max(preview_start, start_time) - preview_start
-                end_time = min(preview_start + preview_duration, end_time) - preview_start
-            text = _escape_ass(segment.text)
-            start = _format_ass_time(start_time)
-            end = _format_ass_time(end_time)
-            events.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}")
-
-    ass_path.parent.mkdir(parents=True, exist_ok=True)
-    with ass_path.open("w", encoding="utf-8") as handle:
-        for line in header:
-            handle.write(line + "\n")
-        for event in events:
-            handle.write(event + "\n")
+        events = _segment_events(segments, preview_start if previewing else None, preview_duration)
+    write_ass(ass_path, header, events)
     return ass_path
 
 
-def _karaoke_event(start_s: float, end_s: float, words, bounce_scale: int) -> str:
-    start = _format_ass_time(start_s)
-    end = _format_ass_time(end_s)
-    pieces = []
-    for word in words:
-        dur_cs = max(1, int(round((word["end"] - word["start"]) * 100)))
-        cleaned = _escape_ass(word["text"])
-        pieces.append(
-            f"{{\\k{dur_cs}\\fscx{bounce_scale}\\fscy{bounce_scale}}}{cleaned}{{\\fscx100\\fscy100}}"
-        )
-    text = " ".join(pieces)
-    return f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}"
+def _segment_events(segments, preview_start: float | None, preview_duration: float | None):
+    for segment in segments:
+        start_time = float(segment.start)
+        end_time = float(segment.end)
+        if preview_start is not None:
+            if end_time < preview_start or start_time > preview_start + preview_duration:
+                continue
+            start_time = max(preview_start, start_time) - preview_start
+            end_time = min(preview_start + preview_duration, end_time) - preview_start
+        yield start_time, end_time, escape_ass(segment.text)
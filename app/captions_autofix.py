@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-from .captions import load_caption_style
-from .llm import generate_text
+from .db import get_connection
+from .json_grammar import LINES_SHAPE
+from .llm import default_model_identity, generate_text
+from .subtitle_engine import compile_header, escape_ass, write_ass
 from .utils import write_json
 
 
@@ -116,7 +121,57 @@ def rewrite_events(
     max_chars_per_line: int,
     target_wps: float,
 ) -> List[dict]:
+    """Shorten caption lines with the LLM in fixed-size chunks.
+
+    Rewrites are cached per (model, line, max_chars_per_line, target_wps), so reruns
+    only send lines that changed. A chunk whose reply is unusable keeps its original
+    lines instead of discarding the whole rewrite.
+    """
     lines = [" ".join(event["lines"]).replace("\\N", " ") for event in events]
+    model = default_model_identity(settings)
+    keys = [_rewrite_key(model, line, max_chars_per_line, target_wps) for line in lines]
+    rewrites = _cached_rewrites(settings, keys)
+
+    pending: Dict[str, str] = {}
+    for key, line in zip(keys, lines):
+        if key not in rewrites:
+            pending.setdefault(key, line)
+    if pending:
+        size = max(1, settings.CAPTION_REWRITE_CHUNK_SIZE)
+        pending_keys = list(pending)
+        chunks = [pending_keys[idx : idx + size] for idx in range(0, len(pending_keys), size)]
+        # In-process, every request waits on the same pooled model, so chunks run one
+        # after another. The inference server merges concurrent same-shape requests
+        # into one batch, so there a few chunks are kept in flight.
+        workers = settings.CAPTION_REWRITE_WORKERS if settings.LLM_SERVER_ENABLED else 1
+        workers = max(1, min(workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda chunk: _rewrite_chunk(
+                    settings, [pending[key] for key in chunk], max_chars_per_line, target_wps
+                ),
+                chunks,
+            )
+            fresh: Dict[str, str] = {}
+            for chunk, result in zip(chunks, results):
+                if result is not None:
+                    fresh.update(zip(chunk, result))
+        _store_rewrites(settings, fresh)
+        rewrites.update(fresh)
+
+    updated = []
+    for event, line, key in zip(events, lines, keys):
+        if key not in rewrites:
+            updated.append(event)
+            continue
+        text = rewrites[key] or line
+        updated.append({**event, "lines": _wrap_lines(text, max_chars_per_line), "text": text})
+    return updated
+
+
+def _rewrite_chunk(
+    settings, lines: List[str], max_chars_per_line: int, target_wps: float
+) -> List[str] | None:
     system = "You shorten captions for readability. Return strict JSON only."
     prompt = (
         "Rewrite each line to be shorter and punchier.\n"
@@ -126,59 +181,67 @@ def rewrite_events(
         "Return JSON: {\"lines\": [\"...\", \"...\"]}"
     )
     try:
-        raw = generate_text(settings, system, prompt, seed=None)
-        payload = _extract_json(raw)
-        rewrites = payload.get("lines", [])
-        if len(rewrites) != len(events):
-            return events
-        updated = []
-        for event, rewrite in zip(events, rewrites):
-            text = str(rewrite).strip()
-            if not text:
-                text = " ".join(event["lines"]).replace("\\N", " ")
-            lines = _wrap_lines(text, max_chars_per_line)
-            updated.append({**event, "lines": lines, "text": text})
-        return updated
+        raw = generate_text(settings, system, prompt, seed=None, json_shape=LINES_SHAPE)
     except Exception:
-        return events
+        return None
+    rewrites = _extract_json(raw).get("lines", [])
+    if not isinstance(rewrites, list) or len(rewrites) != len(lines):
+        return None
+    return [str(rewrite).strip() for rewrite in rewrites]
+
+
+def _rewrite_key(model: str, line: str, max_chars_per_line: int, target_wps: float) -> str:
+    material = json.dumps([model, line, max_chars_per_line, target_wps])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cached_rewrites(settings, keys: List[str]) -> Dict[str, str]:
+    if not settings.LLM_CACHE_ENABLED or not keys:
+        return {}
+    cutoff = (datetime.utcnow() - timedelta(hours=settings.LLM_CACHE_TTL_HOURS)).isoformat()
+    unique = list(dict.fromkeys(keys))
+    found: Dict[str, str] = {}
+    with get_connection(settings.DB_PATH) as conn:
+        for idx in range(0, len(unique), 500):
+            batch = unique[idx : idx + 500]
+            placeholders = ",".join("?" for _ in batch)
+            rows = conn.execute(
+                f"SELECT key, rewrite FROM caption_rewrite_cache WHERE key IN ({placeholders}) AND created_at >= ?",
+                (*batch, cutoff),
+            ).fetchall()
+            found.update({row["key"]: row["rewrite"] for row in rows})
+    return found
+
+
+def _store_rewrites(settings, rewrites: Dict[str, str]) -> None:
+    if not settings.LLM_CACHE_ENABLED or not rewrites:
+        return
+    now = datetime.utcnow()
+    cutoff = (now - timedelta(hours=settings.LLM_CACHE_TTL_HOURS)).isoformat()
+    with get_connection(settings.DB_PATH) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO caption_rewrite_cache (key, created_at, rewrite) VALUES (?, ?, ?)",
+            [(key, now.isoformat(), text) for key, text in rewrites.items() if text],
+        )
+        conn.execute("DELETE FROM caption_rewrite_cache WHERE created_at < ?", (cutoff,))
+        conn.execute(
+            """
+            DELETE FROM caption_rewrite_cache WHERE key IN (
+                SELECT key FROM caption_rewrite_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max(0, settings.LLM_CACHE_MAX_ENTRIES),),
+        )
+        conn.commit()
 
 
 def render_ass(settings, events: List[dict], ass_path: Path, caption_style: str, plugin_manager) -> None:
-    style = load_caption_style(settings, caption_style, plugin_manager)
-    header = [
-        "[Script Info]",
-        "ScriptType: v4.00+",
-        "PlayResX: 1080",
-        "PlayResY: 1920",
-        "ScaledBorderAndShadow: yes",
-        "",
-        "[V4+ Styles]",
-        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour,"
-        " BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing,"
-        " Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
-        (
-            "Style: Default,"
-            f"{style.get('font')},{style.get('font_size')},"
-            f"{style.get('primary_color')},{style.get('secondary_color')},"
-            f"{style.get('outline_color')},{style.get('back_color')},"
-            f"{style.get('bold', -1)},0,0,0,100,100,0,0,1,"
-            f"{style.get('outline')},{style.get('shadow')},"
-            f"{style.get('alignment')},{style.get('margin_l')},"
-            f"{style.get('margin_r')},{style.get('margin_v')},1"
-        ),
-        "",
-        "[Events]",
-        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
-    ]
-    ass_path.parent.mkdir(parents=True, exist_ok=True)
-    with ass_path.open("w", encoding="utf-8") as handle:
-        for line in header:
-            handle.write(line + "\n")
-        for event in events:
-            start = _format_ass_time(event["start"])
-            end = _format_ass_time(event["end"])
-            text = _escape_ass("\\N".join(event["lines"]))
-            handle.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
+    header = compile_header(settings, caption_style, plugin_manager)
+    write_ass(
+        ass_path,
+        header,
+        ((event["start"], event["end"], escape_ass("\\N".join(event["lines"]))) for event in events),
+    )
 
 
 def _flush_event(
@@ -221,19 +284,6 @@ def _wrap_lines(text: str, max_chars_per_line: int) -> List[str]:
     return lines
 
 
-def _format_ass_time(seconds: float) -> str:
-    total = max(0.0, seconds)
-    hours = int(total // 3600)
-    minutes = int((total % 3600) // 60)
-    secs = total % 60
-    centiseconds = int(round((secs - int(secs)) * 100))
-    return f"{hours}:{minutes:02d}:{int(secs):02d}.{centiseconds:02d}"
-
-
-def _escape_ass(text: str) -> str:
-    return text.replace("{", "\\{").replace("}", "\\}").replace("\n", " ").strip()
-
-
 def _extract_json(raw: str) -> dict:
     start = raw.find("{")
     end = raw.rfind("}")
@@ -4,6 +4,8 @@ import json
 import math
 from typing import Dict, List
 
+from .word_timeline import WordTimeline, load_timeline
+
 
 def build_report(settings, job_id: str) -> Dict:
     job_dir = settings.OUTPUTS_DIR / job_id
@@ -18,16 +20,9 @@ def build_report(settings, job_id: str) -> Dict:
         except Exception:
             beats = []
 
-    words = []
-    if transcript_path.exists():
-        try:
-            transcript = json.loads(transcript_path.read_text(encoding="utf-8"))
-            words = transcript.get("words", [])
-        except Exception:
-            words = []
-
-    duration = _estimate_duration(words, beats)
-    words_per_second = _words_per_second(words, duration)
+    timeline = load_timeline(transcript_path)
+    duration = _estimate_duration(timeline, beats)
+    words_per_second = _words_per_second(timeline, duration)
     avg_chars_per_line = _avg_chars_per_line(beats)
     max_consecutive_long = _max_consecutive_long(beats)
     caption_on_screen = _caption_on_screen(beats, duration)
@@ -44,46 +39,20 @@ def build_report(settings, job_id: str) -> Dict:
 
 
 def compress_words(words: List[Dict], max_wps: float) -> List[Dict]:
-    if not words:
-        return words
-    duration = _estimate_duration(words, [])
-    wps = _words_per_second(words, duration)
-    if not wps:
-        return words
-    max_allowed = max_wps
-    if max(wps) <= max_allowed:
-        return words
-
-    keep = []
-    for second in range(len(wps)):
-        bucket = [w for w in words if int(w.get("start", 0)) == second]
-        if not bucket:
-            continue
-        if len(bucket) <= max_allowed:
-            keep.extend(bucket)
-        else:
-            stride = max(1, math.ceil(len(bucket) / max_allowed))
-            keep.extend(bucket[::stride])
-    keep.sort(key=lambda w: w.get("start", 0))
-    return keep
+    return WordTimeline(words).compress(max_wps).to_words()
 
 
-def _estimate_duration(words: List[Dict], beats: List[Dict]) -> float:
-    if words:
-        return max(float(w.get("end", 0.0)) for w in words)
+def _estimate_duration(timeline: WordTimeline, beats: List[Dict]) -> float:
+    if len(timeline):
+        return timeline.duration
     if beats:
         return max(float(b.get("t", 0.0)) for b in beats) + 2.0
     return 30.0
 
 
-def _words_per_second(words: List[Dict], duration: float) -> List[int]:
+def _words_per_second(timeline: WordTimeline, duration: float) -> List[int]:
     total_seconds = max(1, int(math.ceil(duration)))
-    counts = [0 for _ in range(total_seconds)]
-    for word in words:
-        start = float(word.get("start", 0.0))
-        idx = min(total_seconds - 1, max(0, int(start)))
-        counts[idx] += 1
-    return counts
+    return timeline.per_second(total_seconds).tolist()
 
 
 def _avg_chars_per_line(beats: List[Dict]) -> float:
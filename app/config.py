@@ -130,6 +130,42 @@ class Settings:
     def PIPER_VOICES_DIR(self) -> str:
         return os.getenv("PIPER_VOICES_DIR", "").strip()
 
+    @property
+    def PIPER_POOL_ENABLED(self) -> bool:
+        raw = os.getenv("PIPER_POOL_ENABLED", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def PIPER_POOL_SIZE(self) -> int:
+        return int(os.getenv("PIPER_POOL_SIZE", "2"))
+
+    @property
+    def TTS_BEAT_WORKERS(self) -> int:
+        return int(os.getenv("TTS_BEAT_WORKERS", "2"))
+
+    @property
+    def TTS_BEAT_GAP_SECONDS(self) -> float:
+        return float(os.getenv("TTS_BEAT_GAP_SECONDS", "0.25"))
+
+    @property
+    def VOICE_MASTER_IN_RENDER(self) -> bool:
+        raw = os.getenv("VOICE_MASTER_IN_RENDER", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def TTS_STREAMING(self) -> bool:
+        raw = os.getenv("TTS_STREAMING", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def TTS_CACHE_ENABLED(self) -> bool:
+        raw = os.getenv("TTS_CACHE_ENABLED", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def TTS_CACHE_MAX_MB(self) -> int:
+        return int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+
     @property
     def LLM_BACKEND(self) -> str:
         return os.getenv("LLM_BACKEND", "llama_cpp").strip()
@@ -169,6 +205,84 @@ class Settings:
     def LLM_N_GPU_LAYERS(self) -> int:
         return int(os.getenv("LLM_N_GPU_LAYERS", "0"))
 
+    @property
+    def LLM_POOL_MAX_MODELS(self) -> int:
+        return int(os.getenv("LLM_POOL_MAX_MODELS", "2"))
+
+    @property
+    def LLM_POOL_MEMORY_GB(self) -> float:
+        return float(os.getenv("LLM_POOL_MEMORY_GB", "0"))
+
+    @property
+    def LLM_TORCH_THREADS(self) -> int:
+        return int(os.getenv("LLM_TORCH_THREADS", "0"))
+
+    @property
+    def LLM_BATCH_CANDIDATES(self) -> bool:
+        raw = os.getenv("LLM_BATCH_CANDIDATES", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def LLM_PREFIX_CACHE_SIZE(self) -> int:
+        return int(os.getenv("LLM_PREFIX_CACHE_SIZE", "4"))
+
+    @property
+    def LLM_CONSTRAINED_JSON(self) -> bool:
+        raw = os.getenv("LLM_CONSTRAINED_JSON", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def LLM_STREAMING(self) -> bool:
+        raw = os.getenv("LLM_STREAMING", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def LLM_PROGRESS_INTERVAL_SECONDS(self) -> float:
+        return float(os.getenv("LLM_PROGRESS_INTERVAL_SECONDS", "2.0"))
+
+    @property
+    def LLM_SESSION_MODE(self) -> bool:
+        raw = os.getenv("LLM_SESSION_MODE", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def LLM_SERVER_ENABLED(self) -> bool:
+        raw = os.getenv("LLM_SERVER_ENABLED", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def LLM_SERVER_PORT(self) -> int:
+        return int(os.getenv("LLM_SERVER_PORT", "0"))
+
+    @property
+    def LLM_SERVER_BATCH_WINDOW_MS(self) -> int:
+        return int(os.getenv("LLM_SERVER_BATCH_WINDOW_MS", "25"))
+
+    @property
+    def LLM_SERVER_TIMEOUT_SECONDS(self) -> float:
+        return float(os.getenv("LLM_SERVER_TIMEOUT_SECONDS", "600"))
+
+    @property
+    def LLM_BREAKER_BASE_SECONDS(self) -> float:
+        return float(os.getenv("LLM_BREAKER_BASE_SECONDS", "30"))
+
+    @property
+    def LLM_BREAKER_MAX_SECONDS(self) -> float:
+        return float(os.getenv("LLM_BREAKER_MAX_SECONDS", "1800"))
+
+    @property
+    def LLM_CACHE_ENABLED(self) -> bool:
+        raw = os.getenv("LLM_CACHE_ENABLED", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def LLM_CACHE_TTL_HOURS(self) -> float:
+        return float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+
+    @property
+    def LLM_CACHE_MAX_ENTRIES(self) -> int:
+        return int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
     @property
     def WHISPER_MODEL_SIZE(self) -> str:
         return os.getenv("WHISPER_MODEL_SIZE", "base").strip()
@@ -185,6 +299,80 @@ class Settings:
     def WHISPER_COMPUTE_TYPE(self) -> str:
         return os.getenv("WHISPER_COMPUTE_TYPE", "auto").strip()
 
+    @property
+    def WHISPER_CPU_THREADS(self) -> int:
+        return int(os.getenv("WHISPER_CPU_THREADS", "0"))
+
+    @property
+    def WHISPER_NUM_WORKERS(self) -> int:
+        return int(os.getenv("WHISPER_NUM_WORKERS", "1"))
+
+    @property
+    def WHISPER_PINNED_PROCESS(self) -> bool:
+        raw = os.getenv("WHISPER_PINNED_PROCESS", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def CPU_BUDGET_CORES(self) -> int:
+        return int(os.getenv("CPU_BUDGET_CORES", "0"))
+
+    @property
+    def CPU_PINNING(self) -> bool:
+        raw = os.getenv("CPU_PINNING", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def FFMPEG_CPU_THREADS(self) -> int:
+        return int(os.getenv("FFMPEG_CPU_THREADS", "0"))
+
+    @property
+    def WHISPER_IDLE_SECONDS(self) -> float:
+        return float(os.getenv("WHISPER_IDLE_SECONDS", "900"))
+
+    @property
+    def WHISPER_PRELOAD(self) -> bool:
+        raw = os.getenv("WHISPER_PRELOAD", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def WHISPER_BATCHING(self) -> bool:
+        raw = os.getenv("WHISPER_BATCHING", "false").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def WHISPER_BATCH_WINDOW_MS(self) -> int:
+        return int(os.getenv("WHISPER_BATCH_WINDOW_MS", "750"))
+
+    @property
+    def WHISPER_BATCH_SIZE(self) -> int:
+        return int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+
+    @property
+    def TRANSCRIPT_CACHE_ENABLED(self) -> bool:
+        raw = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def TRANSCRIPT_CACHE_MAX_ENTRIES(self) -> int:
+        return int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "500"))
+
+    @property
+    def CAPTION_REWRITE_CHUNK_SIZE(self) -> int:
+        return int(os.getenv("CAPTION_REWRITE_CHUNK_SIZE", "12"))
+
+    @property
+    def CAPTION_REWRITE_WORKERS(self) -> int:
+        return int(os.getenv("CAPTION_REWRITE_WORKERS", "4"))
+
+    @property
+    def CAPTION_OVERLAY_ENABLED(self) -> bool:
+        raw = os.getenv("CAPTION_OVERLAY_ENABLED", "true").strip().lower()
+        return raw in {"1", "true", "yes", "on"}
+
+    @property
+    def CAPTION_OVERLAY_MAX_ENTRIES(self) -> int:
+        return int(os.getenv("CAPTION_OVERLAY_MAX_ENTRIES", "50"))
+
     @property
     def CAPTION_FONT(self) -> str:
         return os.getenv("CAPTION_FONT", "Impact").strip()
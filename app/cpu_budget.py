@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+_BUDGET = None
+_BUDGET_LOCK = threading.Lock()
+_CURRENT = threading.local()
+
+
+@dataclass(eq=False)
+class CpuLease:
+    label: str
+    cores: Tuple[int, ...]
+    pinned: bool
+    job_id: str | None = None
+    wait_seconds: float = 0.0
+    acquired_at: float = field(default_factory=time.time)
+
+    @property
+    def threads(self) -> int:
+        return len(self.cores)
+
+
+class CpuBudget:
+    """Hands out disjoint sets of cores to Whisper and FFmpeg so concurrent jobs
+    share the machine instead of each assuming it owns every core.
+    """
+
+    def __init__(self, total: int, pinning: bool) -> None:
+        self.total = max(1, total)
+        self.pinning = pinning and hasattr(os, "sched_setaffinity")
+        self._cond = threading.Condition()
+        self._free = set(range(self.total))
+        self._active: List[CpuLease] = []
+        self._recent: "deque[dict]" = deque(maxlen=100)
+        self._waits: Dict[str, float] = {}
+        self._waiting: Dict[str, int] = {}
+
+    def acquire(
+        self,
+        label: str,
+        threads: int,
+        minimum: int | None = None,
+        job_id: str | None = None,
+        preferred: Sequence[int] | None = None,
+        reserve: Tuple[str, int] | None = None,
+    ) -> CpuLease:
+        """Block until at least `minimum` cores are free and take up to `threads` of them.
+
+        With `preferred`, those exact cores are waited for, so a pinned worker
+        process keeps running on the cores it was started on. With
+        `reserve=(label_prefix, cores)`, that many cores are left free while a
+        lease with that label is waiting for them.
+        """
+        threads = max(1, min(threads, self.total))
+        minimum = threads if minimum is None else max(1, min(minimum, threads))
+        wanted = set(preferred[:threads]) if preferred else None
+        start = time.time()
+        with self._cond:
+            self._waiting[label] = self._waiting.get(label, 0) + 1
+            try:
+                if wanted is not None:
+                    self._cond.wait_for(lambda: wanted <= self._free)
+                    cores = tuple(sorted(wanted))
+                else:
+                    self._cond.wait_for(lambda: self._available(reserve, minimum) >= minimum)
+                    take = min(threads, self._available(reserve, minimum))
+                    # Take from the top so leases with preferred low cores rarely wait.
+                    cores = tuple(sorted(self._free)[-take:])
+            finally:
+                self._waiting[label] -= 1
+            self._free.difference_update(cores)
+            lease = CpuLease(
+                label=label,
+                cores=cores,
+                pinned=self.pinning,
+                job_id=job_id,
+                wait_seconds=time.time() - start,
+            )
+            self._active.append(lease)
+            self._waits[label] = self._waits.get(label, 0.0) + lease.wait_seconds
+        _CURRENT.lease = lease
+        return lease
+
+    def release(self, lease: CpuLease) -> None:
+        with self._cond:
+            if lease in self._active:
+                self._active.remove(lease)
+                self._free.update(lease.cores)
+                self._recent.append(
+                    {
+                        "label": lease.label,
+                        "job_id": lease.job_id,
+                        "threads": lease.threads,
+                        "wait_seconds": round(lease.wait_seconds, 3),
+                        "held_seconds": round(time.time() - lease.acquired_at, 3),
+                    }
+                )
+            self._cond.notify_all()
+        if getattr(_CURRENT, "lease", None) is lease:
+            _CURRENT.lease = None
+
+    @contextmanager
+    def lease(self, label: str, threads: int, **kwargs) -> Iterator[CpuLease]:
+        lease = self.acquire(label, threads, **kwargs)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def leased(self, label_prefix: str) -> int:
+        """Cores currently held by leases whose label starts with label_prefix."""
+        with self._cond:
+            return self._held(label_prefix)
+
+    def _held(self, label_prefix: str) -> int:
+        return sum(lease.threads for lease in self._active if lease.label.startswith(label_prefix))
+
+    def _available(self, reserve: Tuple[str, int] | None, minimum: int) -> int:
+        """Free cores a lease may take, after keeping the reserved share free."""
+        if reserve is None:
+            return len(self._free)
+        label_prefix, cores = reserve
+        if not any(count for label, count in self._waiting.items() if label.startswith(label_prefix)):
+            return len(self._free)
+        # Never reserve so much that the lease could not run at all.
+        return len(self._free) - min(cores, self.total - minimum)
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "total_cores": self.total,
+                "free_cores": len(self._free),
+                "pinning": self.pinning,
+                "wait_seconds": {label: round(value, 3) for label, value in self._waits.items()},
+                "active": [
+                    {"label": lease.label, "job_id": lease.job_id, "threads": lease.threads}
+                    for lease in self._active
+                ],
+                "recent": list(self._recent),
+            }
+
+
+def current_lease() -> CpuLease | None:
+    """Lease held by the calling thread; subprocesses it starts are pinned to its cores."""
+    return getattr(_CURRENT, "lease", None)
+
+
+def pin_to(cores: Sequence[int]) -> None:
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(cores))
+
+
+def budget_cores(settings) -> int:
+    return settings.CPU_BUDGET_CORES or os.cpu_count() or 1
+
+
+def whisper_threads(settings) -> int:
+    """Cores the captions stage asks for: WHISPER_CPU_THREADS, or half the budget."""
+    return settings.WHISPER_CPU_THREADS or max(1, budget_cores(settings) // 2)
+
+
+def ffmpeg_threads(settings) -> int:
+    """Cores an FFmpeg render asks for: FFMPEG_CPU_THREADS, or what Whisper's share leaves."""
+    return settings.FFMPEG_CPU_THREADS or max(1, budget_cores(settings) - whisper_threads(settings))
+
+
+@contextmanager
+def ffmpeg_lease(settings, job_id: str | None = None) -> Iterator[CpuLease]:
+    """Lease cores for a render, leaving Whisper's share free while a transcription waits.
+
+    With no Whisper lease queued a render takes whatever is free, so concurrent
+    renders run side by side; once one is queued, renders stop taking its cores.
+    """
+    budget = get_cpu_budget(settings)
+    with budget.lease(
+        "ffmpeg",
+        ffmpeg_threads(settings),
+        minimum=1,
+        job_id=job_id,
+        reserve=("whisper", whisper_threads(settings)),
+    ) as lease:
+        yield lease
+
+
+def get_cpu_budget(settings) -> CpuBudget:
+    global _BUDGET
+    with _BUDGET_LOCK:
+        if _BUDGET is None:
+            _BUDGET = CpuBudget(budget_cores(settings), settings.CPU_PINNING)
+        return _BUDGET
+
+
+def cpu_budget_stats() -> Dict[str, object]:
+    with _BUDGET_LOCK:
+        budget = _BUDGET
+    return budget.stats() if budget is not None else {}
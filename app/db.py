@@ -120,6 +120,37 @@ CREATE TABLE IF NOT EXISTS scheduler_runs (
     report_json TEXT
 );
 
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    created_at TEXT,
+    last_used TEXT,
+    model_path TEXT,
+    size_bytes INTEGER,
+    hits INTEGER DEFAULT 0,
+    response TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used);
+
+CREATE TABLE IF NOT EXISTS transcript_cache (
+    key TEXT PRIMARY KEY,
+    created_at TEXT,
+    last_used TEXT,
+    model TEXT,
+    size_bytes INTEGER,
+    hits INTEGER DEFAULT 0,
+    words_json TEXT,
+    segments_json TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_transcript_cache_last_used ON transcript_cache (last_used);
+
+CREATE TABLE IF NOT EXISTS caption_rewrite_cache (
+    key TEXT PRIMARY KEY,
+    created_at TEXT,
+    rewrite TEXT
+);
+
 CREATE TABLE IF NOT EXISTS watch_pending (
     batch_id TEXT PRIMARY KEY,
     source_file TEXT,
@@ -5,6 +5,8 @@ import random
 from pathlib import Path
 
 from .audio_mastering import build_audio_filter_complex
+from .caption_overlay import prerender_overlay
+from .cpu_budget import ffmpeg_lease, ffmpeg_threads
 from .ffmpeg_fallbacks import run_attempts
 from .utils import ffmpeg_filter_path, get_media_duration, run_subprocess
 
@@ -105,6 +107,7 @@ def build_video_filters(
     shake_strength: float,
     drift_strength: float,
     plugin_manager,
+    burn_subtitles: bool = True,
 ) -> str:
     subtitle_path = ffmpeg_filter_path(ass_path)
     fonts_dir_escaped = ffmpeg_filter_path(fonts_dir)
@@ -145,7 +148,8 @@ def build_video_filters(
 
     filters.append("setsar=1")
     filters = plugin_manager.apply_video_filters(filters, {"type": "video_filters"})
-    filters.append(f"subtitles='{subtitle_path}':fontsdir='{fonts_dir_escaped}'")
+    if burn_subtitles:
+        filters.append(f"subtitles='{subtitle_path}':fontsdir='{fonts_dir_escaped}'")
     return ",".join(filters)
 
 
@@ -275,6 +279,22 @@ def render_video(
                 sfx_indices.append((input_index, int(beat_time * 1000)))
                 input_index += 1
 
+    # Captions rasterized once per ASS revision and composited, instead of running
+    # libass again in every attempt; falls back to burning when prerendering fails.
+    encode_threads = ffmpeg_threads(settings)
+    overlay_path = None
+    overlay_index = None
+    if settings.CAPTION_OVERLAY_ENABLED:
+        try:
+            with ffmpeg_lease(settings, job_id=job_id):
+                overlay_path = prerender_overlay(settings, ass_path, render_duration, job_id=job_id)
+            args.extend(["-i", str(overlay_path)])
+            overlay_index = input_index
+            input_index += 1
+        except Exception as exc:
+            if log_cb:
+                log_cb(f"Caption overlay unavailable, burning subtitles instead: {exc}")
+
     vf = build_video_filters(
         ass_path,
         settings.FONTS_DIR,
@@ -284,6 +304,7 @@ def render_video(
         shake_strength,
         drift_strength,
         plugin_manager,
+        burn_subtitles=overlay_index is None,
     )
 
     filter_complex = _build_audio_filters(
@@ -305,18 +326,13 @@ def render_video(
         preset = "ultrafast"
         crf = "26"
 
-    args.extend(
-        [
-            "-t",
-            f"{render_duration:.2f}",
-            "-vf",
-            vf,
-            "-filter_complex",
-            filter_complex,
-            "-map",
-            "0:v:0",
-            "-map",
-            "[aout]",
+    subtitles_filter = (
+        f"subtitles='{ffmpeg_filter_path(ass_path)}':fontsdir='{ffmpeg_filter_path(settings.FONTS_DIR)}'"
+    )
+    lease = None
+
+    def _encode_args() -> list[str]:
+        return [
             "-c:v",
             "libx264",
             "-preset",
@@ -325,24 +341,39 @@ def render_video(
             crf,
             "-pix_fmt",
             "yuv420p",
+            "-threads",
+            str(lease.threads if lease is not None else encode_threads),
             "-c:a",
             "aac",
             "-b:a",
             "192k",
-            str(output_path),
         ]
-    )
-    def attempt_main() -> None:
-        run_subprocess(args, job_id=job_id)
 
-    vf_simple = ",".join(
-        [
-            "scale=1080:1920:force_original_aspect_ratio=increase",
-            "crop=1080:1920",
-            "setsar=1",
-            f"subtitles='{ffmpeg_filter_path(ass_path)}':fontsdir='{ffmpeg_filter_path(settings.FONTS_DIR)}'",
+    def _build_args_with_vf(vf_value: str, out_path: Path, with_overlay: bool = False) -> list[str]:
+        if with_overlay:
+            video_args = [
+                "-filter_complex",
+                f"[0:v]{vf_value}[vbase];[vbase][{overlay_index}:v]overlay=0:0:format=auto[vout];{filter_complex}",
+                "-map",
+                "[vout]",
+            ]
+        else:
+            video_args = ["-vf", vf_value, "-filter_complex", filter_complex, "-map", "0:v:0"]
+        return [
+            *args,
+            "-t",
+            f"{render_duration:.2f}",
+            *video_args,
+            "-map",
+            "[aout]",
+            *_encode_args(),
+            str(out_path),
         ]
-    )
+
+    use_overlay = overlay_index is not None
+
+    def attempt_main() -> None:
+        run_subprocess(_build_args_with_vf(vf, output_path, use_overlay), job_id=job_id)
 
     vf_plain = ",".join(
         [
@@ -351,16 +382,10 @@ def render_video(
             "setsar=1",
         ]
     )
-
-    def _build_args_with_vf(vf_value: str, out_path: Path) -> list[str]:
-        new_args = list(args)
-        vf_index = new_args.index("-vf") + 1
-        new_args[vf_index] = vf_value
-        new_args[-1] = str(out_path)
-        return new_args
+    vf_simple = vf_plain if use_overlay else f"{vf_plain},{subtitles_filter}"
 
     def attempt_simple() -> None:
-        run_subprocess(_build_args_with_vf(vf_simple, output_path), job_id=job_id)
+        run_subprocess(_build_args_with_vf(vf_simple, output_path, use_overlay), job_id=job_id)
 
     def attempt_plain() -> None:
         run_subprocess(_build_args_with_vf(vf_plain, output_path), job_id=job_id)
@@ -368,28 +393,31 @@ def render_video(
     def attempt_plain_then_subs() -> None:
         temp_path = output_path.parent / "render_plain.mp4"
         run_subprocess(_build_args_with_vf(vf_plain, temp_path), job_id=job_id)
-        burn_args = [
-            settings.FFMPEG_PATH,
-            "-y",
-            "-i",
-            str(temp_path),
-            "-vf",
-            f"subtitles='{ffmpeg_filter_path(ass_path)}':fontsdir='{ffmpeg_filter_path(settings.FONTS_DIR)}'",
-            "-c:v",
-            "libx264",
-            "-preset",
-            preset,
-            "-crf",
-            crf,
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "192k",
-            str(output_path),
-        ]
-        run_subprocess(burn_args, job_id=job_id)
+        if use_overlay:
+            burn_args = [
+                settings.FFMPEG_PATH,
+                "-y",
+                "-i",
+                str(temp_path),
+                "-i",
+                str(overlay_path),
+                "-filter_complex",
+                "[0:v][1:v]overlay=0:0:format=auto[vout]",
+                "-map",
+                "[vout]",
+                "-map",
+                "0:a?",
+            ]
+        else:
+            burn_args = [
+                settings.FFMPEG_PATH,
+                "-y",
+                "-i",
+                str(temp_path),
+                "-vf",
+                subtitles_filter,
+            ]
+        run_subprocess([*burn_args, *_encode_args(), str(output_path)], job_id=job_id)
 
     def attempt_fps_normalized() -> None:
         vf_fps = vf_plain + ",fps=30"
@@ -402,7 +430,12 @@ def render_video(
         ("plain_then_subs", attempt_plain_then_subs),
         ("fps_normalized", attempt_fps_normalized),
     ]
-    run_attempts(attempts, log_cb=log_cb)
+    # Encoders get only the cores leased to this render, so concurrent jobs and
+    # Whisper are not oversubscribed.
+    with ffmpeg_lease(settings, job_id=job_id) as lease:
+        if log_cb:
+            log_cb(f"FFmpeg CPU lease: {lease.threads} threads (waited {lease.wait_seconds:.2f}s)")
+        run_attempts(attempts, log_cb=log_cb)
 
 
 def render_thumbnails(
@@ -4,6 +4,7 @@ import json
 import zipfile
 from pathlib import Path
 
+from .json_grammar import PUBLISH_METADATA_SHAPE
 from .llm import generate_text
 
 
@@ -68,7 +69,7 @@ def _generate_publish_metadata(settings, title: str, hook: str, beats: list) ->
         "Return JSON: {\"description\":\"...\",\"hashtags\":[\"#tag\",\"#tag\"]}"
     )
     try:
-        raw = generate_text(settings, system, prompt, seed=None)
+        raw = generate_text(settings, system, prompt, seed=None, json_shape=PUBLISH_METADATA_SHAPE)
     except Exception:
         return {}
     start = raw.find("{")
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 from .db import get_connection
 from .hooks_pool import generate_hooks, score_hooks, select_top
-from .llm import generate_script
+from .llm import ScriptSession, generate_script, generate_script_batch
 from .models import GenerateRequest, ScriptOutput
 from .virality_score import estimate_virality
 from .automation.campaign_memory import get_memory, is_script_allowed
@@ -53,20 +54,25 @@ def generate_hook_pool(
         req.style,
         count,
         model_paths=model_paths,
+        seed=req.seed,
     )
+    payload = build_hook_pool(req, hooks)
+    save_hook_pool(settings, job_id, job_dir, payload)
+    if log_cb:
+        log_cb(f"Hook-first pool generated. Selected: {payload['selected']}")
+    return payload
+
+
+def build_hook_pool(req: GenerateRequest, hooks: List[str]) -> dict:
     scored = score_hooks(hooks, req.hook_selection_mode)
     top = select_top(scored, max(1, int(req.hook_pick)))
     selected = top[0]["text"] if top else (hooks[0] if hooks else "")
-    payload = {
+    return {
         "selected": selected,
         "hooks": scored,
         "top": top,
         "created_at": datetime.utcnow().isoformat(),
     }
-    save_hook_pool(settings, job_id, job_dir, payload)
-    if log_cb:
-        log_cb(f"Hook-first pool generated. Selected: {selected}")
-    return payload
 
 
 def save_hook_pool(settings, job_id: str, job_dir: Path, payload: dict) -> None:
@@ -91,7 +97,20 @@ def generate_script_candidates(
     selected_hook: str,
     model_paths: List[str],
     candidate_count: int,
+    log_cb=None,
 ) -> List[ScriptOutput]:
+    # Only transformers decodes candidates in one parallel pass; llama.cpp generates them one by one.
+    if settings.LLM_BATCH_CANDIDATES and settings.LLM_BACKEND == "transformers" and candidate_count > 1:
+        return generate_script_batch(
+            settings,
+            req,
+            template,
+            plugin_manager,
+            candidate_count,
+            model_paths=model_paths,
+            forced_hook=selected_hook,
+            log_cb=log_cb,
+        )
     scripts: List[ScriptOutput] = []
     for idx in range(candidate_count):
         req_copy = req.model_copy(deep=True)
@@ -104,6 +123,7 @@ def generate_script_candidates(
             plugin_manager,
             model_paths=model_paths,
             forced_hook=selected_hook,
+            log_cb=log_cb,
         )
         scripts.append(script)
     return scripts
@@ -143,9 +163,7 @@ def run_generation_strategy(
     model_paths: List[str],
     log_cb=None,
 ) -> Tuple[ScriptOutput, dict]:
-    meta: Dict[str, object] = {}
-    selected_hook = ""
-    hook_pool = None
+    started = time.time()
     memory = None
     campaign_id = None
     if req.series_context:
@@ -153,13 +171,94 @@ def run_generation_strategy(
     if campaign_id:
         memory = get_memory(settings, campaign_id)
 
+    script = None
+    meta: Dict[str, object] = {}
+    mode = "standard"
+    if _use_session(settings, req):
+        try:
+            script = _run_session(
+                settings, req, template, plugin_manager, job_id, job_dir, model_paths, memory, meta, log_cb
+            )
+            mode = "session"
+        except Exception as exc:
+            meta = {}
+            if log_cb:
+                log_cb(f"Session generation failed ({exc}); using separate calls.")
+    if script is None:
+        script = _run_standard(
+            settings, req, template, plugin_manager, job_id, job_dir, model_paths, memory, meta, log_cb
+        )
+    meta["script_stage"] = {"mode": mode, "seconds": round(time.time() - started, 3)}
+    return script, meta
+
+
+def _use_session(settings, req: GenerateRequest) -> bool:
+    return (
+        settings.LLM_SESSION_MODE
+        and req.hook_first_enabled
+        and req.candidate_selection_enabled
+        and settings.LLM_BACKEND == "llama_cpp"
+        and not settings.LLM_SERVER_ENABLED
+    )
+
+
+def _run_session(
+    settings,
+    req: GenerateRequest,
+    template,
+    plugin_manager,
+    job_id: str,
+    job_dir: Path,
+    model_paths: List[str],
+    memory: dict | None,
+    meta: Dict[str, object],
+    log_cb=None,
+) -> ScriptOutput:
+    candidate_count = max(1, int(req.script_candidate_count))
+    hook_count = max(1, int(req.hook_pool_size))
+    last_error: Exception | None = None
+    # Each routed model gets its own session, in the same order as the separate-call path.
+    for model_path in model_paths or [None]:
+        try:
+            with ScriptSession(
+                settings, req, template, plugin_manager, model_path=model_path, log_cb=log_cb
+            ) as session:
+                hook_pool = load_hook_pool(settings, job_id, job_dir)
+                if hook_pool:
+                    session.generate_hooks(
+                        hook_count, existing=[hook.get("text", "") for hook in hook_pool.get("hooks", [])]
+                    )
+                else:
+                    hook_pool = build_hook_pool(req, session.generate_hooks(hook_count))
+                    save_hook_pool(settings, job_id, job_dir, hook_pool)
+                    if log_cb:
+                        log_cb(f"Hook-first pool generated in session. Selected: {hook_pool['selected']}")
+                selected_hook = _apply_memory_to_hook_pool(settings, job_id, job_dir, hook_pool, memory)
+                meta["hook_pool"] = hook_pool
+                scripts = session.generate_scripts(selected_hook, candidate_count)
+        except Exception as exc:
+            last_error = exc
+            continue
+        return _choose_candidate(req, job_dir, scripts, memory, meta, candidate_count, log_cb)
+    raise RuntimeError(f"Session generation failed: {last_error}")
+
+
+def _run_standard(
+    settings,
+    req: GenerateRequest,
+    template,
+    plugin_manager,
+    job_id: str,
+    job_dir: Path,
+    model_paths: List[str],
+    memory: dict | None,
+    meta: Dict[str, object],
+    log_cb=None,
+) -> ScriptOutput:
+    selected_hook = ""
     if req.hook_first_enabled:
         hook_pool = generate_hook_pool(settings, req, job_id, job_dir, model_paths, log_cb=log_cb)
-        selected_hook = hook_pool.get("selected", "")
-        if memory:
-            selected_hook = _select_hook_with_memory(hook_pool, memory, fallback=selected_hook)
-            hook_pool["selected"] = selected_hook
-            save_hook_pool(settings, job_id, job_dir, hook_pool)
+        selected_hook = _apply_memory_to_hook_pool(settings, job_id, job_dir, hook_pool, memory)
         meta["hook_pool"] = hook_pool
 
     if req.candidate_selection_enabled:
@@ -172,24 +271,9 @@ def run_generation_strategy(
             selected_hook,
             model_paths,
             candidate_count,
+            log_cb=log_cb,
         )
-        if memory:
-            allowed = [script for script in scripts if is_script_allowed(memory, script)]
-            if allowed:
-                scripts = allowed
-            else:
-                meta["candidate_violations"] = "All candidates violated campaign memory"
-        candidates_dir = job_dir / "candidates"
-        ensure_dir(candidates_dir)
-        for idx, script in enumerate(scripts, start=1):
-            out_dir = candidates_dir / f"candidate_{idx:02d}"
-            ensure_dir(out_dir)
-            write_json(out_dir / "script.json", script.model_dump())
-        chosen, selection_meta = select_best_candidate(scripts, req.duration_seconds)
-        meta["candidate_selection"] = selection_meta
-        if log_cb:
-            log_cb(f"Selected candidate {selection_meta['selected_index']} of {candidate_count}.")
-        return chosen, meta
+        return _choose_candidate(req, job_dir, scripts, memory, meta, candidate_count, log_cb)
 
     attempts = 0
     script = None
@@ -202,6 +286,7 @@ def run_generation_strategy(
             plugin_manager,
             model_paths=model_paths,
             forced_hook=selected_hook if req.hook_first_enabled else None,
+            log_cb=log_cb,
         )
         if not memory or is_script_allowed(memory, script):
             break
@@ -211,7 +296,46 @@ def run_generation_strategy(
         meta["candidate_violations"] = "Generated script violated campaign memory"
     if script is None:
         raise ValueError("Failed to generate script")
-    return script, meta
+    return script
+
+
+def _apply_memory_to_hook_pool(
+    settings, job_id: str, job_dir: Path, hook_pool: dict, memory: dict | None
+) -> str:
+    selected_hook = hook_pool.get("selected", "")
+    if memory:
+        selected_hook = _select_hook_with_memory(hook_pool, memory, fallback=selected_hook)
+        hook_pool["selected"] = selected_hook
+        save_hook_pool(settings, job_id, job_dir, hook_pool)
+    return selected_hook
+
+
+def _choose_candidate(
+    req: GenerateRequest,
+    job_dir: Path,
+    scripts: List[ScriptOutput],
+    memory: dict | None,
+    meta: Dict[str, object],
+    candidate_count: int,
+    log_cb=None,
+) -> ScriptOutput:
+    if memory:
+        allowed = [script for script in scripts if is_script_allowed(memory, script)]
+        if allowed:
+            scripts = allowed
+        else:
+            meta["candidate_violations"] = "All candidates violated campaign memory"
+    candidates_dir = job_dir / "candidates"
+    ensure_dir(candidates_dir)
+    for idx, script in enumerate(scripts, start=1):
+        out_dir = candidates_dir / f"candidate_{idx:02d}"
+        ensure_dir(out_dir)
+        write_json(out_dir / "script.json", script.model_dump())
+    chosen, selection_meta = select_best_candidate(scripts, req.duration_seconds)
+    meta["candidate_selection"] = selection_meta
+    if log_cb:
+        log_cb(f"Selected candidate {selection_meta['selected_index']} of {candidate_count}.")
+    return chosen
 
 
 def _select_hook_with_memory(hook_pool: dict, memory: dict, fallback: str) -> str:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 from typing import List, Tuple
 
+from .json_grammar import HOOKS_SHAPE
 from .llm import generate_text
 from .metrics import score_hook
 
@@ -13,6 +14,7 @@ def generate_hooks(
     style: str,
     count: int,
     model_paths: List[str] | None = None,
+    seed: int | None = None,
 ) -> List[dict]:
     system = "You generate short punchy hooks. Return strict JSON only."
     prompt = (
@@ -21,7 +23,7 @@ def generate_hooks(
         f"Generate {count} hook ideas.\n"
         "Return JSON: {\"hooks\": [\"...\", \"...\"]}"
     )
-    raw = generate_text(settings, system, prompt, seed=None, model_paths=model_paths)
+    raw = generate_text(settings, system, prompt, seed=seed, model_paths=model_paths, json_shape=HOOKS_SHAPE)
     payload = _extract_json(raw)
     hooks = [str(item).strip() for item in payload.get("hooks", []) if str(item).strip()]
     return hooks[:count]
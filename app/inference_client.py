@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+_START_TIMEOUT_SECONDS = 60.0
+# When the server last failed to start or died; no respawn until the breaker cooldown passes.
+_FAILED_AT: float | None = None
+
+
+class InferenceServerError(RuntimeError):
+    pass
+
+
+class InferenceServerUnavailable(InferenceServerError):
+    """The server is not running or could not be reached; callers generate in-process."""
+
+
+class InferenceServerTimeout(InferenceServerError):
+    """The server is alive but did not answer in time; the request was cancelled there."""
+
+
+def forwarded_env() -> Dict[str, str]:
+    """LLM settings as they are now in this process, including runtime /config changes."""
+    from .inference_server import FORWARDED_ENV_PREFIXES
+
+    return {key: value for key, value in os.environ.items() if key.startswith(FORWARDED_ENV_PREFIXES)}
+
+
+class InferenceClient:
+    """Connection to the inference server process, shared by all job threads."""
+
+    def __init__(self, settings) -> None:
+        from multiprocessing.connection import Client
+
+        from .inference_server import serve
+
+        authkey = secrets.token_bytes(32)
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        self._process = ctx.Process(
+            target=serve,
+            args=(settings.LLM_SERVER_PORT, authkey, child_conn),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        if not parent_conn.poll(_START_TIMEOUT_SECONDS):
+            self._process.terminate()
+            raise InferenceServerUnavailable("Inference server did not start in time")
+        address = parent_conn.recv()
+        parent_conn.close()
+
+        self._conn = Client(address, authkey=authkey)
+        self._timeout = settings.LLM_SERVER_TIMEOUT_SECONDS
+        self._send_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._progress: Dict[int, Callable[[str], None]] = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self._process.is_alive()
+
+    def generate(
+        self,
+        backend: str,
+        system_prompt: str,
+        prompt: str,
+        seeds: List[int | None],
+        model_path: str | None = None,
+        prefix: Any = None,
+        json_shape: Any = None,
+        log_cb=None,
+    ) -> Dict[str, Any]:
+        request = {
+            "backend": backend,
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            "seeds": list(seeds),
+            "model_path": model_path,
+            "prefix": prefix,
+            "json_shape": json_shape,
+        }
+        return self._call("generate", progress=log_cb, request=request, env=forwarded_env())
+
+    def stats(self) -> Dict[str, object]:
+        return self._call("stats")
+
+    def evict(self, backend: str | None = None) -> int:
+        return int(self._call("evict", backend=backend))
+
+    def close(self) -> None:
+        self._closed = True
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=5)
+
+    def _call(self, op: str, progress: Callable[[str], None] | None = None, **payload):
+        if not self.alive:
+            raise InferenceServerUnavailable("Inference server is not running")
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+            if progress is not None:
+                self._progress[request_id] = progress
+        try:
+            try:
+                with self._send_lock:
+                    self._conn.send({"id": request_id, "op": op, **payload})
+            except Exception as exc:
+                raise InferenceServerUnavailable(f"Failed to reach inference server: {exc}") from exc
+            try:
+                return future.result(timeout=self._timeout if self._timeout > 0 else None)
+            except FutureTimeout:
+                self._cancel(request_id)
+                raise InferenceServerTimeout(
+                    f"Inference server did not answer within {self._timeout:.0f}s"
+                ) from None
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+                self._progress.pop(request_id, None)
+
+    def _cancel(self, request_id: int) -> None:
+        """Drop a request on the server; a group already decoding finishes, but its reply is discarded."""
+        try:
+            with self._send_lock:
+                self._conn.send({"id": next(self._ids), "op": "cancel", "target": request_id})
+        except Exception:
+            pass
+
+    def _read_loop(self) -> None:
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            if "progress" in message:
+                with self._pending_lock:
+                    progress = self._progress.get(message.get("id"))
+                if progress is not None:
+                    try:
+                        progress(message["progress"])
+                    except Exception:
+                        pass
+                continue
+            with self._pending_lock:
+                future = self._pending.pop(message.get("id"), None)
+            if future is None:
+                continue
+            if message.get("ok"):
+                future.set_result(message.get("result"))
+            else:
+                future.set_exception(InferenceServerError(message.get("error", "Inference failed")))
+        self._closed = True
+        # Callers fall back to in-process generation, so the server must not keep decoding.
+        if self._process.is_alive():
+            self._process.terminate()
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._progress.clear()
+        for future in pending:
+            future.set_exception(InferenceServerUnavailable("Inference server connection closed"))
+
+
+def get_client(settings) -> InferenceClient:
+    global _CLIENT, _FAILED_AT
+    with _CLIENT_LOCK:
+        if _CLIENT is None or not _CLIENT.alive:
+            if _CLIENT is not None:
+                _CLIENT.close()
+                _CLIENT = None
+                _FAILED_AT = time.time()
+            cooldown = settings.LLM_BREAKER_BASE_SECONDS
+            if _FAILED_AT is not None and time.time() - _FAILED_AT < cooldown:
+                raise InferenceServerUnavailable(
+                    f"Inference server failed {time.time() - _FAILED_AT:.0f}s ago; retrying after {cooldown:.0f}s"
+                )
+            try:
+                _CLIENT = InferenceClient(settings)
+            except InferenceServerError:
+                _FAILED_AT = time.time()
+                raise
+            except Exception as exc:
+                _FAILED_AT = time.time()
+                raise InferenceServerUnavailable(f"Failed to start inference server: {exc}") from exc
+            _FAILED_AT = None
+        return _CLIENT
+
+
+def shutdown_client() -> None:
+    global _CLIENT, _FAILED_AT
+    with _CLIENT_LOCK:
+        client = _CLIENT
+        _CLIENT = None
+        _FAILED_AT = None
+    if client is not None:
+        client.close()
+
+
+def client_stats() -> Dict[str, object]:
+    with _CLIENT_LOCK:
+        client = _CLIENT
+    if client is None or not client.alive:
+        return {}
+    try:
+        return client.stats()
+    except Exception:
+        return {}
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Settings the app forwards with every request, so runtime /config changes reach the server.
+FORWARDED_ENV_PREFIXES = ("LLM_", "MODELS_DIR")
+# Sequences decoded in one batch; larger groups are split.
+MAX_BATCH_SEQUENCES = 16
+
+_ENV_LOCK = threading.Lock()
+
+
+@dataclass
+class InferenceRequest:
+    backend: str
+    system_prompt: str
+    prompt: str
+    seeds: List[int | None]
+    model_path: str | None = None
+    prefix: Any = None
+    json_shape: Any = None
+    progress: Callable[[str], None] | None = None
+    future: Future = field(default_factory=Future)
+    queued_at: float = field(default_factory=time.time)
+
+    def group_key(self) -> Tuple:
+        return (self.backend, self.model_path or "", json.dumps(self.json_shape, sort_keys=True))
+
+
+class BatchScheduler:
+    """Collects requests from all connections and runs them in merged batches.
+
+    Requests that arrive within the batch window and target the same backend,
+    model and JSON shape form one group, whatever their prompts. On transformers a
+    group is decoded as one padded batch. llama.cpp has no multi-sequence decoding
+    here: a group's sequences run one after another on a single borrowed instance,
+    so merging only saves the pool round trips and lets shared prefixes reuse the
+    KV cache. Groups for different models run in parallel.
+    """
+
+    def __init__(self, settings, window_seconds: float, workers: int) -> None:
+        self.settings = settings
+        self.window_seconds = max(0.0, window_seconds)
+        self._queue: "queue.Queue[InferenceRequest | None]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.requests = 0
+        self.batches = 0
+        self.merged = 0
+        self.queue_wait_seconds = 0.0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._executor.shutdown(wait=False)
+
+    def submit(self, request: InferenceRequest) -> Future:
+        with self._lock:
+            self.requests += 1
+        self._queue.put(request)
+        return request.future
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "merged_requests": self.merged,
+                "pending": self._queue.qsize(),
+                "queue_wait_seconds": round(self.queue_wait_seconds, 3),
+                "window_ms": int(self.window_seconds * 1000),
+            }
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = [first]
+            deadline = time.time() + self.window_seconds
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                pending.append(item)
+
+            groups: Dict[Tuple, List[List[InferenceRequest]]] = {}
+            for request in pending:
+                chunks = groups.setdefault(request.group_key(), [[]])
+                if chunks[-1] and sum(len(r.seeds) for r in chunks[-1]) + len(request.seeds) > MAX_BATCH_SEQUENCES:
+                    chunks.append([])
+                chunks[-1].append(request)
+            for chunks in groups.values():
+                for group in chunks:
+                    self._executor.submit(self._run_group, group)
+
+    def _run_group(self, group: List[InferenceRequest]) -> None:
+        from .llm import GenerationItem, _generate_items, last_generation_timings
+
+        # Requests the client gave up on before their group started are not decoded;
+        # once running, a request can no longer be cancelled and its reply is ignored.
+        group = [request for request in group if request.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        started = time.time()
+        items = [
+            GenerationItem(system_prompt=request.system_prompt, prompt=request.prompt, seed=seed, prefix=request.prefix)
+            for request in group
+            for seed in request.seeds
+        ]
+        head = group[0]
+        with self._lock:
+            self.batches += 1
+            self.merged += len(group) - 1
+            self.queue_wait_seconds += sum(started - request.queued_at for request in group)
+
+        def progress(message: str) -> None:
+            for request in group:
+                if request.progress is not None:
+                    request.progress(message)
+
+        try:
+            outputs = _generate_items(
+                self.settings,
+                head.backend,
+                items,
+                model_path=head.model_path,
+                json_shape=head.json_shape,
+                log_cb=progress,
+            )
+        except Exception as exc:
+            for request in group:
+                request.future.set_exception(exc)
+            return
+        timings = last_generation_timings()
+        offset = 0
+        for request in group:
+            count = len(request.seeds)
+            request.future.set_result({"outputs": outputs[offset : offset + count], "timings": timings})
+            offset += count
+
+
+def _apply_env(env: Dict[str, str] | None) -> None:
+    """Mirror the app's LLM settings; the server itself never forwards to a server."""
+    if env is None:
+        return
+    with _ENV_LOCK:
+        for key in [key for key in os.environ if key.startswith(FORWARDED_ENV_PREFIXES)]:
+            if key not in env:
+                os.environ.pop(key, None)
+        os.environ.update(env)
+        os.environ["LLM_SERVER_ENABLED"] = "false"
+
+
+def _handle_connection(conn, scheduler: BatchScheduler) -> None:
+    from .llm import evict_models
+
+    send_lock = threading.Lock()
+
+    def reply(request_id: int, payload: Dict[str, object]) -> None:
+        with send_lock:
+            try:
+                conn.send({"id": request_id, **payload})
+            except Exception:
+                pass
+
+    requests: Dict[int, InferenceRequest] = {}
+
+    def on_done(request_id: int, future: Future) -> None:
+        requests.pop(request_id, None)
+        if future.cancelled():
+            # The client stopped waiting for this one.
+            return
+        error = future.exception()
+        if error is not None:
+            reply(request_id, {"ok": False, "error": f"{type(error).__name__}: {error}"})
+        else:
+            reply(request_id, {"ok": True, "result": future.result()})
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        request_id = message.get("id", 0)
+        op = message.get("op")
+        if op == "generate":
+            _apply_env(message.get("env"))
+            request = InferenceRequest(
+                **message["request"],
+                progress=lambda text, rid=request_id: reply(rid, {"progress": text}),
+            )
+            requests[request_id] = request
+            future = scheduler.submit(request)
+            future.add_done_callback(lambda fut, rid=request_id: on_done(rid, fut))
+        elif op == "cancel":
+            target = requests.get(message.get("target"))
+            cancelled = target is not None and target.future.cancel()
+            reply(request_id, {"ok": True, "result": cancelled})
+        elif op == "stats":
+            reply(request_id, {"ok": True, "result": scheduler.stats()})
+        elif op == "evict":
+            removed = evict_models(scheduler.settings, message.get("backend"))
+            reply(request_id, {"ok": True, "result": removed})
+        else:
+            reply(request_id, {"ok": False, "error": f"Unknown op '{op}'"})
+    conn.close()
+
+
+def serve(port: int, authkey: bytes, ready_conn=None) -> None:
+    from multiprocessing.connection import Listener
+
+    # The server does the generation itself; it must never forward to a server.
+    os.environ["LLM_SERVER_ENABLED"] = "false"
+
+    from .config import Settings
+
+    settings = Settings()
+    scheduler = BatchScheduler(
+        settings,
+        settings.LLM_SERVER_BATCH_WINDOW_MS / 1000.0,
+        settings.LLM_POOL_MAX_MODELS,
+    )
+    scheduler.start()
+    listener = Listener(("127.0.0.1", port), authkey=authkey)
+    if ready_conn is not None:
+        ready_conn.send(listener.address)
+        ready_conn.close()
+    try:
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_handle_connection, args=(conn, scheduler), daemon=True).start()
+    finally:
+        scheduler.stop()
+        listener.close()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict
+
+HOOKS_SHAPE = {"hooks": ["string"]}
+CANDIDATES_SHAPE = {"candidates": ["string"]}
+LINES_SHAPE = {"lines": ["string"]}
+VARIANTS_SHAPE = {"hooks": ["string"], "titles": ["string"]}
+PUBLISH_METADATA_SHAPE = {"description": "string", "hashtags": ["string"]}
+
+_TYPE_NAMES = {
+    "string": "string",
+    "str": "string",
+    "float": "number",
+    "number": "number",
+    "int": "integer",
+    "integer": "integer",
+    "bool": "boolean",
+    "boolean": "boolean",
+}
+
+_GBNF_CACHE: Dict[str, str] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def example_to_json_schema(example: Any) -> Dict[str, Any]:
+    if isinstance(example, dict):
+        properties = {str(key): example_to_json_schema(value) for key, value in example.items()}
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": list(properties.keys()),
+            "additionalProperties": False,
+        }
+    if isinstance(example, list):
+        items = example_to_json_schema(example[0]) if example else {"type": "string"}
+        return {"type": "array", "items": items}
+    if isinstance(example, bool):
+        return {"type": "boolean"}
+    if isinstance(example, int):
+        return {"type": "integer"}
+    if isinstance(example, float):
+        return {"type": "number"}
+    if isinstance(example, str):
+        return {"type": _TYPE_NAMES.get(example.strip().lower(), "string")}
+    return {"type": "string"}
+
+
+def compile_gbnf(shape: Any) -> str:
+    cache_key = json.dumps(shape, sort_keys=True)
+    with _CACHE_LOCK:
+        cached = _GBNF_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    from llama_cpp.llama_grammar import json_schema_to_gbnf
+
+    schema = example_to_json_schema(shape)
+    prop_order = list(shape.keys()) if isinstance(shape, dict) else None
+    gbnf = json_schema_to_gbnf(json.dumps(schema), prop_order=prop_order)
+    with _CACHE_LOCK:
+        _GBNF_CACHE[cache_key] = gbnf
+    return gbnf
+
+
+def build_grammar(shape: Any):
+    from llama_cpp import LlamaGrammar
+
+    # Grammar objects carry parse state, so each generation gets a fresh one
+    # built from the cached GBNF text.
+    return LlamaGrammar.from_string(compile_gbnf(shape), verbose=False)
@@ -1,31 +1,71 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
 
+from . import llm_cache
+from .inference_client import InferenceServerUnavailable, get_client
+from .json_grammar import HOOKS_SHAPE, build_grammar
+from .model_ops.health import CircuitOpenError, get_health
+from .model_ops.pool import get_pool, model_size_bytes
+from .model_ops.prefix_cache import PrefixState, get_prefix_cache
 from .models import GenerateRequest, ScriptBeat, ScriptOutput
 from .template_manager import Template
 
+_TIMINGS = threading.local()
+# Longest wait for the next streamed token (prompt processing included) before giving up.
+_STREAM_TOKEN_TIMEOUT_SECONDS = 300.0
 
-def _build_user_prompt(req: GenerateRequest, template: Template, forced_hook: str | None = None) -> str:
+
+@dataclass
+class PromptPrefix:
+    name: str
+    version: float
+    text: str
+
+
+@dataclass
+class GenerationItem:
+    system_prompt: str
+    prompt: str
+    seed: int | None
+    prefix: PromptPrefix | None = None
+
+
+def _build_prompt_prefix(template: Template) -> str:
     schema = json.dumps(template.schema, indent=2)
     beat_rules = template.beat_rules
+    return (
+        "Write a short vertical video script with 1-3 second beats.\n"
+        f"Style: {template.style}\n"
+        f"Beat rules: {beat_rules}\n\n"
+        "Output strict JSON in the exact schema:\n"
+        f"{schema}\n\n"
+    )
+
+
+def _script_prefix(template: Template) -> PromptPrefix:
+    return PromptPrefix(name=template.name, version=template.mtime, text=_build_prompt_prefix(template))
+
+
+def _build_user_prompt(req: GenerateRequest, template: Template, forced_hook: str | None = None) -> str:
     series_context = ""
     if req.series_context:
         series_context = f"Series context: {json.dumps(req.series_context)}\n"
     hook_constraint = ""
     if forced_hook:
         hook_constraint = f"Hook constraint (must use verbatim): {forced_hook}\n"
+    # The template-only prefix comes first so its KV state can be cached and reused.
     return (
-        "Write a short vertical video script with 1-3 second beats.\n"
+        f"{_build_prompt_prefix(template)}"
         f"Topic: {req.topic_prompt}\n"
-        f"Style: {template.style}\n"
         f"Target duration: {req.duration_seconds} seconds.\n"
         f"{series_context}"
         f"{hook_constraint}"
-        f"Beat rules: {beat_rules}\n\n"
-        "Output strict JSON in the exact schema:\n"
-        f"{schema}\n\n"
         "Ensure beats are 1-3 seconds apart and return ONLY JSON."
     )
 
@@ -39,54 +79,730 @@ def _extract_json(raw: str) -> Dict[str, Any]:
     return json.loads(payload)
 
 
-def _generate_llama_cpp(
-    settings, system_prompt: str, prompt: str, seed: int | None, model_path: str | None = None
-) -> str:
-    from llama_cpp import Llama
+class JsonObjectTracker:
+    """Detects when the first top-level JSON object in a text stream is closed."""
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+        self.complete = False
+        self.end = -1
+        self._seen = 0
+
+    def feed(self, text: str) -> bool:
+        for char in text:
+            if self.complete:
+                break
+            self._seen += 1
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+            if char == '"' and self.started:
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    self.end = self._seen
+        return self.complete
+
+
+class GenerationProgress:
+    def __init__(self, log_cb, interval_seconds: float, label: str = "LLM") -> None:
+        self.log_cb = log_cb
+        self.interval_seconds = max(0.0, interval_seconds)
+        self.label = label
+        self.start = time.time()
+        self._last_emit = self.start
 
+    def tick(self, tokens: int) -> None:
+        if not self.log_cb:
+            return
+        now = time.time()
+        if now - self._last_emit < self.interval_seconds:
+            return
+        self._last_emit = now
+        self.log_cb(f"{self.label}: {tokens} tokens ({self._rate(tokens, now):.1f} tok/s)")
+
+    def finish(self, tokens: int, stopped_early: bool) -> None:
+        if not self.log_cb:
+            return
+        now = time.time()
+        suffix = ", stopped at closed JSON" if stopped_early else ""
+        self.log_cb(
+            f"{self.label}: done, {tokens} tokens in {now - self.start:.1f}s "
+            f"({self._rate(tokens, now):.1f} tok/s{suffix})"
+        )
+
+    def _rate(self, tokens: int, now: float) -> float:
+        elapsed = now - self.start
+        return tokens / elapsed if elapsed > 0 else 0.0
+
+
+@dataclass
+class TransformersEngine:
+    tokenizer: Any
+    model: Any
+
+    def close(self) -> None:
+        self.model = None
+        self.tokenizer = None
+        try:
+            import torch  # type: ignore
+
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except Exception:
+            pass
+
+
+def _backends(settings) -> list[str]:
+    backends = [settings.LLM_BACKEND]
+    if settings.LLM_BACKEND == "llama_cpp":
+        backends.append("transformers")
+    return backends
+
+
+def _record_timings(
+    backend: str, load_seconds: float, generate_seconds: float, tokens: int, cached: bool = False
+) -> None:
+    _TIMINGS.last = {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 3),
+        "generate_seconds": round(generate_seconds, 3),
+        "tokens": tokens,
+        "cached": cached,
+    }
+
+
+def last_generation_timings() -> Dict[str, Any]:
+    return dict(getattr(_TIMINGS, "last", {}) or {})
+
+
+def _apply_torch_threads(threads: int) -> None:
+    if threads <= 0:
+        return
+    try:
+        import torch  # type: ignore
+
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+    except Exception:
+        pass
+
+
+def _llama_key(settings, model_path: str | None = None) -> tuple[str, int, int]:
     resolved = model_path or settings.resolve_llm_model_path()
     if not resolved:
         raise ValueError("LLM model not found. Set LLM_MODEL_PATH or place a .gguf in models/llm.")
+    return (str(resolved), settings.LLM_CTX, settings.LLM_N_GPU_LAYERS)
 
-    llm = Llama(
-        model_path=str(resolved),
-        n_ctx=settings.LLM_CTX,
-        n_gpu_layers=settings.LLM_N_GPU_LAYERS,
-    )
-    response = llm.create_chat_completion(
+
+def _borrow_llama(settings, model_path: str | None = None, loaded: dict | None = None):
+    key = _llama_key(settings, model_path)
+    resolved_str, n_ctx, n_gpu_layers = key
+
+    def loader():
+        from llama_cpp import Llama
+
+        start = time.time()
+        llm = Llama(model_path=resolved_str, n_ctx=n_ctx, n_gpu_layers=n_gpu_layers)
+        if loaded is not None:
+            loaded["seconds"] = time.time() - start
+        return llm
+
+    return get_pool(settings).borrow(key, loader, model_size_bytes(resolved_str))
+
+
+def _prefix_tokens(llm, system_prompt: str, prefix: PromptPrefix) -> List[int] | None:
+    """Tokens of the chat-formatted prompt up to the end of the template prefix.
+
+    Rendered with the model's own chat template; None when it has none. If the
+    rendering differs from what the chat handler produces, llama.cpp simply matches
+    a shorter common prefix, so this only costs the reuse, never correctness.
+    """
+    from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+
+    template = (getattr(llm, "metadata", None) or {}).get("tokenizer.chat_template")
+    if not template:
+        return None
+    bos = llm.detokenize([llm.token_bos()], special=True).decode("utf-8", "ignore")
+    eos = llm.detokenize([llm.token_eos()], special=True).decode("utf-8", "ignore")
+    rendered = Jinja2ChatFormatter(template=template, eos_token=eos, bos_token=bos)(
         messages=[
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=settings.LLM_TEMPERATURE,
-        max_tokens=settings.LLM_MAX_TOKENS,
-        seed=seed,
-    )
-    return response["choices"][0]["message"]["content"]
+            {"role": "user", "content": prefix.text},
+        ]
+    ).prompt
+    end = rendered.find(prefix.text)
+    if end == -1:
+        return None
+    text = rendered[: end + len(prefix.text)]
+    tokens = llm.tokenize(text.encode("utf-8"), add_bos=not (bos and text.startswith(bos)), special=True)
+    # The last token could merge with the topic text that follows; leave it to the suffix.
+    return list(tokens[:-1]) or None
 
 
-def _generate_transformers(
-    settings, system_prompt: str, prompt: str, model_path: str | None = None
-) -> str:
-    from transformers import AutoModelForCausalLM, AutoTokenizer
+def _restore_prefix_state(settings, llm, model_key: tuple, system_prompt: str, prefix: PromptPrefix) -> None:
+    cache = get_prefix_cache(settings)
+    if not cache.enabled:
+        return
+    key = (*model_key, prefix.name, prefix.version)
+    try:
+        cached = cache.get(key)
+        if cached is None:
+            tokens = _prefix_tokens(llm, system_prompt, prefix)
+            if not tokens:
+                return
+            # Evaluate only the fixed template prefix, with no reply or end-of-turn
+            # token after it, so the saved state is a clean prefix of every prompt.
+            llm.reset()
+            llm.eval(tokens)
+            cache.put(key, PrefixState(tokens=tokens, state=llm.save_state()))
+            return
+        count = len(cached.tokens)
+        if llm.n_tokens >= count and list(llm.input_ids[:count]) == cached.tokens:
+            # The KV cache already extends the prefix (e.g. the previous call used this
+            # template); loading would throw away the longer match llama.cpp has.
+            return
+        llm.load_state(cached.state)
+    except Exception:
+        return
 
+
+def _borrow_transformers(settings, model_path: str | None = None, loaded: dict | None = None):
     resolved = model_path or settings.LLM_MODEL_PATH
     if not resolved:
         raise ValueError("LLM_MODEL_PATH is required for transformers backend")
 
-    tokenizer = AutoTokenizer.from_pretrained(resolved)
-    model = AutoModelForCausalLM.from_pretrained(
-        resolved, device_map="auto"
-    )
-    full_prompt = f"{system_prompt}\n\n{prompt}"
-    inputs = tokenizer(full_prompt, return_tensors="pt").to(model.device)
-    outputs = model.generate(
-        **inputs,
-        max_new_tokens=settings.LLM_MAX_TOKENS,
-        temperature=settings.LLM_TEMPERATURE,
-        do_sample=True,
+    resolved_str = str(resolved)
+    _apply_torch_threads(settings.LLM_TORCH_THREADS)
+
+    def loader():
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        start = time.time()
+        tokenizer = AutoTokenizer.from_pretrained(resolved_str)
+        # Batches of different prompts are left-padded so every row ends at its prompt.
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        model = AutoModelForCausalLM.from_pretrained(resolved_str, device_map="auto")
+        model.eval()
+        if loaded is not None:
+            loaded["seconds"] = time.time() - start
+        return TransformersEngine(tokenizer=tokenizer, model=model)
+
+    key = (resolved_str, 0, 0)
+    return get_pool(settings, "transformers").borrow(key, loader, model_size_bytes(resolved_str))
+
+
+def _generate_llama_cpp(
+    settings,
+    system_prompt: str,
+    prompt: str,
+    seed: int | None,
+    model_path: str | None = None,
+    prefix: PromptPrefix | None = None,
+    json_shape: Any = None,
+    log_cb=None,
+) -> str:
+    item = GenerationItem(system_prompt=system_prompt, prompt=prompt, seed=seed, prefix=prefix)
+    return _generate_llama_cpp_items(settings, [item], model_path=model_path, json_shape=json_shape, log_cb=log_cb)[0]
+
+
+def _generate_llama_cpp_items(
+    settings,
+    items: List[GenerationItem],
+    model_path: str | None = None,
+    json_shape: Any = None,
+    log_cb=None,
+) -> List[str]:
+    """Generate each item in turn on one borrowed instance.
+
+    llama.cpp decodes one sequence at a time here; sharing the borrow only saves
+    the pool round trips and lets items with a common prompt prefix reuse its KV.
+    """
+    loaded: dict = {}
+    outputs: List[str] = []
+    tokens = 0
+    with _borrow_llama(settings, model_path, loaded) as llm:
+        start = time.time()
+        for idx, item in enumerate(items, start=1):
+            if item.prefix is not None:
+                _restore_prefix_state(
+                    settings, llm, _llama_key(settings, model_path), item.system_prompt, item.prefix
+                )
+            messages = [
+                {"role": "system", "content": item.system_prompt},
+                {"role": "user", "content": item.prompt},
+            ]
+            label = f"LLM {idx}/{len(items)}" if len(items) > 1 else "LLM"
+            text, used = _llama_chat(settings, llm, messages, item.seed, json_shape, label, log_cb)
+            tokens += used
+            outputs.append(text)
+        elapsed = time.time() - start
+    _record_timings("llama_cpp", loaded.get("seconds", 0.0), elapsed, tokens)
+    return outputs
+
+
+def _json_grammar(settings, json_shape: Any):
+    if json_shape is None or not settings.LLM_CONSTRAINED_JSON:
+        return None
+    try:
+        return build_grammar(json_shape)
+    except Exception:
+        return None
+
+
+def _stream_llama_cpp(llm, progress: GenerationProgress, stop_on_json: bool, **kwargs) -> tuple[str, int]:
+    tracker = JsonObjectTracker() if stop_on_json else None
+    parts: List[str] = []
+    tokens = 0
+    stream = llm.create_chat_completion(stream=True, **kwargs)
+    try:
+        for chunk in stream:
+            delta = (chunk["choices"][0].get("delta") or {}).get("content") or ""
+            if not delta:
+                continue
+            tokens += 1
+            parts.append(delta)
+            progress.tick(tokens)
+            # Leaving the loop closes the generator, which stops llama.cpp decoding.
+            if tracker is not None and tracker.feed(delta):
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if callable(close):
+            close()
+    text = "".join(parts)
+    stopped_early = tracker is not None and tracker.complete
+    if stopped_early:
+        text = text[: tracker.end]
+    progress.finish(tokens, stopped_early)
+    return text, tokens
+
+
+def _llama_chat(
+    settings,
+    llm,
+    messages: List[Dict[str, str]],
+    seed: int | None,
+    json_shape: Any = None,
+    label: str = "LLM",
+    log_cb=None,
+) -> tuple[str, int]:
+    request = {
+        "messages": messages,
+        "temperature": settings.LLM_TEMPERATURE,
+        "max_tokens": settings.LLM_MAX_TOKENS,
+        "seed": seed,
+        "grammar": _json_grammar(settings, json_shape),
+    }
+    if settings.LLM_STREAMING:
+        progress = GenerationProgress(log_cb, settings.LLM_PROGRESS_INTERVAL_SECONDS, label)
+        return _stream_llama_cpp(llm, progress, json_shape is not None, **request)
+    response = llm.create_chat_completion(**request)
+    tokens = int((response.get("usage") or {}).get("completion_tokens") or 0)
+    return response["choices"][0]["message"]["content"], tokens
+
+
+def _generate_transformers(
+    settings,
+    system_prompt: str,
+    prompt: str,
+    model_path: str | None = None,
+    stop_on_json: bool = False,
+    log_cb=None,
+) -> str:
+    if not settings.LLM_STREAMING:
+        return _generate_transformers_batch(
+            settings, [_transformers_prompt(system_prompt, prompt)], [None], model_path=model_path
+        )[0]
+    return _stream_transformers(settings, system_prompt, prompt, model_path, stop_on_json, log_cb)
+
+
+def _stream_transformers(
+    settings,
+    system_prompt: str,
+    prompt: str,
+    model_path: str | None,
+    stop_on_json: bool,
+    log_cb=None,
+) -> str:
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+    stop = threading.Event()
+    counter = {"tokens": 0}
+
+    class _StopWhenDone(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            counter["tokens"] += 1
+            return stop.is_set()
+
+    loaded: dict = {}
+    tracker = JsonObjectTracker() if stop_on_json else None
+    parts: List[str] = []
+    with _borrow_transformers(settings, model_path, loaded) as engine:
+        start = time.time()
+        progress = GenerationProgress(log_cb, settings.LLM_PROGRESS_INTERVAL_SECONDS)
+        inputs = engine.tokenizer(_transformers_prompt(system_prompt, prompt), return_tensors="pt").to(
+            engine.model.device
+        )
+        streamer = TextIteratorStreamer(
+            engine.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=_STREAM_TOKEN_TIMEOUT_SECONDS,
+        )
+        failure: List[BaseException] = []
+
+        def _generate(**kwargs) -> None:
+            try:
+                engine.model.generate(**kwargs)
+            except BaseException as exc:
+                failure.append(exc)
+                # Unblock the consumer loop; the error is re-raised after join().
+                streamer.end()
+
+        worker = threading.Thread(
+            target=_generate,
+            kwargs={
+                **inputs,
+                "max_new_tokens": settings.LLM_MAX_TOKENS,
+                "temperature": settings.LLM_TEMPERATURE,
+                "do_sample": True,
+                "streamer": streamer,
+                "stopping_criteria": StoppingCriteriaList([_StopWhenDone()]),
+            },
+            daemon=True,
+        )
+        worker.start()
+        try:
+            for piece in streamer:
+                parts.append(piece)
+                progress.tick(counter["tokens"])
+                if tracker is not None and not stop.is_set() and tracker.feed(piece):
+                    stop.set()
+        except queue.Empty:
+            raise RuntimeError(
+                f"transformers generation produced no token for {_STREAM_TOKEN_TIMEOUT_SECONDS:.0f}s"
+            ) from None
+        finally:
+            stop.set()
+            worker.join()
+        if failure:
+            raise failure[0]
+        elapsed = time.time() - start
+    text = "".join(parts)
+    stopped_early = tracker is not None and tracker.complete
+    if stopped_early:
+        text = text[: tracker.end]
+    progress.finish(counter["tokens"], stopped_early)
+    _record_timings("transformers", loaded.get("seconds", 0.0), elapsed, counter["tokens"])
+    return text
+
+
+def _pad_token_id(engine: TransformersEngine) -> int | None:
+    pad_id = getattr(engine.model.generation_config, "pad_token_id", None)
+    if pad_id is None:
+        pad_id = engine.tokenizer.pad_token_id
+    if pad_id is None:
+        pad_id = engine.tokenizer.eos_token_id
+    if isinstance(pad_id, (list, tuple)):
+        pad_id = pad_id[0] if pad_id else None
+    return pad_id
+
+
+def _transformers_prompt(system_prompt: str, prompt: str) -> str:
+    return f"{system_prompt}\n\n{prompt}"
+
+
+def _generate_transformers_batch(
+    settings,
+    prompts: List[str],
+    seeds: List[int | None],
+    model_path: str | None = None,
+) -> List[str]:
+    """Sample one sequence per prompt in a single generate() call.
+
+    Identical prompts are evaluated once and expanded with num_return_sequences;
+    different prompts are left-padded into one batch. The sequences share one RNG
+    stream, so seeds cannot be applied one by one: the RNG is seeded once from the
+    first seed, which makes a batch reproducible for the same seeds and prompts.
+    """
+    from transformers import set_seed
+
+    loaded: dict = {}
+    with _borrow_transformers(settings, model_path, loaded) as engine:
+        start = time.time()
+        first_seed = next((seed for seed in seeds if seed is not None), None)
+        if first_seed is not None:
+            set_seed(int(first_seed))
+        pad_id = _pad_token_id(engine)
+        if len(set(prompts)) == 1:
+            inputs = engine.tokenizer(prompts[0], return_tensors="pt").to(engine.model.device)
+            repeats = len(prompts)
+        else:
+            inputs = engine.tokenizer(prompts, return_tensors="pt", padding=True).to(engine.model.device)
+            repeats = 1
+        outputs = engine.model.generate(
+            **inputs,
+            max_new_tokens=settings.LLM_MAX_TOKENS,
+            temperature=settings.LLM_TEMPERATURE,
+            do_sample=True,
+            num_return_sequences=repeats,
+            pad_token_id=pad_id,
+        )
+        prompt_length = inputs["input_ids"].shape[1]
+        generated = outputs[:, prompt_length:]
+        texts = [engine.tokenizer.decode(sequence, skip_special_tokens=True) for sequence in generated]
+        # Finished sequences are padded up to the longest one; padding is not decoded work.
+        tokens = int(generated.numel() if pad_id is None else (generated != pad_id).sum().item())
+        elapsed = time.time() - start
+    _record_timings("transformers", loaded.get("seconds", 0.0), elapsed, tokens)
+    return texts
+
+
+def default_model_identity(settings) -> str:
+    """Backend and model file a generate_text call without model_paths tries first."""
+    backend = _backends(settings)[0]
+    return f"{backend}:{_resolve_model_path(settings, backend, None)}"
+
+
+def _resolve_model_path(settings, backend: str, model_path: str | None) -> str:
+    if model_path:
+        return str(model_path)
+    if backend == "llama_cpp":
+        return str(settings.resolve_llm_model_path() or "")
+    return settings.LLM_MODEL_PATH
+
+
+def _cache_key(
+    settings,
+    backend: str,
+    system_prompt: str,
+    prompt: str,
+    seed: int | None,
+    model_path: str | None,
+    json_shape: Any,
+    use_cache: bool | None,
+) -> str | None:
+    if not llm_cache.should_cache(settings, seed, use_cache):
+        return None
+    resolved = _resolve_model_path(settings, backend, model_path)
+    return llm_cache.make_key(settings, backend, resolved, system_prompt, prompt, seed, json_shape)
+
+
+def _guarded(settings, backend: str, model_path: str | None, call):
+    resolved = _resolve_model_path(settings, backend, model_path)
+    health = get_health(settings)
+    if not health.allow(backend, resolved):
+        raise CircuitOpenError(f"{backend} model '{resolved}' is cooling down after recent failures")
+    try:
+        result = call()
+    except Exception as exc:
+        health.record_failure(backend, resolved, exc)
+        raise
+    health.record_success(backend, resolved)
+    return result
+
+
+def _generate_raw(
+    settings,
+    backend: str,
+    system_prompt: str,
+    prompt: str,
+    seed: int | None,
+    model_path: str | None = None,
+    prefix: PromptPrefix | None = None,
+    json_shape: Any = None,
+    use_cache: bool | None = None,
+    log_cb=None,
+) -> str:
+    key = _cache_key(settings, backend, system_prompt, prompt, seed, model_path, json_shape, use_cache)
+    if key:
+        cached = llm_cache.get_cached(settings, key)
+        if cached is not None:
+            # Don't leave the previous call's numbers behind for last_generation_timings().
+            _record_timings(backend, 0.0, 0.0, 0, cached=True)
+            return cached
+    raw = _guarded(
+        settings,
+        backend,
+        model_path,
+        lambda: _generate_uncached(
+            settings,
+            backend,
+            system_prompt,
+            prompt,
+            seed,
+            model_path=model_path,
+            prefix=prefix,
+            json_shape=json_shape,
+            log_cb=log_cb,
+        ),
     )
-    return tokenizer.decode(outputs[0], skip_special_tokens=True)
+    if key:
+        llm_cache.put_cached(settings, key, _resolve_model_path(settings, backend, model_path), raw)
+    return raw
+
+
+def _generate_uncached(
+    settings,
+    backend: str,
+    system_prompt: str,
+    prompt: str,
+    seed: int | None,
+    model_path: str | None = None,
+    prefix: PromptPrefix | None = None,
+    json_shape: Any = None,
+    log_cb=None,
+) -> str:
+    if settings.LLM_SERVER_ENABLED:
+        outputs = _generate_remote(
+            settings, backend, system_prompt, prompt, [seed], model_path, prefix, json_shape, log_cb
+        )
+        if outputs is not None:
+            return outputs[0]
+    if backend == "llama_cpp":
+        return _generate_llama_cpp(
+            settings,
+            system_prompt,
+            prompt,
+            seed,
+            model_path=model_path,
+            prefix=prefix,
+            json_shape=json_shape,
+            log_cb=log_cb,
+        )
+    if backend == "transformers":
+        return _generate_transformers(
+            settings,
+            system_prompt,
+            prompt,
+            model_path=model_path,
+            stop_on_json=json_shape is not None,
+            log_cb=log_cb,
+        )
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+
+
+def _generate_remote(
+    settings,
+    backend: str,
+    system_prompt: str,
+    prompt: str,
+    seeds: List[int | None],
+    model_path: str | None,
+    prefix: PromptPrefix | None,
+    json_shape: Any,
+    log_cb=None,
+) -> List[str] | None:
+    """Outputs from the inference server, or None when it is not running.
+
+    A server that is alive but does not answer in time has the request cancelled
+    and raises InferenceServerTimeout rather than loading a second model copy
+    here. That and errors raised by the generation itself are passed through
+    unchanged, so they count against the circuit breaker.
+    """
+    start = time.time()
+    try:
+        result = get_client(settings).generate(
+            backend,
+            system_prompt,
+            prompt,
+            seeds,
+            model_path=model_path,
+            prefix=prefix,
+            json_shape=json_shape,
+            log_cb=log_cb,
+        )
+    except InferenceServerUnavailable as exc:
+        if log_cb:
+            log_cb(f"LLM server unavailable ({exc}); generating in-process.")
+        return None
+    _TIMINGS.last = dict(result.get("timings") or {})
+    if log_cb:
+        tokens = int(_TIMINGS.last.get("tokens") or 0)
+        log_cb(f"LLM server: {len(seeds)} sequence(s), {tokens} tokens in {time.time() - start:.1f}s")
+    return list(result["outputs"])
+
+
+def _generate_batch_uncached(
+    settings,
+    backend: str,
+    system_prompt: str,
+    prompt: str,
+    seeds: List[int | None],
+    model_path: str | None = None,
+    prefix: PromptPrefix | None = None,
+    json_shape: Any = None,
+    log_cb=None,
+) -> List[str]:
+    if settings.LLM_SERVER_ENABLED:
+        outputs = _generate_remote(
+            settings, backend, system_prompt, prompt, seeds, model_path, prefix, json_shape, log_cb
+        )
+        if outputs is not None:
+            return outputs
+    items = [GenerationItem(system_prompt=system_prompt, prompt=prompt, seed=seed, prefix=prefix) for seed in seeds]
+    return _generate_items(settings, backend, items, model_path=model_path, json_shape=json_shape, log_cb=log_cb)
+
+
+def _generate_items(
+    settings,
+    backend: str,
+    items: List[GenerationItem],
+    model_path: str | None = None,
+    json_shape: Any = None,
+    log_cb=None,
+) -> List[str]:
+    """Generate a group of items for one model in-process; the inference server's batch entry point."""
+    if backend == "llama_cpp":
+        return _generate_llama_cpp_items(settings, items, model_path=model_path, json_shape=json_shape, log_cb=log_cb)
+    if backend == "transformers":
+        prompts = [_transformers_prompt(item.system_prompt, item.prompt) for item in items]
+        return _generate_transformers_batch(settings, prompts, [item.seed for item in items], model_path=model_path)
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+
+
+def warm_up(settings, model_path: str | None = None) -> Dict[str, Any]:
+    last_error: Exception | None = None
+    for backend in _backends(settings):
+        loaded: dict = {}
+        try:
+            if backend == "llama_cpp":
+                with _borrow_llama(settings, model_path, loaded):
+                    pass
+            elif backend == "transformers":
+                with _borrow_transformers(settings, model_path, loaded) as engine:
+                    inputs = engine.tokenizer("warm up", return_tensors="pt").to(engine.model.device)
+                    engine.model.generate(**inputs, max_new_tokens=1, do_sample=False)
+            else:
+                raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+            return {"backend": backend, "load_seconds": round(loaded.get("seconds", 0.0), 3)}
+        except Exception as exc:
+            last_error = exc
+            continue
+    raise RuntimeError(f"Failed to warm up LLM: {last_error}")
+
+
+def evict_models(settings, backend: str | None = None) -> int:
+    if settings.LLM_SERVER_ENABLED:
+        return get_client(settings).evict(backend)
+    backends = [backend] if backend else ["llama_cpp", "transformers"]
+    return sum(get_pool(settings, name).clear() for name in backends)
 
 
 def _normalize_script(payload: Dict[str, Any]) -> ScriptOutput:
@@ -144,27 +860,71 @@ def generate_text(
     prompt: str,
     seed: int | None,
     model_paths: list[str] | None = None,
+    json_shape: Any = None,
+    use_cache: bool | None = None,
+    log_cb=None,
 ) -> str:
-    backends = [settings.LLM_BACKEND]
-    if settings.LLM_BACKEND == "llama_cpp":
-        backends.append("transformers")
-
     paths = model_paths or [None]
     last_error: Exception | None = None
-    for backend in backends:
+    for backend in _backends(settings):
         for path in paths:
             try:
-                if backend == "llama_cpp":
-                    return _generate_llama_cpp(settings, system_prompt, prompt, seed, model_path=path)
-                if backend == "transformers":
-                    return _generate_transformers(settings, system_prompt, prompt, model_path=path)
-                raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+                return _generate_raw(
+                    settings,
+                    backend,
+                    system_prompt,
+                    prompt,
+                    seed,
+                    model_path=path,
+                    json_shape=json_shape,
+                    use_cache=use_cache,
+                    log_cb=log_cb,
+                )
             except Exception as exc:
                 last_error = exc
                 continue
     raise RuntimeError(f"Failed to generate text: {last_error}")
 
 
+def _finalize_script(
+    payload: Dict[str, Any],
+    template: Template,
+    plugin_manager,
+    forced_hook: str | None = None,
+) -> ScriptOutput:
+    script = _normalize_script(payload)
+    if forced_hook:
+        script.hook = forced_hook
+        if script.beats:
+            script.beats[0].text = forced_hook
+            script.beats[0].on_screen = forced_hook
+        script.full_voiceover_text = " ".join(
+            beat.text for beat in script.beats if beat.text
+        ).strip()
+    if template.forbidden_words:
+        script.full_voiceover_text = _apply_safe_rewrites(
+            script.full_voiceover_text,
+            template.forbidden_words,
+            template.safe_rewrites,
+        )
+        script.hook = _apply_safe_rewrites(
+            script.hook, template.forbidden_words, template.safe_rewrites
+        )
+        script.title = _apply_safe_rewrites(
+            script.title, template.forbidden_words, template.safe_rewrites
+        )
+        for beat in script.beats:
+            beat.text = _apply_safe_rewrites(
+                beat.text, template.forbidden_words, template.safe_rewrites
+            )
+            beat.on_screen = _apply_safe_rewrites(
+                beat.on_screen, template.forbidden_words, template.safe_rewrites
+            )
+    context = {"template": template.name, "style": template.style}
+    script_data = plugin_manager.apply_script(script.model_dump(), context)
+    return ScriptOutput(**script_data)
+
+
 def generate_script(
     settings,
     req: GenerateRequest,
@@ -172,67 +932,266 @@ def generate_script(
     plugin_manager,
     model_paths: list[str] | None = None,
     forced_hook: str | None = None,
+    log_cb=None,
 ) -> ScriptOutput:
     prompt = _build_user_prompt(req, template, forced_hook=forced_hook)
+    prefix = _script_prefix(template)
     last_error: Exception | None = None
     system_prompt = template.system_prompt
 
-    backends = [settings.LLM_BACKEND]
-    if settings.LLM_BACKEND == "llama_cpp":
-        backends.append("transformers")
     paths = model_paths or [None]
 
-    for backend in backends:
+    for backend in _backends(settings):
         for path in paths:
             try:
-                if backend == "llama_cpp":
-                    raw = _generate_llama_cpp(settings, system_prompt, prompt, req.seed, model_path=path)
-                elif backend == "transformers":
-                    raw = _generate_transformers(settings, system_prompt, prompt, model_path=path)
-                else:
-                    raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+                raw = _generate_raw(
+                    settings,
+                    backend,
+                    system_prompt,
+                    prompt,
+                    req.seed,
+                    model_path=path,
+                    prefix=prefix,
+                    json_shape=template.schema,
+                    log_cb=log_cb,
+                )
                 try:
                     payload = _extract_json(raw)
                 except Exception:
                     retry_prompt = prompt + "\nReturn ONLY valid JSON with no extra text."
-                    if backend == "llama_cpp":
-                        raw = _generate_llama_cpp(settings, system_prompt, retry_prompt, req.seed, model_path=path)
-                    else:
-                        raw = _generate_transformers(settings, system_prompt, retry_prompt, model_path=path)
-                    payload = _extract_json(raw)
-                script = _normalize_script(payload)
-                if forced_hook:
-                    script.hook = forced_hook
-                    if script.beats:
-                        script.beats[0].text = forced_hook
-                        script.beats[0].on_screen = forced_hook
-                    script.full_voiceover_text = " ".join(
-                        beat.text for beat in script.beats if beat.text
-                    ).strip()
-                if template.forbidden_words:
-                    script.full_voiceover_text = _apply_safe_rewrites(
-                        script.full_voiceover_text,
-                        template.forbidden_words,
-                        template.safe_rewrites,
+                    raw = _generate_raw(
+                        settings,
+                        backend,
+                        system_prompt,
+                        retry_prompt,
+                        req.seed,
+                        model_path=path,
+                        prefix=prefix,
+                        json_shape=template.schema,
+                        log_cb=log_cb,
                     )
-                    script.hook = _apply_safe_rewrites(
-                        script.hook, template.forbidden_words, template.safe_rewrites
-                    )
-                    script.title = _apply_safe_rewrites(
-                        script.title, template.forbidden_words, template.safe_rewrites
+                    payload = _extract_json(raw)
+                return _finalize_script(payload, template, plugin_manager, forced_hook)
+            except Exception as exc:
+                last_error = exc
+                continue
+
+    raise RuntimeError(f"Failed to generate script: {last_error}")
+
+
+def generate_script_batch(
+    settings,
+    req: GenerateRequest,
+    template: Template,
+    plugin_manager,
+    count: int,
+    model_paths: list[str] | None = None,
+    forced_hook: str | None = None,
+    log_cb=None,
+) -> List[ScriptOutput]:
+    prompt = _build_user_prompt(req, template, forced_hook=forced_hook)
+    retry_prompt = prompt + "\nReturn ONLY valid JSON with no extra text."
+    prefix = _script_prefix(template)
+    system_prompt = template.system_prompt
+    seeds = [None if req.seed is None else int(req.seed) + idx for idx in range(max(1, count))]
+    last_error: Exception | None = None
+
+    paths = model_paths or [None]
+
+    for backend in _backends(settings):
+        for path in paths:
+            keys = [
+                _cache_key(settings, backend, system_prompt, prompt, seed, path, template.schema, None)
+                for seed in seeds
+            ]
+            cached = [llm_cache.get_cached(settings, key) if key else None for key in keys]
+            try:
+                if all(raw is not None for raw in cached):
+                    raws = cached
+                else:
+                    raws = _guarded(
+                        settings,
+                        backend,
+                        path,
+                        lambda: _generate_batch_uncached(
+                            settings,
+                            backend,
+                            system_prompt,
+                            prompt,
+                            seeds,
+                            model_path=path,
+                            prefix=prefix,
+                            json_shape=template.schema,
+                            log_cb=log_cb,
+                        ),
                     )
-                    for beat in script.beats:
-                        beat.text = _apply_safe_rewrites(
-                            beat.text, template.forbidden_words, template.safe_rewrites
-                        )
-                        beat.on_screen = _apply_safe_rewrites(
-                            beat.on_screen, template.forbidden_words, template.safe_rewrites
+            except Exception as exc:
+                last_error = exc
+                continue
+            for key, raw, hit in zip(keys, raws, cached):
+                if key and hit is None:
+                    llm_cache.put_cached(settings, key, _resolve_model_path(settings, backend, path), raw)
+
+            scripts: List[ScriptOutput] = []
+            for raw, seed in zip(raws, seeds):
+                try:
+                    try:
+                        payload = _extract_json(raw)
+                    except Exception:
+                        raw = _generate_raw(
+                            settings,
+                            backend,
+                            system_prompt,
+                            retry_prompt,
+                            seed,
+                            model_path=path,
+                            prefix=prefix,
+                            json_shape=template.schema,
+                            log_cb=log_cb,
                         )
-                context = {"template": template.name, "style": template.style}
-                script_data = plugin_manager.apply_script(script.model_dump(), context)
-                return ScriptOutput(**script_data)
+                        payload = _extract_json(raw)
+                    scripts.append(_finalize_script(payload, template, plugin_manager, forced_hook))
+                except Exception as exc:
+                    last_error = exc
+                    continue
+            if scripts:
+                return scripts
+
+    raise RuntimeError(f"Failed to generate script candidates: {last_error}")
+
+
+class ScriptSession:
+    """Hook pool and script candidates generated as turns of one llama.cpp conversation.
+
+    The opening user turn carries the template prefix, the topic and the hook
+    request; the hooks come back as the assistant's reply, and each candidate is
+    sampled as the next user/assistant exchange on that history. llama.cpp's prefix
+    matching therefore only evaluates the script turn once per session. Turns go
+    through the circuit breaker and the LLM cache like separate calls do.
+    """
+
+    def __init__(
+        self,
+        settings,
+        req: GenerateRequest,
+        template: Template,
+        plugin_manager,
+        model_path: str | None = None,
+        log_cb=None,
+    ) -> None:
+        self.settings = settings
+        self.req = req
+        self.template = template
+        self.plugin_manager = plugin_manager
+        self.model_path = model_path
+        self.log_cb = log_cb
+        self.tokens = 0
+        self._loaded: dict = {}
+        self._borrowed = None
+        self._llm = None
+        self._started = 0.0
+        self._messages: List[Dict[str, str]] = [{"role": "system", "content": template.system_prompt}]
+
+    def __enter__(self) -> "ScriptSession":
+        borrowed = _borrow_llama(self.settings, self.model_path, self._loaded)
+        # A model that fails to load counts against its breaker like any other call.
+        self._llm = _guarded(self.settings, "llama_cpp", self.model_path, borrowed.__enter__)
+        self._borrowed = borrowed
+        self._started = time.time()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.time() - self._started
+        self._borrowed.__exit__(*exc_info)
+        _record_timings("llama_cpp", self._loaded.get("seconds", 0.0), elapsed, self.tokens)
+
+    def generate_hooks(self, count: int, existing: List[str] | None = None) -> List[str]:
+        """Ask for the hook pool as the opening exchange.
+
+        With `existing` hooks (a resumed job) they are recorded as the assistant's
+        reply without generating, so the script turns see the same conversation.
+        """
+        opening = self._opening_turn(count)
+        if existing is not None:
+            self._messages = opening + [{"role": "assistant", "content": json.dumps({"hooks": existing})}]
+            return list(existing)
+        raw = self._chat(opening, self.req.seed, HOOKS_SHAPE, "LLM hooks")
+        payload = _extract_json(raw)
+        hooks = [str(item).strip() for item in payload.get("hooks", []) if str(item).strip()]
+        self._messages = opening + [{"role": "assistant", "content": raw}]
+        return hooks[:count]
+
+    def generate_scripts(self, hook: str, count: int) -> List[ScriptOutput]:
+        """Sample `count` alternative replies to one script turn, one seed each."""
+        if len(self._messages) < 3:
+            raise RuntimeError("generate_hooks must run before generate_scripts")
+        hook_line = f"Hook constraint (must use verbatim): {hook}\n" if hook else ""
+        turn = (
+            "Now write the full script.\n"
+            f"{hook_line}"
+            "Ensure beats are 1-3 seconds apart and return ONLY JSON in the schema above."
+        )
+        messages = self._messages + [{"role": "user", "content": turn}]
+        retry = self._messages + [{"role": "user", "content": turn + "\nReturn ONLY valid JSON with no extra text."}]
+        scripts: List[ScriptOutput] = []
+        last_error: Exception | None = None
+        count = max(1, count)
+        for idx in range(count):
+            seed = None if self.req.seed is None else int(self.req.seed) + idx
+            label = f"LLM {idx + 1}/{count}" if count > 1 else "LLM"
+            try:
+                raw = self._chat(messages, seed, self.template.schema, label)
+                try:
+                    payload = _extract_json(raw)
+                except Exception:
+                    payload = _extract_json(self._chat(retry, seed, self.template.schema, label))
+                scripts.append(_finalize_script(payload, self.template, self.plugin_manager, hook or None))
             except Exception as exc:
                 last_error = exc
                 continue
+        if not scripts:
+            raise RuntimeError(f"Failed to generate script candidates in session: {last_error}")
+        return scripts
 
-    raise RuntimeError(f"Failed to generate script: {last_error}")
+    def _opening_turn(self, count: int) -> List[Dict[str, str]]:
+        req = self.req
+        series_context = ""
+        if req.series_context:
+            series_context = f"Series context: {json.dumps(req.series_context)}\n"
+        content = (
+            f"{_build_prompt_prefix(self.template)}"
+            f"Topic: {req.topic_prompt}\n"
+            f"Target duration: {req.duration_seconds} seconds.\n"
+            f"{series_context}\n"
+            f"First, write {count} short punchy hook ideas for this video in the {req.style} style.\n"
+            "Return JSON: {\"hooks\": [\"...\", \"...\"]}"
+        )
+        return [self._messages[0], {"role": "user", "content": content}]
+
+    def _chat(self, messages: List[Dict[str, str]], seed: int | None, json_shape: Any, label: str) -> str:
+        key = None
+        if llm_cache.should_cache(self.settings, seed, None):
+            key = llm_cache.make_key(
+                self.settings,
+                "llama_cpp_session",
+                _resolve_model_path(self.settings, "llama_cpp", self.model_path),
+                self.template.system_prompt,
+                json.dumps(messages),
+                seed,
+                json_shape,
+            )
+            cached = llm_cache.get_cached(self.settings, key)
+            if cached is not None:
+                return cached
+
+        def _call() -> str:
+            text, used = _llama_chat(self.settings, self._llm, messages, seed, json_shape, label, self.log_cb)
+            self.tokens += used
+            return text
+
+        text = _guarded(self.settings, "llama_cpp", self.model_path, _call)
+        if key:
+            llm_cache.put_cached(
+                self.settings, key, _resolve_model_path(self.settings, "llama_cpp", self.model_path), text
+            )
+        return text
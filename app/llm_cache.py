@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from .db import get_connection
+
+_STATS_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+def should_cache(settings, seed: int | None, use_cache: bool | None) -> bool:
+    if not settings.LLM_CACHE_ENABLED:
+        return False
+    if use_cache is None:
+        return seed is not None
+    return use_cache
+
+
+def make_key(
+    settings,
+    backend: str,
+    model_path: str,
+    system_prompt: str,
+    prompt: str,
+    seed: int | None,
+    json_shape: Any = None,
+) -> str:
+    material = json.dumps(
+        {
+            "backend": backend,
+            "model_path": model_path,
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            "temperature": settings.LLM_TEMPERATURE,
+            "max_tokens": settings.LLM_MAX_TOKENS,
+            "seed": seed,
+            "json_shape": json_shape,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def get_cached(settings, key: str) -> str | None:
+    now = datetime.utcnow()
+    cutoff = (now - timedelta(hours=settings.LLM_CACHE_TTL_HOURS)).isoformat()
+    with get_connection(settings.DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?",
+            (key, cutoff),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (now.isoformat(), key),
+            )
+            conn.commit()
+    _bump("hits" if row else "misses")
+    return row["response"] if row else None
+
+
+def put_cached(settings, key: str, model_path: str, response: str) -> None:
+    now = datetime.utcnow().isoformat()
+    with get_connection(settings.DB_PATH) as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO llm_cache (key, created_at, last_used, model_path, size_bytes, hits, response)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+            """,
+            (key, now, now, model_path, len(response.encode("utf-8")), response),
+        )
+        conn.commit()
+    _bump("writes")
+    _evict(settings)
+
+
+def clear_cache(settings) -> int:
+    with get_connection(settings.DB_PATH) as conn:
+        cursor = conn.execute("DELETE FROM llm_cache")
+        conn.commit()
+    return cursor.rowcount
+
+
+def cache_stats(settings) -> Dict[str, object]:
+    with get_connection(settings.DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(size_bytes), 0) AS size_bytes FROM llm_cache"
+        ).fetchone()
+    with _STATS_LOCK:
+        counters = dict(_STATS)
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        "entries": int(row["entries"]),
+        "size_bytes": int(row["size_bytes"]),
+        "enabled": settings.LLM_CACHE_ENABLED,
+        "ttl_hours": settings.LLM_CACHE_TTL_HOURS,
+        "max_entries": settings.LLM_CACHE_MAX_ENTRIES,
+    }
+
+
+def _evict(settings) -> None:
+    cutoff = (datetime.utcnow() - timedelta(hours=settings.LLM_CACHE_TTL_HOURS)).isoformat()
+    with get_connection(settings.DB_PATH) as conn:
+        expired = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)).rowcount
+        overflow = conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max(0, settings.LLM_CACHE_MAX_ENTRIES),),
+        ).rowcount
+        conn.commit()
+    if expired or overflow:
+        _bump("evictions", expired + overflow)
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[name] = _STATS.get(name, 0) + amount
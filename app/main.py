@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import threading
 from typing import Any
 
 from fastapi import FastAPI, HTTPException
@@ -9,6 +10,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from .captions import batching_available, shutdown_pinned_worker, warm_up_whisper
 from .config import Settings
 from .db import init_db
 from .downloads import run_download
@@ -49,11 +51,13 @@ from .api import (
     routes_export,
     routes_hooks,
     routes_hooks_pool,
+    routes_llm_cache,
     routes_metrics,
     routes_model_setup,
     routes_optimization,
     routes_routing,
     routes_scheduler,
+    routes_transcript_cache,
     routes_virality,
     routes_virality_score,
     routes_validation,
@@ -61,6 +65,8 @@ from .api import (
     routes_watch_folder,
     routes_watch_pending,
 )
+from .inference_client import shutdown_client
+from .piper_pool import shutdown_piper_pool
 from .subprocess_manager import init_manager
 
 settings = Settings()
@@ -111,11 +117,26 @@ app.mount("/web", StaticFiles(directory=settings.BASE_DIR / "web"), name="web")
 def _startup() -> None:
     job_queue.start()
     template_manager.load()
+    if settings.WHISPER_PRELOAD:
+        threading.Thread(target=_preload_whisper, daemon=True).start()
+    if settings.WHISPER_BATCHING:
+        # Checked once; without BatchedInferencePipeline captions skip the batch window.
+        batching_available()
+
+
+def _preload_whisper() -> None:
+    try:
+        warm_up_whisper(settings)
+    except Exception:
+        pass
 
 
 @app.on_event("shutdown")
 def _shutdown() -> None:
     job_queue.stop()
+    shutdown_client()
+    shutdown_pinned_worker()
+    shutdown_piper_pool()
 
 
 @app.get("/")
@@ -166,6 +187,8 @@ def _apply_preset(req: GenerateRequest) -> GenerateRequest:
         "max_chars_per_line",
         "min_caption_duration",
         "caption_autofix_mode",
+        "caption_timing_source",
+        "tts_mode",
         "audio_mastering_preset",
         "music_ducking_strength",
         "impact_rate",
@@ -279,6 +302,7 @@ routes_config.init_context(settings)
 routes_model_setup.init_context(settings, DOWNLOADS)
 routes_beats.init_context(settings, _enqueue_job, JOBS)
 routes_variations.init_context(settings, preset_manager, _enqueue_job, JOBS)
+routes_llm_cache.init_context(settings)
 routes_metrics.init_context(settings)
 routes_validation.init_context(settings)
 routes_cancel.init_context(settings, JOBS, project_manager)
@@ -295,8 +319,10 @@ routes_campaigns.init_context(settings, preset_manager, _enqueue_job)
 routes_watch_folder.init_context(settings, _enqueue_job)
 routes_watch_pending.init_context(settings, _enqueue_job)
 routes_scheduler.init_context(settings)
+routes_transcript_cache.init_context(settings)
 app.include_router(routes_beats.router)
 app.include_router(routes_variations.router)
+app.include_router(routes_llm_cache.router)
 app.include_router(routes_metrics.router)
 app.include_router(routes_assets.router)
 app.include_router(routes_config.router)
@@ -316,6 +342,7 @@ app.include_router(routes_campaigns.router)
 app.include_router(routes_watch_folder.router)
 app.include_router(routes_watch_pending.router)
 app.include_router(routes_scheduler.router)
+app.include_router(routes_transcript_cache.router)
 
 
 @app.post("/generate", response_model=GenerateResponse)
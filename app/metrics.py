@@ -5,6 +5,7 @@ import math
 from typing import List, Tuple
 
 from .utils import get_media_duration
+from .word_timeline import load_timeline
 
 CURIOUS_WORDS = {"wait", "secret", "nobody", "this is why", "what if", "you wont"}
 SHOCK_WORDS = {"crazy", "insane", "wild", "unbelievable", "terrifying", "banned"}
@@ -69,13 +70,7 @@ def compute_metrics(settings, job_id: str) -> dict:
         except Exception:
             beats = []
 
-    words = []
-    if transcript_path.exists():
-        try:
-            transcript = json.loads(transcript_path.read_text(encoding="utf-8"))
-            words = transcript.get("words", [])
-        except Exception:
-            words = []
+    timeline = load_timeline(transcript_path)
 
     total_seconds = max(1, int(math.ceil(duration)))
     beat_density = [0 for _ in range(total_seconds)]
@@ -86,18 +81,14 @@ def compute_metrics(settings, job_id: str) -> dict:
         beat_density[idx] += 1
         cut_frequency[idx] += 1
 
-    words_per_second = [0 for _ in range(total_seconds)]
-    for word in words:
-        t = float(word.get("start", 0.0))
-        idx = min(total_seconds - 1, max(0, int(t)))
-        words_per_second[idx] += 1
+    words_per_second = timeline.per_second(total_seconds).tolist()
 
     avg_caption_length = 0.0
     words_per_caption_event = 0.0
     if beats:
         avg_caption_length = sum(len(beat.get("text", "").split()) for beat in beats) / max(1, len(beats))
-    if words:
-        words_per_caption_event = len(words) / max(1, len(beats))
+    if len(timeline):
+        words_per_caption_event = len(timeline) / max(1, len(beats))
 
     suggestions = _suggestions(beat_density, words_per_second)
 
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+HealthKey = Tuple[str, str]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+@dataclass
+class BackendHealth:
+    state: str = CLOSED
+    failures: int = 0
+    successes: int = 0
+    retry_at: float = 0.0
+    probing: bool = False
+    last_error: str = ""
+    last_failure_at: float = 0.0
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class HealthRegistry:
+    def __init__(self, base_backoff_seconds: float, max_backoff_seconds: float) -> None:
+        self.base_backoff_seconds = max(0.0, base_backoff_seconds)
+        self.max_backoff_seconds = max(self.base_backoff_seconds, max_backoff_seconds)
+        self._lock = threading.Lock()
+        self._entries: Dict[HealthKey, BackendHealth] = {}
+
+    def allow(self, backend: str, path: str) -> bool:
+        """Return True if a call may go through, claiming the half-open probe if due."""
+        with self._lock:
+            entry = self._entries.get((backend, path))
+            if entry is None or entry.state == CLOSED:
+                return True
+            if entry.probing:
+                return False
+            if time.time() < entry.retry_at:
+                return False
+            entry.state = HALF_OPEN
+            entry.probing = True
+            return True
+
+    def available(self, backend: str, path: str) -> bool:
+        with self._lock:
+            entry = self._entries.get((backend, path))
+            if entry is None or entry.state == CLOSED:
+                return True
+            return not entry.probing and time.time() >= entry.retry_at
+
+    def record_success(self, backend: str, path: str) -> None:
+        with self._lock:
+            entry = self._entries.setdefault((backend, path), BackendHealth())
+            entry.state = CLOSED
+            entry.failures = 0
+            entry.successes += 1
+            entry.retry_at = 0.0
+            entry.probing = False
+
+    def record_failure(self, backend: str, path: str, error: Exception | str) -> None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.setdefault((backend, path), BackendHealth())
+            entry.failures += 1
+            backoff = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (entry.failures - 1))
+            entry.state = OPEN
+            entry.retry_at = now + backoff
+            entry.probing = False
+            entry.last_error = str(error)[:500]
+            entry.last_failure_at = now
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        now = time.time()
+        with self._lock:
+            return {
+                "base_backoff_seconds": self.base_backoff_seconds,
+                "max_backoff_seconds": self.max_backoff_seconds,
+                "entries": [
+                    {
+                        "backend": key[0],
+                        "path": key[1],
+                        "state": entry.state,
+                        "failures": entry.failures,
+                        "successes": entry.successes,
+                        "retry_in_seconds": round(max(0.0, entry.retry_at - now), 1),
+                        "last_error": entry.last_error,
+                        "last_failure_at": entry.last_failure_at,
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
+
+
+def get_health(settings) -> HealthRegistry:
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = HealthRegistry(
+                settings.LLM_BREAKER_BASE_SECONDS,
+                settings.LLM_BREAKER_MAX_SECONDS,
+            )
+        return _REGISTRY
+
+
+def is_available(backend: str, path: str) -> bool:
+    with _REGISTRY_LOCK:
+        registry = _REGISTRY
+    return registry.available(backend, path) if registry is not None else True
+
+
+def health_stats() -> Dict[str, object]:
+    with _REGISTRY_LOCK:
+        registry = _REGISTRY
+    return registry.stats() if registry is not None else {}
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+PoolKey = Tuple[str, int, int]
+
+_POOLS: Dict[str, "ModelPool"] = {}
+_POOL_LOCK = threading.Lock()
+_EVICT_LISTENERS: List[Callable[[PoolKey], None]] = []
+
+
+@dataclass
+class PooledModel:
+    key: PoolKey
+    model: object
+    size_bytes: int
+    loaded_at: float
+    load_seconds: float
+    last_used: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    in_use: int = 0
+    uses: int = 0
+
+
+class ModelPool:
+    def __init__(self, max_models: int, memory_budget_bytes: int) -> None:
+        self.max_models = max(1, max_models)
+        self.memory_budget_bytes = max(0, memory_budget_bytes)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[PoolKey, PooledModel]" = OrderedDict()
+        self._load_locks: Dict[PoolKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def borrow(self, key: PoolKey, loader: Callable[[], object], size_bytes: int = 0) -> Iterator[object]:
+        entry = self._acquire(key, loader, size_bytes)
+        try:
+            with entry.lock:
+                entry.uses += 1
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def evict(self, key: PoolKey) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry.in_use:
+                return False
+            self._entries.pop(key, None)
+            self.evictions += 1
+        _close_model(entry)
+        return True
+
+    def clear(self) -> int:
+        with self._lock:
+            idle = [key for key, entry in self._entries.items() if not entry.in_use]
+        return sum(1 for key in idle if self.evict(key))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = list(self._entries.values())
+            used = sum(entry.size_bytes for entry in entries)
+            return {
+                "max_models": self.max_models,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "memory_used_bytes": used,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "models": [
+                    {
+                        "path": entry.key[0],
+                        "n_ctx": entry.key[1],
+                        "n_gpu_layers": entry.key[2],
+                        "size_bytes": entry.size_bytes,
+                        "load_seconds": round(entry.load_seconds, 3),
+                        "uses": entry.uses,
+                        "in_use": entry.in_use,
+                        "last_used": entry.last_used,
+                    }
+                    for entry in entries
+                ],
+            }
+
+    def _acquire(self, key: PoolKey, loader: Callable[[], object], size_bytes: int) -> PooledModel:
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.in_use += 1
+                    self.hits += 1
+                    return entry
+            self._make_room(size_bytes)
+            start = time.time()
+            model = loader()
+            now = time.time()
+            entry = PooledModel(
+                key=key,
+                model=model,
+                size_bytes=size_bytes,
+                loaded_at=now,
+                load_seconds=now - start,
+                last_used=now,
+            )
+            with self._lock:
+                self._entries[key] = entry
+                entry.in_use += 1
+                self.misses += 1
+            return entry
+
+    def _make_room(self, incoming_bytes: int) -> None:
+        evicted: List[PooledModel] = []
+        with self._lock:
+            for key in list(self._entries.keys()):
+                if not self._over_capacity(incoming_bytes):
+                    break
+                entry = self._entries[key]
+                if entry.in_use:
+                    continue
+                self._entries.pop(key)
+                self.evictions += 1
+                evicted.append(entry)
+        for entry in evicted:
+            _close_model(entry)
+
+    def _over_capacity(self, incoming_bytes: int) -> bool:
+        if len(self._entries) >= self.max_models:
+            return True
+        if not self.memory_budget_bytes:
+            return False
+        used = sum(entry.size_bytes for entry in self._entries.values())
+        return used + incoming_bytes > self.memory_budget_bytes
+
+
+def _close_model(entry: PooledModel) -> None:
+    close = getattr(entry.model, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+    for listener in list(_EVICT_LISTENERS):
+        try:
+            listener(entry.key)
+        except Exception:
+            pass
+
+
+def on_evict(listener: Callable[[PoolKey], None]) -> None:
+    """Call listener with the key of every model a pool closes, e.g. to drop state tied to it."""
+    if listener not in _EVICT_LISTENERS:
+        _EVICT_LISTENERS.append(listener)
+
+
+def model_size_bytes(path: str | Path) -> int:
+    try:
+        target = Path(path)
+        if target.is_dir():
+            return sum(item.stat().st_size for item in target.rglob("*") if item.is_file())
+        return target.stat().st_size
+    except Exception:
+        return 0
+
+
+def get_pool(settings, backend: str = "llama_cpp") -> ModelPool:
+    with _POOL_LOCK:
+        pool = _POOLS.get(backend)
+        if pool is None:
+            pool = ModelPool(
+                settings.LLM_POOL_MAX_MODELS,
+                int(settings.LLM_POOL_MEMORY_GB * 1024**3),
+            )
+            _POOLS[backend] = pool
+        return pool
+
+
+def pool_stats() -> Dict[str, dict]:
+    with _POOL_LOCK:
+        pools = dict(_POOLS)
+    return {backend: pool.stats() for backend, pool in pools.items()}
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .pool import on_evict
+
+PrefixKey = Tuple[str, int, int, str, float]
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class PrefixState:
+    tokens: List[int]
+    state: object
+
+
+class PrefixStateCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(0, max_entries)
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[PrefixKey, PrefixState]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: PrefixKey) -> PrefixState | None:
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                self.misses += 1
+                return None
+            self._states.move_to_end(key)
+            self.hits += 1
+            return state
+
+    def put(self, key: PrefixKey, state: PrefixState) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+
+    def drop_model(self, model_key: Tuple) -> int:
+        """Forget the states of a model the pool closed; they only fit that instance's context."""
+        with self._lock:
+            stale = [key for key in self._states if key[:3] == tuple(model_key)]
+            for key in stale:
+                del self._states[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            entries = [
+                {
+                    "model_path": key[0],
+                    "template": key[3],
+                    "template_mtime": key[4],
+                    "tokens": len(entry.tokens),
+                    "size_bytes": int(getattr(entry.state, "llama_state_size", 0) or 0),
+                }
+                for key, entry in self._states.items()
+            ]
+            return {
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+            }
+
+
+def get_prefix_cache(settings) -> PrefixStateCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = PrefixStateCache(settings.LLM_PREFIX_CACHE_SIZE)
+            on_evict(_CACHE.drop_model)
+        return _CACHE
+
+
+def prefix_cache_stats() -> Dict[str, object]:
+    with _CACHE_LOCK:
+        cache = _CACHE
+    return cache.stats() if cache is not None else {}
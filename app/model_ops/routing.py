@@ -5,8 +5,19 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+from ..caption_overlay import overlay_stats
+from ..cpu_budget import cpu_budget_stats
 from ..db import get_connection
+from ..inference_client import client_stats
+from ..piper_pool import piper_pool_stats
+from ..subtitle_engine import subtitle_engine_stats
+from ..transcription_service import transcription_service_stats
+from ..tts_cache import tts_cache_stats
 from .benchmarks import list_benchmarks
+from .health import health_stats, is_available
+from .pool import pool_stats
+from .prefix_cache import prefix_cache_stats
+from .whisper_cache import whisper_cache_stats
 from .registry import load_registry
 
 
@@ -62,6 +73,17 @@ def get_routing_status(settings) -> Dict[str, object]:
             "hook": hook_paths[0] if hook_paths else None,
             "script": script_paths[0] if script_paths else None,
         },
+        "llm_pool": pool_stats(),
+        "llm_prefix_cache": prefix_cache_stats(),
+        "llm_health": health_stats(),
+        "llm_server": client_stats(),
+        "whisper_cache": whisper_cache_stats(),
+        "transcription_service": transcription_service_stats(),
+        "subtitle_engine": subtitle_engine_stats(),
+        "caption_overlay": overlay_stats(),
+        "cpu_budget": cpu_budget_stats(),
+        "piper_pool": piper_pool_stats(),
+        "tts_cache": tts_cache_stats(),
     }
 
 
@@ -120,7 +142,11 @@ def pick_model_paths(
         scored.append((score, path))
 
     scored.sort(key=lambda x: x[0], reverse=True)
-    return [path for _, path in scored] or [c.get("path") for c in candidates if c.get("path")]
+    paths = [path for _, path in scored] or [c.get("path") for c in candidates if c.get("path")]
+    # Paths whose circuit is open are skipped; if every path is cooling down the
+    # full list is returned so generation can still fall through to the breaker.
+    healthy = [path for path in paths if is_available("llama_cpp", str(path))]
+    return healthy or paths
 
 
 def _benchmark_map(benchmarks: List[dict]) -> Dict[str, dict]:
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+WhisperKey = Tuple[str, str, str, int, int]
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class CachedWhisper:
+    key: WhisperKey
+    model: object
+    loaded_at: float
+    load_seconds: float
+    last_used: float
+    uses: int = 0
+    in_use: int = 0
+
+
+class WhisperModelCache:
+    def __init__(self, idle_seconds: float) -> None:
+        self.idle_seconds = max(0.0, idle_seconds)
+        self._lock = threading.Lock()
+        self._entries: Dict[WhisperKey, CachedWhisper] = {}
+        self._load_locks: Dict[WhisperKey, threading.Lock] = {}
+        self._reaper: threading.Thread | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, key: WhisperKey, loader: Callable[[], object]) -> Tuple[object, float]:
+        """Return (model, load_seconds); load_seconds is 0.0 on a cache hit."""
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.in_use += 1
+                    entry.uses += 1
+                    entry.last_used = time.time()
+                    self.hits += 1
+                    return entry.model, 0.0
+            start = time.time()
+            model = loader()
+            now = time.time()
+            entry = CachedWhisper(
+                key=key,
+                model=model,
+                loaded_at=now,
+                load_seconds=now - start,
+                last_used=now,
+                uses=1,
+                in_use=1,
+            )
+            with self._lock:
+                self._entries[key] = entry
+                self.misses += 1
+            self._ensure_reaper()
+            return model, entry.load_seconds
+
+    def release(self, key: WhisperKey) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.in_use = max(0, entry.in_use - 1)
+                entry.last_used = time.time()
+
+    def evict_idle(self, max_idle_seconds: float | None = None) -> int:
+        limit = self.idle_seconds if max_idle_seconds is None else max_idle_seconds
+        now = time.time()
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if not entry.in_use and now - entry.last_used >= limit
+            ]
+            for key in stale:
+                self._entries.pop(key, None)
+            self.evictions += len(stale)
+        return len(stale)
+
+    def clear(self) -> int:
+        return self.evict_idle(0.0)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "idle_seconds": self.idle_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "models": [
+                    {
+                        "model": entry.key[0],
+                        "device": entry.key[1],
+                        "compute_type": entry.key[2],
+                        "cpu_threads": entry.key[3],
+                        "num_workers": entry.key[4],
+                        "load_seconds": round(entry.load_seconds, 3),
+                        "uses": entry.uses,
+                        "in_use": entry.in_use,
+                        "last_used": entry.last_used,
+                    }
+                    for entry in self._entries.values()
+                ],
+            }
+
+    def _ensure_reaper(self) -> None:
+        if not self.idle_seconds:
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        interval = max(5.0, min(60.0, self.idle_seconds / 4))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+            with self._lock:
+                if not self._entries:
+                    self._reaper = None
+                    return
+
+
+def get_whisper_cache(settings) -> WhisperModelCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = WhisperModelCache(settings.WHISPER_IDLE_SECONDS)
+        return _CACHE
+
+
+def whisper_cache_stats() -> Dict[str, object]:
+    with _CACHE_LOCK:
+        cache = _CACHE
+    return cache.stats() if cache is not None else {}
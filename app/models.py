@@ -19,6 +19,8 @@ RoutingMode = Literal["manual", "auto"]
 RoutingPolicy = Literal["fastest", "best_quality", "balanced"]
 CaptionAutofixMode = Literal["group", "rewrite", "group_then_rewrite"]
 AudioMasteringPreset = Literal["clean", "hype", "aggressive"]
+CaptionTimingSource = Literal["whisper", "forced_alignment", "piper_alignment"]
+TtsMode = Literal["full", "per_beat"]
 
 
 class GenerateRequest(BaseModel):
@@ -58,6 +60,8 @@ class GenerateRequest(BaseModel):
     max_chars_per_line: int = Field(default=18, ge=8, le=32)
     min_caption_duration: float = Field(default=0.55, ge=0.2, le=2.0)
     caption_autofix_mode: CaptionAutofixMode = "group"
+    caption_timing_source: CaptionTimingSource = "whisper"
+    tts_mode: TtsMode = "full"
     audio_mastering_preset: AudioMasteringPreset = "hype"
     music_ducking_strength: float = Field(default=0.6, ge=0.0, le=1.0)
     impact_rate: float = Field(default=0.2, ge=0.0, le=1.0)
@@ -162,6 +166,8 @@ class Preset(BaseModel):
     max_chars_per_line: int = 18
     min_caption_duration: float = 0.55
     caption_autofix_mode: CaptionAutofixMode = "group"
+    caption_timing_source: CaptionTimingSource = "whisper"
+    tts_mode: TtsMode = "full"
     audio_mastering_preset: AudioMasteringPreset = "hype"
     music_ducking_strength: float = 0.6
     impact_rate: float = 0.2
@@ -20,6 +20,7 @@ from .utils import append_log, ensure_dir, get_media_duration, write_json
 from .validation import validate_output, write_validation
 from .effects_planner import plan_effects
 from .captions_autofix import autofix_captions
+from .subtitle_engine import load_word_index
 from .virality_score import compute_virality_score
 
 
@@ -30,8 +31,21 @@ def _update(job_state: dict, log_path: Path, progress: int, message: str) -> Non
         append_log(log_path, message)
 
 
+def _apply_beat_timings(beats: list, timings_path: Path) -> list:
+    """Replace each beat's scripted "t" with where its clip actually starts in voice.wav."""
+    if not timings_path.exists():
+        return beats
+    try:
+        timings = json.loads(timings_path.read_text(encoding="utf-8")).get("beats", [])
+    except Exception:
+        return beats
+    starts = {int(item["index"]): float(item["start"]) for item in timings if "index" in item}
+    return [{**beat, "t": starts[idx]} if idx in starts else beat for idx, beat in enumerate(beats)]
+
+
 def _normalize_duration(requested: int, voice_path: Path, ffprobe_path: str) -> float:
-    voice_duration = get_media_duration(voice_path, ffprobe_path)
+    # voice.wav is PCM written by Piper/FFmpeg, so its frame count is exact and needs no ffprobe.
+    voice_duration = tts.wav_duration(voice_path) or get_media_duration(voice_path, ffprobe_path)
     if voice_duration <= 0:
         return float(requested)
     return max(float(requested), voice_duration)
@@ -84,7 +98,7 @@ def run_pipeline(
             benchmarks = list_benchmarks(settings, limit=50)
             routing_config = get_routing_config(settings)
             script_models = pick_model_paths(registry, benchmarks, routing_config, "script")
-            script, _meta = run_generation_strategy(
+            script, generation_meta = run_generation_strategy(
                 settings,
                 req,
                 template,
@@ -94,6 +108,14 @@ def run_pipeline(
                 script_models,
                 log_cb=lambda msg: _update(job_state, log_path, 6, msg),
             )
+            write_json(job_dir / "generation_meta.json", generation_meta)
+            stage = generation_meta.get("script_stage", {})
+            _update(
+                job_state,
+                log_path,
+                8,
+                f"Script stage ({stage.get('mode', 'standard')}) took {stage.get('seconds', 0.0):.1f}s",
+            )
 
         if req.series_context:
             script = apply_series_postprocess(script, req.series_context)
@@ -134,17 +156,41 @@ def run_pipeline(
 
     _update(job_state, log_path, 15, "Synthesizing voiceover...")
     voice_path = job_dir / "voice.wav"
+    beat_timings_path = job_dir / "beat_timings.json"
+    per_beat = req.tts_mode == "per_beat" and any(str(beat.get("text", "")).strip() for beat in beats)
     if "voice" in steps:
-        voice_path = tts.synthesize_voice(
-            settings,
-            script_data.get("full_voiceover_text", ""),
-            req.voice,
-            job_dir,
-            req.speech_speed,
-            job_id=job_id,
-        )
+        if settings.TTS_STREAMING and settings.PIPER_POOL_ENABLED and not per_beat:
+            _update(
+                job_state,
+                log_path,
+                15,
+                "Warning: TTS_STREAMING is ignored while PIPER_POOL_ENABLED=true; using the Piper pool.",
+            )
+        if per_beat:
+            voice_path, _ = tts.synthesize_beats(
+                settings,
+                beats,
+                req.voice,
+                job_dir,
+                req.speech_speed,
+                job_id=job_id,
+                with_alignment=req.caption_timing_source == "piper_alignment",
+            )
+        else:
+            beat_timings_path.unlink(missing_ok=True)
+            voice_path = tts.synthesize_voice(
+                settings,
+                script_data.get("full_voiceover_text", ""),
+                req.voice,
+                job_dir,
+                req.speech_speed,
+                job_id=job_id,
+                with_alignment=req.caption_timing_source == "piper_alignment",
+            )
     elif not voice_path.exists():
         raise FileNotFoundError("Missing voice.wav for partial regeneration")
+    if per_beat:
+        beats = _apply_beat_timings(beats, beat_timings_path)
 
     target_duration = _normalize_duration(req.duration_seconds, voice_path, settings.FFPROBE_PATH)
     _update(job_state, log_path, 30, f"Target duration set to {target_duration:.1f}s")
@@ -154,16 +200,65 @@ def run_pipeline(
     autofix_ass_path = job_dir / "subtitles_autofix.ass"
     preview_ass_path = job_dir / "preview_subtitles.ass"
     if "captions" in steps:
-        _update(job_state, log_path, 45, "Transcribing voiceover...")
-        words, segments = captions.transcribe_words(settings, voice_path)
-        write_json(transcript_path, {"words": words})
+        words, segments = [], []
+        timing_source = "whisper"
+        if req.caption_timing_source == "piper_alignment":
+            words = captions.load_alignment_words(job_dir / "voice_alignment.json")
+            if words:
+                timing_source = "piper_alignment"
+                _update(job_state, log_path, 45, "Caption timings taken from Piper alignment (ASR skipped).")
+            else:
+                _update(job_state, log_path, 45, "Piper alignment unavailable; falling back.")
+        if per_beat:
+            # The per-beat voiceover speaks the beat texts, which can drift from full_voiceover_text.
+            script_text = " ".join(word for beat in beats for word in str(beat.get("text", "")).split())
+        else:
+            script_text = script_data.get("full_voiceover_text", "")
+        if not words and req.caption_timing_source != "whisper" and script_text:
+            _update(job_state, log_path, 45, "Aligning script text to voiceover...")
+            try:
+                words = captions.align_words(settings, voice_path, script_text)
+            except Exception as exc:
+                _update(job_state, log_path, 45, f"Forced alignment failed ({exc}); falling back to Whisper.")
+                words = []
+            if words:
+                timing_source = "forced_alignment"
+                timings = captions.last_transcription_timings()
+                _update(
+                    job_state,
+                    log_path,
+                    48,
+                    f"Whisper load {timings.get('load_seconds', 0.0):.2f}s, "
+                    f"alignment {timings.get('transcribe_seconds', 0.0):.2f}s",
+                )
+        if not words:
+            _update(job_state, log_path, 45, "Transcribing voiceover...")
+            words, segments = captions.transcribe_words(settings, voice_path)
+            timings = captions.last_transcription_timings()
+            if timings.get("cached"):
+                _update(job_state, log_path, 48, "Transcript cache hit; Whisper skipped.")
+            else:
+                _update(
+                    job_state,
+                    log_path,
+                    48,
+                    f"Whisper load {timings.get('load_seconds', 0.0):.2f}s, "
+                    f"transcription {timings.get('transcribe_seconds', 0.0):.2f}s",
+                )
+        transcript = {"words": words, "source": timing_source}
+        write_json(transcript_path, transcript)
+        caption_timings = {"source": timing_source}
+        if timing_source != "piper_alignment":
+            caption_timings.update(captions.last_transcription_timings())
+        write_json(job_dir / "caption_timings.json", caption_timings)
 
         if req.quality_gate_enabled:
             words, attempts = apply_caption_gate(
                 words, req.max_words_per_second, req.max_retries, log_cb=lambda msg: _update(job_state, log_path, 50, msg)
             )
             quality_report["caption_attempts"] = attempts
-            write_json(transcript_path, {"words": words, "compressed": True})
+            # Keep "source" so later readers still know where the timings came from.
+            write_json(transcript_path, {**transcript, "words": words, "compressed": True})
             save_report(job_dir, quality_report)
 
         _update(job_state, log_path, 60, "Building subtitles...")
@@ -220,14 +315,13 @@ def run_pipeline(
             for t in beat_times
             if preview_start <= t <= preview_start + preview_duration
         ]
-        preview_words = []
+        preview_words = None
         if req.preview_mode:
             if transcript_path.exists():
                 try:
-                    transcript = json.loads(transcript_path.read_text(encoding="utf-8"))
-                    preview_words = transcript.get("words", [])
+                    preview_words = load_word_index(transcript_path)
                 except Exception:
-                    preview_words = []
+                    preview_words = None
             if preview_words:
                 captions.build_ass(
                     settings,
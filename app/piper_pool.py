@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .subprocess_manager import SubprocessCancelled, get_manager
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# Distinct (model, length scale) worker sets kept warm; older idle sets are shut down.
+MAX_WORKER_KEYS = 4
+
+
+class PiperWorkerError(RuntimeError):
+    pass
+
+
+class PiperWorker:
+    """One long-lived `piper --json-input` process with its voice model loaded.
+
+    Each request is a JSON line naming the output WAV; Piper prints the path on
+    stdout once the file is written.
+    """
+
+    def __init__(self, piper_path: str, model_path: Path, length_scale: float | None = None) -> None:
+        self.model_path = Path(model_path)
+        self.length_scale = length_scale
+        self.args = [piper_path, "--model", str(model_path), "--json-input"]
+        if length_scale is not None:
+            self.args += ["--length_scale", f"{length_scale:.3f}"]
+        popen_kwargs: Dict[str, object] = {}
+        if os.name == "nt":
+            popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP  # type: ignore[attr-defined]
+        else:
+            popen_kwargs["start_new_session"] = True
+        self.process = subprocess.Popen(
+            self.args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            **popen_kwargs,
+        )
+        self.started_at = time.time()
+        self.requests = 0
+        self._lines: "queue.Queue[str | None]" = queue.Queue()
+        self._stderr: "deque[str]" = deque(maxlen=20)
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def synthesize(self, text: str, output_file: Path, timeout: float) -> Path:
+        if not self.alive:
+            raise PiperWorkerError(f"Piper worker exited with code {self.process.returncode}")
+        try:
+            self.process.stdin.write(json.dumps({"text": text, "output_file": str(output_file)}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise PiperWorkerError(f"Piper worker is not accepting input: {exc}") from exc
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise PiperWorkerError(f"Piper worker timed out after {timeout:.0f}s")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                raise PiperWorkerError(f"Piper worker exited: {' | '.join(self._stderr)}")
+            if line.strip() == str(output_file):
+                self.requests += 1
+                return output_file
+
+    def close(self) -> None:
+        if not self.alive:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except Exception:
+            self.process.kill()
+
+    def _read_stdout(self) -> None:
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _read_stderr(self) -> None:
+        for line in self.process.stderr:
+            self._stderr.append(line.rstrip())
+
+
+class PiperPool:
+    """Keeps up to `size` warm Piper workers per voice model (and length scale).
+
+    Dead workers are dropped and respawned on the next request; a request that hits
+    a crashed worker is retried once on a fresh one. While a worker serves a job it
+    is registered with the SubprocessManager, so cancelling the job kills it. Only
+    the `max_keys` most recently used worker sets stay warm, so one-off speech
+    speeds don't leave Piper processes resident.
+    """
+
+    def __init__(self, piper_path: str, size: int, timeout: float, max_keys: int = MAX_WORKER_KEYS) -> None:
+        self.piper_path = piper_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_keys = max(1, max_keys)
+        self._cond = threading.Condition()
+        self._idle: Dict[str, List[PiperWorker]] = {}
+        self._busy: Dict[str, int] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self.spawned = 0
+        self.restarts = 0
+        self.requests = 0
+        self.evicted = 0
+
+    def synthesize(
+        self,
+        model_path: Path,
+        items: List[Tuple[str, Path]],
+        job_id: str | None = None,
+        length_scale: float | None = None,
+    ) -> None:
+        """Write each (text, output_file) item with one worker held for the whole batch."""
+        for attempt in range(2):
+            worker = self._acquire(model_path, length_scale)
+            healthy = False
+            manager = get_manager()
+            if manager:
+                manager.track(job_id, worker.pid, worker.args, self.timeout)
+            try:
+                for text, output_file in items:
+                    worker.synthesize(text, output_file, self.timeout)
+                healthy = True
+                return
+            except PiperWorkerError:
+                # Cancellation kills the worker too; only retry genuine crashes.
+                if manager and job_id and not manager.is_tracked(job_id, worker.pid):
+                    raise SubprocessCancelled(f"Job {job_id} was cancelled") from None
+                if attempt:
+                    raise
+                with self._cond:
+                    self.restarts += 1
+            finally:
+                if manager:
+                    manager.untrack(job_id, worker.pid)
+                self._release(worker, healthy)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            workers = [worker for idle in self._idle.values() for worker in idle]
+            self._idle.clear()
+        for worker in workers:
+            worker.close()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "spawned": self.spawned,
+                "restarts": self.restarts,
+                "requests": self.requests,
+                "evicted": self.evicted,
+                "models": {
+                    Path(model).name: {"idle": len(self._idle.get(model, [])), "busy": self._busy.get(model, 0)}
+                    for model in set(self._idle) | set(self._busy)
+                },
+            }
+
+    def _acquire(self, model_path: Path, length_scale: float | None = None) -> PiperWorker:
+        model = _worker_key(model_path, length_scale)
+        with self._cond:
+            self.requests += 1
+            self._recent[model] = None
+            self._recent.move_to_end(model)
+            while True:
+                idle = self._idle.setdefault(model, [])
+                while idle:
+                    worker = idle.pop()
+                    if worker.alive:
+                        self._busy[model] = self._busy.get(model, 0) + 1
+                        return worker
+                if len(idle) + self._busy.get(model, 0) < self.size:
+                    self._busy[model] = self._busy.get(model, 0) + 1
+                    break
+                self._cond.wait()
+        try:
+            worker = PiperWorker(self.piper_path, model_path, length_scale)
+        except Exception:
+            with self._cond:
+                self._busy[model] -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self.spawned += 1
+        return worker
+
+    def _release(self, worker: PiperWorker, healthy: bool) -> None:
+        model = _worker_key(worker.model_path, worker.length_scale)
+        keep = healthy and worker.alive
+        with self._cond:
+            self._busy[model] = max(0, self._busy.get(model, 0) - 1)
+            if keep:
+                self._idle.setdefault(model, []).append(worker)
+            evicted = self._evict_locked()
+            self._cond.notify_all()
+        if not keep and worker.alive:
+            worker.process.kill()
+        for stale in evicted:
+            stale.close()
+
+    def _evict_locked(self) -> List[PiperWorker]:
+        """Drop idle workers of the least recently used keys beyond max_keys."""
+        evicted: List[PiperWorker] = []
+        for model in list(self._recent):
+            if len(self._recent) <= self.max_keys:
+                break
+            if self._busy.get(model, 0):
+                continue
+            evicted.extend(self._idle.pop(model, []))
+            self._busy.pop(model, None)
+            del self._recent[model]
+        self.evicted += len(evicted)
+        return evicted
+
+
+def _worker_key(model_path: Path, length_scale: float | None) -> str:
+    if length_scale is None:
+        return str(model_path)
+    return f"{model_path}@{length_scale:.3f}"
+
+
+def get_piper_pool(settings) -> PiperPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = PiperPool(settings.PIPER_PATH, settings.PIPER_POOL_SIZE, settings.SUBPROCESS_TIMEOUT_SECONDS)
+        return _POOL
+
+
+def shutdown_piper_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool = _POOL
+        _POOL = None
+    if pool is not None:
+        pool.shutdown()
+
+
+def piper_pool_stats() -> Dict[str, object]:
+    with _POOL_LOCK:
+        pool = _POOL
+    return pool.stats() if pool is not None else {}
@@ -4,9 +4,9 @@ import json
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-from .captions_report import compress_words
 from .metrics import score_hook
 from .variations import rewrite_hook
+from .word_timeline import WordTimeline
 
 
 def apply_hook_gate(
@@ -52,9 +52,9 @@ def apply_caption_gate(
     log_cb=None,
 ) -> Tuple[List[Dict], List[Dict]]:
     attempts: List[Dict] = []
-    current = words
+    timeline = WordTimeline(words)
     for attempt in range(max_retries + 1):
-        wps = _max_wps(current)
+        wps = timeline.max_per_second()
         attempts.append({"attempt": attempt, "max_wps": wps})
         if wps <= max_words_per_second:
             break
@@ -62,20 +62,10 @@ def apply_caption_gate(
             log_cb(
                 f"Quality gate: max words/sec {wps:.2f} above {max_words_per_second}, compressing captions."
             )
-        current = compress_words(current, max_words_per_second)
-    return current, attempts
+        timeline = timeline.compress(max_words_per_second)
+    return timeline.to_words(), attempts
 
 
 def save_report(job_dir: Path, report: Dict) -> None:
     path = job_dir / "quality_report.json"
     path.write_text(json.dumps(report, indent=2), encoding="utf-8")
-
-
-def _max_wps(words: List[Dict]) -> float:
-    buckets = {}
-    for word in words:
-        second = int(float(word.get("start", 0.0)))
-        buckets[second] = buckets.get(second, 0) + 1
-    if not buckets:
-        return 0.0
-    return max(float(v) for v in buckets.values())
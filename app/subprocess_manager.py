@@ -8,9 +8,15 @@ import time
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
+from .cpu_budget import current_lease, pin_to
+
 _MANAGER = None
 
 
+class SubprocessCancelled(RuntimeError):
+    pass
+
+
 @dataclass
 class ProcessInfo:
     pid: int
@@ -26,54 +32,160 @@ class SubprocessManager:
         self._lock = threading.Lock()
         self._processes: Dict[str, List[ProcessInfo]] = {}
 
-    def run(self, args: List[str], job_id: Optional[str] = None, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    def run(
+        self,
+        args: List[str],
+        job_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        input_text: Optional[str] = None,
+    ) -> subprocess.CompletedProcess:
         timeout = timeout if timeout is not None else self.default_timeout
         start = time.time()
-        creationflags = 0
-        preexec = None
-        if os.name == "nt":
-            creationflags = subprocess.CREATE_NEW_PROCESS_GROUP  # type: ignore[attr-defined]
-        else:
-            preexec = os.setsid
-
         process = subprocess.Popen(
             args,
+            stdin=subprocess.PIPE if input_text is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            creationflags=creationflags,
-            preexec_fn=preexec,
-        )
-
-        info = ProcessInfo(
-            pid=process.pid,
-            args=args,
-            started_at=start,
-            timeout=timeout,
-            job_id=job_id,
+            **self._popen_kwargs(),
         )
-        if job_id:
-            with self._lock:
-                self._processes.setdefault(job_id, []).append(info)
 
+        self.track(job_id, process.pid, args, timeout, started_at=start)
         try:
-            stdout, stderr = process.communicate(timeout=timeout)
+            stdout, stderr = process.communicate(input=input_text, timeout=timeout)
+            # cancel_job drops the job's processes, so an untracked pid was killed by it.
+            cancelled = bool(job_id) and not self.is_tracked(job_id, process.pid)
         except subprocess.TimeoutExpired:
             self._kill_process(process.pid)
             raise RuntimeError(f"Subprocess timed out after {timeout:.0f}s: {args}")
         finally:
-            if job_id:
-                with self._lock:
-                    active = self._processes.get(job_id, [])
-                    self._processes[job_id] = [p for p in active if p.pid != process.pid]
-                    if not self._processes[job_id]:
-                        self._processes.pop(job_id, None)
+            self.untrack(job_id, process.pid)
 
+        if cancelled:
+            raise SubprocessCancelled(f"Job {job_id} was cancelled")
         if process.returncode != 0:
             raise subprocess.CalledProcessError(process.returncode, args, output=stdout, stderr=stderr)
 
         return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
 
+    def run_piped(
+        self,
+        producer_args: List[str],
+        consumer_args: List[str],
+        job_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        input_text: Optional[str] = None,
+    ) -> None:
+        """Run `producer | consumer` with the producer's stdout feeding the consumer's stdin.
+
+        Both ends are tracked under job_id, so cancel_job kills the whole pipe; a
+        timeout kills both. Raises SubprocessCancelled when the job was cancelled
+        mid-run, CalledProcessError when either end fails on its own.
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        start = time.time()
+        producer = subprocess.Popen(
+            producer_args,
+            stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **self._popen_kwargs(),
+        )
+        self.track(job_id, producer.pid, producer_args, timeout, started_at=start)
+        try:
+            consumer = subprocess.Popen(
+                consumer_args,
+                stdin=producer.stdout,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                **self._popen_kwargs(),
+            )
+        except Exception:
+            self._kill_pid(producer.pid)
+            self.untrack(job_id, producer.pid)
+            raise
+        # Only the consumer reads the pipe; dropping our copy lets the producer see EPIPE.
+        producer.stdout.close()
+        self.track(job_id, consumer.pid, consumer_args, timeout, started_at=start)
+
+        stderr: Dict[int, bytes] = {}
+
+        def _drain(process: subprocess.Popen) -> None:
+            stderr[process.pid] = process.stderr.read()
+
+        def _feed() -> None:
+            try:
+                producer.stdin.write(input_text.encode("utf-8"))
+                producer.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+        helpers = [threading.Thread(target=_drain, args=(proc,), daemon=True) for proc in (producer, consumer)]
+        if input_text is not None:
+            helpers.append(threading.Thread(target=_feed, daemon=True))
+        for helper in helpers:
+            helper.start()
+        pipe = ((producer, producer_args), (consumer, consumer_args))
+        try:
+            for process, _ in pipe:
+                try:
+                    process.wait(timeout=max(0.0, start + timeout - time.time()))
+                except subprocess.TimeoutExpired:
+                    for other, _ in pipe:
+                        self._kill_pid(other.pid)
+                    raise RuntimeError(f"Subprocess timed out after {timeout:.0f}s: {producer_args} | {consumer_args}")
+            cancelled = bool(job_id) and not all(self.is_tracked(job_id, proc.pid) for proc, _ in pipe)
+        finally:
+            for process, _ in pipe:
+                self.untrack(job_id, process.pid)
+        for helper in helpers:
+            helper.join(timeout=5)
+        if cancelled:
+            raise SubprocessCancelled(f"Job {job_id} was cancelled")
+        for process, args in pipe:
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode,
+                    args,
+                    stderr=stderr.get(process.pid, b"").decode("utf-8", "replace"),
+                )
+
+    def track(
+        self,
+        job_id: Optional[str],
+        pid: int,
+        args: List[str],
+        timeout: Optional[float] = None,
+        started_at: Optional[float] = None,
+    ) -> None:
+        """Attribute a process to a job so cancel_job kills it; long-lived workers
+        register only while they serve that job's request."""
+        if not job_id:
+            return
+        info = ProcessInfo(
+            pid=pid,
+            args=args,
+            started_at=started_at if started_at is not None else time.time(),
+            timeout=timeout if timeout is not None else self.default_timeout,
+            job_id=job_id,
+        )
+        with self._lock:
+            self._processes.setdefault(job_id, []).append(info)
+
+    def untrack(self, job_id: Optional[str], pid: int) -> None:
+        if not job_id:
+            return
+        with self._lock:
+            active = [p for p in self._processes.get(job_id, []) if p.pid != pid]
+            if active:
+                self._processes[job_id] = active
+            else:
+                self._processes.pop(job_id, None)
+
+    def is_tracked(self, job_id: str, pid: int) -> bool:
+        with self._lock:
+            return any(p.pid == pid for p in self._processes.get(job_id, []))
+
     def cancel_job(self, job_id: str) -> int:
         with self._lock:
             processes = list(self._processes.get(job_id, []))
@@ -85,6 +197,20 @@ class SubprocessManager:
             self._processes.pop(job_id, None)
         return killed
 
+    def _popen_kwargs(self) -> Dict[str, object]:
+        """New process group (so kills take the whole tree) plus pinning to the caller's CPU lease."""
+        if os.name == "nt":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}  # type: ignore[attr-defined]
+        lease = current_lease()
+        affinity = lease.cores if lease is not None and lease.pinned else None
+
+        def preexec() -> None:
+            os.setsid()
+            if affinity:
+                pin_to(affinity)
+
+        return {"preexec_fn": preexec}
+
     def _kill_pid(self, pid: int) -> bool:
         try:
             self._kill_process(pid)
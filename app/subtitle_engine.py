@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Karaoke lines break wherever the speaker pauses longer than this.
+KARAOKE_GAP_SECONDS = 0.8
+_HEADER_CACHE_MAX = 32
+_INDEX_CACHE_MAX = 8
+
+_LOCK = threading.Lock()
+_HEADERS: "OrderedDict[Tuple, CompiledHeader]" = OrderedDict()
+_INDEXES: "OrderedDict[Tuple[str, int], WordIndex]" = OrderedDict()
+_STATS: Dict[str, int] = {"header_hits": 0, "header_misses": 0, "index_hits": 0, "index_misses": 0}
+
+
+class CompiledHeader:
+    """Rendered [Script Info]/[V4+ Styles]/[Events] block plus the style it came from."""
+
+    def __init__(self, style: dict) -> None:
+        self.style = style
+        self.bounce_scale = int(style.get("bounce_scale", 110))
+        lines = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            "PlayResX: 1080",
+            "PlayResY: 1920",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour,"
+            " BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing,"
+            " Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+            (
+                "Style: Default,"
+                f"{style.get('font')},{style.get('font_size')},"
+                f"{style.get('primary_color')},{style.get('secondary_color')},"
+                f"{style.get('outline_color')},{style.get('back_color')},"
+                f"{style.get('bold', -1)},0,0,0,100,100,0,0,1,"
+                f"{style.get('outline')},{style.get('shadow')},"
+                f"{style.get('alignment')},{style.get('margin_l')},"
+                f"{style.get('margin_r')},{style.get('margin_v')},1"
+            ),
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+        self.text = "\n".join(lines) + "\n"
+
+
+def load_caption_style(settings, style_name: str, plugin_manager) -> dict:
+    style_path = settings.CAPTION_STYLES_DIR / f"{style_name}.json"
+    style = {}
+    if style_path.exists():
+        try:
+            style = json.loads(style_path.read_text(encoding="utf-8"))
+        except Exception:
+            style = {}
+    if not style:
+        style = {
+            "name": style_name,
+            "font": settings.CAPTION_FONT,
+            "font_size": settings.CAPTION_FONT_SIZE,
+            "primary_color": "&H00FFFFFF",
+            "secondary_color": "&H0000FFFF",
+            "outline_color": "&H00000000",
+            "back_color": "&H64000000",
+            "bold": -1,
+            "outline": 6,
+            "shadow": 3,
+            "alignment": 2,
+            "margin_l": 60,
+            "margin_r": 60,
+            "margin_v": 180,
+            "bounce_scale": 112,
+        }
+    context = {"caption_style": style_name}
+    return plugin_manager.apply_caption_style(style, context)
+
+
+def compile_header(settings, style_name: str, plugin_manager) -> CompiledHeader:
+    """Return the header for a style, reloading only when the style file or plugins change."""
+    style_path = settings.CAPTION_STYLES_DIR / f"{style_name}.json"
+    try:
+        mtime = style_path.stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    key = (
+        str(style_path),
+        mtime,
+        tuple(getattr(plugin_manager, "loaded", ())),
+        settings.CAPTION_FONT,
+        settings.CAPTION_FONT_SIZE,
+    )
+    with _LOCK:
+        header = _HEADERS.get(key)
+        if header is not None:
+            _HEADERS.move_to_end(key)
+            _STATS["header_hits"] += 1
+            return header
+        _STATS["header_misses"] += 1
+    header = CompiledHeader(load_caption_style(settings, style_name, plugin_manager))
+    with _LOCK:
+        _HEADERS[key] = header
+        while len(_HEADERS) > _HEADER_CACHE_MAX:
+            _HEADERS.popitem(last=False)
+    return header
+
+
+class WordIndex:
+    """Words sorted by start time, sliced into preview windows with bisect."""
+
+    def __init__(self, words: Iterable[dict]) -> None:
+        words = list(words)
+        if any(words[i]["start"] > words[i + 1]["start"] for i in range(len(words) - 1)):
+            words.sort(key=lambda word: word["start"])
+        self.words: List[dict] = words
+        self.starts: List[float] = [float(word["start"]) for word in words]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def window(self, start: float, duration: float) -> List[dict]:
+        """Words starting inside [start, start + duration], shifted to the window origin."""
+        lo = bisect_left(self.starts, start)
+        hi = bisect_right(self.starts, start + duration)
+        return [
+            {"start": word["start"] - start, "end": word["end"] - start, "text": word["text"]}
+            for word in self.words[lo:hi]
+        ]
+
+
+def load_word_index(transcript_path: Path) -> WordIndex:
+    """Load transcript.json into a WordIndex, reusing it until the file changes."""
+    path = Path(transcript_path)
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    with _LOCK:
+        index = _INDEXES.get(key)
+        if index is not None:
+            _INDEXES.move_to_end(key)
+            _STATS["index_hits"] += 1
+            return index
+        _STATS["index_misses"] += 1
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    index = WordIndex(payload.get("words", []))
+    with _LOCK:
+        _INDEXES[key] = index
+        while len(_INDEXES) > _INDEX_CACHE_MAX:
+            _INDEXES.popitem(last=False)
+    return index
+
+
+def format_ass_time(seconds: float) -> str:
+    centiseconds = int(round(max(0.0, seconds) * 100))
+    hours, rest = divmod(centiseconds, 360000)
+    minutes, rest = divmod(rest, 6000)
+    secs, centiseconds = divmod(rest, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+
+
+def escape_ass(text: str) -> str:
+    return text.replace("{", "\\{").replace("}", "\\}").replace("\n", " ").strip()
+
+
+def karaoke_events(words: List[dict], bounce_scale: int) -> Iterator[Tuple[float, float, str]]:
+    """Group words into karaoke lines, breaking on pauses longer than KARAOKE_GAP_SECONDS."""
+    if not words:
+        return
+    pieces: List[str] = []
+    line_start = words[0]["start"]
+    last_end = words[0]["end"]
+    for word in words:
+        if word["start"] - last_end > KARAOKE_GAP_SECONDS and pieces:
+            yield line_start, last_end, " ".join(pieces)
+            pieces = []
+            line_start = word["start"]
+        dur_cs = max(1, int(round((word["end"] - word["start"]) * 100)))
+        pieces.append(
+            f"{{\\k{dur_cs}\\fscx{bounce_scale}\\fscy{bounce_scale}}}"
+            f"{escape_ass(word['text'])}{{\\fscx100\\fscy100}}"
+        )
+        last_end = word["end"]
+    if pieces:
+        yield line_start, last_end, " ".join(pieces)
+
+
+def write_ass(ass_path: Path, header: CompiledHeader, events: Iterable[Tuple[float, float, str]]) -> int:
+    """Stream the header and Dialogue lines to disk; returns the number of events written."""
+    ass_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with ass_path.open("w", encoding="utf-8") as handle:
+        handle.write(header.text)
+        for start, end, text in events:
+            handle.write(
+                f"Dialogue: 0,{format_ass_time(start)},{format_ass_time(end)},Default,,0,0,0,,{text}\n"
+            )
+            count += 1
+    return count
+
+
+def subtitle_engine_stats() -> Dict[str, object]:
+    with _LOCK:
+        return {**_STATS, "headers": len(_HEADERS), "indexes": len(_INDEXES)}
@@ -16,6 +16,7 @@ class Template:
     beat_rules: Dict[str, Any]
     forbidden_words: List[str]
     safe_rewrites: Dict[str, str]
+    mtime: float = 0.0
 
 
 class TemplateManager:
@@ -37,6 +38,7 @@ class TemplateManager:
                 template = self._validate(data)
             except Exception:
                 continue
+            template.mtime = path.stat().st_mtime
             self._templates[template.name] = template
 
     def _load_file(self, path: Path) -> Dict[str, Any] | None:
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import wave
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .db import get_connection
+
+_STATS_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_CHUNK_FRAMES = 1 << 16
+
+
+def audio_digest(audio_path: Path) -> str:
+    """sha256 of the PCM payload plus its format, so re-muxed headers still match."""
+    digest = hashlib.sha256()
+    try:
+        with wave.open(str(audio_path), "rb") as handle:
+            digest.update(
+                f"{handle.getnchannels()}:{handle.getsampwidth()}:{handle.getframerate()}".encode("ascii")
+            )
+            while True:
+                frames = handle.readframes(_CHUNK_FRAMES)
+                if not frames:
+                    break
+                digest.update(frames)
+    except (wave.Error, EOFError):
+        digest = hashlib.sha256()
+        with Path(audio_path).open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(audio_path: Path, model: str, compute_type: str, options: Dict[str, Any]) -> str:
+    material = json.dumps(
+        {
+            "audio": audio_digest(audio_path),
+            "model": model,
+            "compute_type": compute_type,
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def get_cached(settings, key: str) -> Tuple[List[dict], List[dict]] | None:
+    with get_connection(settings.DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT words_json, segments_json FROM transcript_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE transcript_cache SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (datetime.utcnow().isoformat(), key),
+            )
+            conn.commit()
+    _bump("hits" if row else "misses")
+    if not row:
+        return None
+    return json.loads(row["words_json"]), json.loads(row["segments_json"])
+
+
+def put_cached(settings, key: str, model: str, words: List[dict], segments: List[dict]) -> None:
+    now = datetime.utcnow().isoformat()
+    # Compact separators keep long transcripts small; word dicts are already flat.
+    words_json = json.dumps(words, separators=(",", ":"))
+    segments_json = json.dumps(segments, separators=(",", ":"))
+    with get_connection(settings.DB_PATH) as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO transcript_cache
+                (key, created_at, last_used, model, size_bytes, hits, words_json, segments_json)
+            VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+            """,
+            (key, now, now, model, len(words_json) + len(segments_json), words_json, segments_json),
+        )
+        conn.commit()
+    _bump("writes")
+    _evict(settings)
+
+
+def clear_cache(settings) -> int:
+    with get_connection(settings.DB_PATH) as conn:
+        cursor = conn.execute("DELETE FROM transcript_cache")
+        conn.commit()
+    return cursor.rowcount
+
+
+def cache_stats(settings) -> Dict[str, object]:
+    with get_connection(settings.DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(size_bytes), 0) AS size_bytes FROM transcript_cache"
+        ).fetchone()
+    with _STATS_LOCK:
+        counters = dict(_STATS)
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        "entries": int(row["entries"]),
+        "size_bytes": int(row["size_bytes"]),
+        "enabled": settings.TRANSCRIPT_CACHE_ENABLED,
+        "max_entries": settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+    }
+
+
+def _evict(settings) -> None:
+    with get_connection(settings.DB_PATH) as conn:
+        removed = conn.execute(
+            """
+            DELETE FROM transcript_cache WHERE key IN (
+                SELECT key FROM transcript_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (max(0, settings.TRANSCRIPT_CACHE_MAX_ENTRIES),),
+        ).rowcount
+        conn.commit()
+    if removed:
+        _bump("evictions", removed)
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[name] = _STATS.get(name, 0) + amount
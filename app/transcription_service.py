@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .captions import TranscriptSegment, _load_whisper, _whisper_key, _word_dict, batching_available
+from .cpu_budget import get_cpu_budget
+from .model_ops.whisper_cache import get_whisper_cache
+
+SAMPLE_RATE = 16000
+# Silence between concatenated voiceovers. VAD still packs speech into chunks of up
+# to 30s across it, so segments are split back at job boundaries by word timestamps.
+GAP_SECONDS = 2.0
+MAX_JOBS_PER_BATCH = 8
+
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+
+@dataclass
+class TranscriptionRequest:
+    audio_path: Path
+    future: Future = field(default_factory=Future)
+    queued_at: float = field(default_factory=time.time)
+
+
+class TranscriptionService:
+    """Collects caption requests from concurrent jobs and transcribes them together.
+
+    Voiceovers that arrive within the batch window are decoded, joined with
+    silence gaps and run through faster-whisper's BatchedInferencePipeline in one
+    pass; words are split back per job by their timestamps, and a segment that
+    reaches across a gap is cut at the job boundary.
+    """
+
+    def __init__(self, settings, window_seconds: float, batch_size: int) -> None:
+        self.settings = settings
+        self.window_seconds = max(0.0, window_seconds)
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue[TranscriptionRequest]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._recent: "deque[dict]" = deque(maxlen=50)
+        self.requests = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def transcribe(self, audio_path: Path) -> Tuple[List[dict], List[TranscriptSegment], Dict[str, object]]:
+        request = TranscriptionRequest(audio_path=Path(audio_path))
+        with self._lock:
+            self.requests += 1
+        self._queue.put(request)
+        return request.future.result()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "window_ms": int(self.window_seconds * 1000),
+                "batch_size": self.batch_size,
+                "requests": self.requests,
+                "batches": self.batches,
+                "pending": self._queue.qsize(),
+                "recent": list(self._recent),
+            }
+
+    def _loop(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.time() + self.window_seconds
+            while len(pending) < MAX_JOBS_PER_BATCH:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._run_batch(pending)
+            except Exception as exc:
+                for request in pending:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+
+    def _run_batch(self, batch: List[TranscriptionRequest]) -> None:
+        import numpy as np
+        from faster_whisper import BatchedInferencePipeline, decode_audio
+
+        started = time.time()
+        # Decode up front so one unreadable voice.wav fails only its own request.
+        decoded = []
+        for request in batch:
+            try:
+                decoded.append((request, decode_audio(str(request.audio_path), sampling_rate=SAMPLE_RATE)))
+            except Exception as exc:
+                request.future.set_exception(exc)
+        if not decoded:
+            return
+        batch = [request for request, _ in decoded]
+        key = _whisper_key(self.settings)
+        cache = get_whisper_cache(self.settings)
+        budget = get_cpu_budget(self.settings)
+        lease = budget.acquire("whisper_batch", key[3]) if key[1] == "cpu" else None
+        try:
+            model, load_seconds = cache.acquire(key, lambda: _load_whisper(key))
+        except Exception:
+            if lease is not None:
+                budget.release(lease)
+            raise
+        try:
+            gap = np.zeros(int(GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+            pieces = []
+            spans: List[Tuple[float, float]] = []
+            cursor = 0.0
+            for idx, (_request, audio) in enumerate(decoded):
+                if idx:
+                    pieces.append(gap)
+                    cursor += GAP_SECONDS
+                pieces.append(audio)
+                duration = len(audio) / SAMPLE_RATE
+                spans.append((cursor, cursor + duration))
+                cursor += duration
+            joined = np.concatenate(pieces) if len(pieces) > 1 else pieces[0]
+
+            inference_start = time.time()
+            pipeline = BatchedInferencePipeline(model=model)
+            segments, _info = pipeline.transcribe(
+                joined,
+                word_timestamps=True,
+                batch_size=self.batch_size,
+                beam_size=5,
+            )
+            words: List[List[dict]] = [[] for _ in batch]
+            segments_out: List[List[TranscriptSegment]] = [[] for _ in batch]
+            for segment in segments:
+                for owner, segment_out, owned in _split_segment(spans, segment):
+                    segments_out[owner].append(segment_out)
+                    words[owner].extend(_word_dict(word, spans[owner][0]) for word in owned)
+            inference_seconds = time.time() - inference_start
+        finally:
+            cache.release(key)
+            if lease is not None:
+                budget.release(lease)
+
+        with self._lock:
+            self.batches += 1
+        for idx, request in enumerate(batch):
+            timings = {
+                "load_seconds": round(load_seconds, 3),
+                "transcribe_seconds": round(inference_seconds, 3),
+                "queue_wait_seconds": round(started - request.queued_at, 3),
+                "batch_jobs": len(batch),
+            }
+            if lease is not None:
+                timings["cpu_threads"] = lease.threads
+                timings["cpu_wait_seconds"] = round(lease.wait_seconds, 3)
+            with self._lock:
+                self._recent.append({"audio": str(request.audio_path), **timings})
+            request.future.set_result((words[idx], segments_out[idx], timings))
+
+
+def _split_segment(spans: List[Tuple[float, float]], segment) -> List[Tuple[int, TranscriptSegment, list]]:
+    """Cut a decoded segment at job boundaries: (owner, segment, words) per job it covers.
+
+    A segment whose words all belong to one job is kept as decoded; one that spans
+    several is rebuilt per job from that job's words.
+    """
+    by_owner: Dict[int, list] = {}
+    for word in segment.words or []:
+        by_owner.setdefault(_owner(spans, (float(word.start) + float(word.end)) / 2.0), []).append(word)
+    if len(by_owner) <= 1:
+        owner = next(iter(by_owner), None)
+        if owner is None:
+            owner = _owner(spans, (float(segment.start) + float(segment.end)) / 2.0)
+        offset = spans[owner][0]
+        kept = TranscriptSegment(float(segment.start) - offset, float(segment.end) - offset, segment.text)
+        return [(owner, kept, by_owner.get(owner, []))]
+    parts = []
+    for owner, owned in sorted(by_owner.items()):
+        offset = spans[owner][0]
+        text = "".join(word.word for word in owned)
+        parts.append(
+            (owner, TranscriptSegment(float(owned[0].start) - offset, float(owned[-1].end) - offset, text), owned)
+        )
+    return parts
+
+
+def _owner(spans: List[Tuple[float, float]], midpoint: float) -> int:
+    for idx, (_start, end) in enumerate(spans):
+        if midpoint <= end + GAP_SECONDS / 2.0:
+            return idx
+    return len(spans) - 1
+
+
+def get_transcription_service(settings) -> TranscriptionService:
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = TranscriptionService(
+                settings,
+                settings.WHISPER_BATCH_WINDOW_MS / 1000.0,
+                settings.WHISPER_BATCH_SIZE,
+            )
+        return _SERVICE
+
+
+def transcription_service_stats() -> Dict[str, object]:
+    with _SERVICE_LOCK:
+        service = _SERVICE
+    if service is None:
+        return {} if batching_available() else {"available": False}
+    return service.stats()
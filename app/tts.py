@@ -1,8 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Tuple
 
-from .utils import run_subprocess
+from .piper_pool import get_piper_pool
+from .tts_cache import cached_voice, link_into, tts_cache_key
+from .subprocess_manager import SubprocessCancelled
+from .utils import run_piped_subprocess, run_subprocess, write_json
+
+SENTENCE_GAP_SECONDS = 0.2
+DEFAULT_SAMPLE_RATE = 22050
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
 
 
 def _build_atempo(speed: float) -> str:
@@ -20,85 +35,395 @@ def _build_atempo(speed: float) -> str:
     return ",".join(parts)
 
 
-def synthesize_voice(
+def split_sentences(text: str) -> List[str]:
+    return [part.strip() for part in _SENTENCE_SPLIT.split(text.strip()) if part.strip()]
+
+
+def render_length_scale(settings, speech_speed: float) -> float | None:
+    """Piper length scale for VOICE_MASTER_IN_RENDER, which replaces the atempo pass."""
+    if not settings.VOICE_MASTER_IN_RENDER or abs(speech_speed - 1.0) < 0.01:
+        return None
+    return round(1.0 / speech_speed, 3)
+
+
+def wav_duration(path: Path) -> float:
+    """Exact length from the WAV header's frame count; 0.0 when the file is not plain PCM WAV."""
+    try:
+        with wave.open(str(path), "rb") as handle:
+            return handle.getnframes() / float(handle.getframerate())
+    except (OSError, EOFError, wave.Error):
+        return 0.0
+
+
+def _piper_synthesize(
     settings,
-    text: str,
-    voice: str,
-    out_dir: Path,
-    speech_speed: float,
+    model_path: Path,
+    items: List[Tuple[str, Path]],
     job_id: str | None = None,
-) -> Path:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    raw_path = out_dir / "voice_raw.wav"
-    final_path = out_dir / "voice.wav"
+    length_scale: float | None = None,
+) -> None:
+    """Write each (text, output_file) item with Piper's JSON-line input.
 
-    model_path = settings.resolve_piper_model(voice)
-    if not model_path:
-        raise ValueError(
-            "Piper model not found. Set PIPER_MODEL_PATH/PIPER_VOICES_DIR or place a .onnx in models/piper."
-        )
+    Uses a warm worker from the Piper pool when enabled, otherwise one Piper run
+    for the whole batch; either way the text never goes through argv.
+    """
+    if settings.PIPER_POOL_ENABLED:
+        get_piper_pool(settings).synthesize(model_path, items, job_id=job_id, length_scale=length_scale)
+        return
+    args = [settings.PIPER_PATH, "--model", str(model_path), "--json-input"]
+    if length_scale is not None:
+        args += ["--length_scale", f"{length_scale:.3f}"]
+    lines = [json.dumps({"text": text, "output_file": str(path)}) for text, path in items]
+    run_subprocess(args, job_id=job_id, input_text="\n".join(lines) + "\n")
+
+
+def _synthesize_sentences(
+    settings,
+    model_path: Path,
+    sentences: List[str],
+    raw_path: Path,
+    job_id: str | None = None,
+    length_scale: float | None = None,
+) -> dict:
+    """Synthesize each sentence in one Piper batch and join them into raw_path.
+
+    Returns the sentence boundaries (in raw, pre-atempo seconds) measured from the
+    per-sentence WAV files, which serve as alignment for ASR-free captions.
+    """
+    parts_dir = raw_path.parent / "voice_sentences"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    part_paths = [parts_dir / f"sentence_{idx:03d}.wav" for idx in range(len(sentences))]
+    _piper_synthesize(settings, model_path, list(zip(sentences, part_paths)), job_id=job_id, length_scale=length_scale)
+
+    boundaries, raw_duration = _join_wavs(list(zip(sentences, part_paths)), raw_path, SENTENCE_GAP_SECONDS)
+    for path in part_paths:
+        path.unlink(missing_ok=True)
+    return {"source": "piper_sentences", "sentences": boundaries, "raw_duration": raw_duration}
 
-    piper_args = [
-        settings.PIPER_PATH,
-        "--model",
-        str(model_path),
-        "--output_file",
-        str(raw_path),
-        "--text",
-        text,
-    ]
-    run_subprocess(piper_args, job_id=job_id)
 
+def _join_wavs(parts: List[Tuple[str, Path]], out_path: Path, gap_seconds: float) -> Tuple[List[dict], float]:
+    """Concatenate (text, wav) parts with silent gaps; returns their boundaries and total length."""
+    boundaries = []
+    cursor = 0.0
+    params = None
+    with wave.open(str(out_path), "wb") as out:
+        for idx, (text, path) in enumerate(parts):
+            with wave.open(str(path), "rb") as part:
+                if params is None:
+                    params = part.getparams()
+                    out.setparams(params)
+                frames = part.readframes(part.getnframes())
+                duration = part.getnframes() / float(part.getframerate())
+            if idx:
+                gap_frames = int(gap_seconds * params.framerate)
+                out.writeframes(b"\x00" * gap_frames * params.sampwidth * params.nchannels)
+                cursor += gap_frames / float(params.framerate)
+            out.writeframes(frames)
+            boundaries.append({"text": text, "start": round(cursor, 4), "end": round(cursor + duration, 4)})
+            cursor += duration
+    return boundaries, round(cursor, 4)
+
+
+def _voice_filters(speech_speed: float) -> str:
     filters = []
     atempo = _build_atempo(speech_speed)
     if atempo:
         filters.append(atempo)
     filters.append("loudnorm=I=-14:LRA=11:TP=-1.5")
-    filter_str = ",".join(filters)
+    return ",".join(filters)
+
 
+def _master_voice(settings, raw_path: Path, final_path: Path, speech_speed: float, job_id: str | None = None) -> None:
+    # final_path may be a hardlink into the TTS cache; never write through it.
+    final_path.unlink(missing_ok=True)
     ffmpeg_args = [
         settings.FFMPEG_PATH,
         "-y",
         "-i",
         str(raw_path),
         "-af",
-        filter_str,
+        _voice_filters(speech_speed),
         str(final_path),
     ]
     run_subprocess(ffmpeg_args, job_id=job_id)
-    return final_path
 
 
-def synthesize_preview(settings, text: str, voice: str, out_dir: Path) -> Path:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    raw_path = out_dir / f"{voice}_raw.wav"
-    final_path = out_dir / f"{voice}.wav"
+def model_sample_rate(model_path: Path) -> int:
+    """Output rate from the voice's .onnx.json sidecar; Piper's raw PCM carries no header."""
+    try:
+        config = json.loads(Path(f"{model_path}.json").read_text(encoding="utf-8"))
+        return int(config.get("audio", {}).get("sample_rate") or DEFAULT_SAMPLE_RATE)
+    except Exception:
+        return DEFAULT_SAMPLE_RATE
+
+
+def _stream_voice(
+    settings, model_path: Path, text: str, final_path: Path, speech_speed: float, job_id: str | None = None
+) -> None:
+    """Pipe Piper's raw PCM straight into the mastering FFmpeg: one pass, no voice_raw.wav."""
+    final_path.unlink(missing_ok=True)
+    run_piped_subprocess(
+        [settings.PIPER_PATH, "--model", str(model_path), "--output-raw"],
+        [
+            settings.FFMPEG_PATH,
+            "-y",
+            "-f",
+            "s16le",
+            "-ar",
+            str(model_sample_rate(model_path)),
+            "-ac",
+            "1",
+            "-i",
+            "pipe:0",
+            "-af",
+            _voice_filters(speech_speed),
+            str(final_path),
+        ],
+        job_id=job_id,
+        # Piper speaks one utterance per input line.
+        input_text=" ".join(text.split()) + "\n",
+    )
+
 
+def _require_model(settings, voice: str) -> Path:
     model_path = settings.resolve_piper_model(voice)
     if not model_path:
         raise ValueError(
             "Piper model not found. Set PIPER_MODEL_PATH/PIPER_VOICES_DIR or place a .onnx in models/piper."
         )
+    return model_path
 
-    piper_args = [
-        settings.PIPER_PATH,
-        "--model",
-        str(model_path),
-        "--output_file",
-        str(raw_path),
-        "--text",
-        text,
-    ]
-    run_subprocess(piper_args)
 
-    ffmpeg_args = [
-        settings.FFMPEG_PATH,
-        "-y",
-        "-i",
-        str(raw_path),
-        "-af",
-        "loudnorm=I=-14:LRA=11:TP=-1.5",
-        str(final_path),
-    ]
-    run_subprocess(ffmpeg_args)
+def synthesize_voice(
+    settings,
+    text: str,
+    voice: str,
+    out_dir: Path,
+    speech_speed: float,
+    job_id: str | None = None,
+    with_alignment: bool = False,
+    use_cache: bool = True,
+) -> Path:
+    """Synthesize and master text into out_dir/voice.wav.
+
+    With TTS_CACHE_ENABLED the mastered WAV (and its sentence alignment) comes from
+    the TTS cache when the same text, model and speed were rendered before, and is
+    hardlinked into out_dir. With VOICE_MASTER_IN_RENDER there is no FFmpeg pass:
+    Piper speaks at the target speed and loudness is left to the render's mastering.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    raw_path = out_dir / "voice_raw.wav"
+    final_path = out_dir / "voice.wav"
+
+    model_path = _require_model(settings, voice)
+
+    alignment_path = out_dir / "voice_alignment.json"
+    alignment_path.unlink(missing_ok=True)
+    sentences = split_sentences(text) if with_alignment else []
+
+    length_scale = render_length_scale(settings, speech_speed)
+
+    def _build(wav_path: Path) -> dict | None:
+        if settings.VOICE_MASTER_IN_RENDER:
+            return _synthesize_unmastered(
+                settings, model_path, text, sentences, raw_path, wav_path, length_scale, job_id
+            )
+        alignment = None
+        if sentences:
+            try:
+                alignment = _synthesize_sentences(settings, model_path, sentences, raw_path, job_id=job_id)
+            except SubprocessCancelled:
+                raise
+            except Exception:
+                alignment = None
+        # Pooled workers write files from JSON lines, so streaming would bypass the warm pool.
+        if alignment is None and settings.TTS_STREAMING and not settings.PIPER_POOL_ENABLED:
+            try:
+                _stream_voice(settings, model_path, text, wav_path, speech_speed, job_id=job_id)
+                raw_path.unlink(missing_ok=True)
+                return None
+            except SubprocessCancelled:
+                raise
+            except subprocess.CalledProcessError:
+                # e.g. a Piper build without --output-raw; the file-based path still works.
+                pass
+        if alignment is None:
+            _piper_synthesize(settings, model_path, [(text, raw_path)], job_id=job_id)
+        _master_voice(settings, raw_path, wav_path, speech_speed, job_id=job_id)
+        if alignment is not None:
+            alignment["speech_speed"] = speech_speed
+        return alignment
+
+    if use_cache and settings.TTS_CACHE_ENABLED:
+        post_filters = (
+            f"unmastered:length_scale={length_scale}" if settings.VOICE_MASTER_IN_RENDER else _voice_filters(speech_speed)
+        )
+        key = tts_cache_key(text, model_path, speech_speed, post_filters, "sentences" if sentences else "full")
+        cached_path, alignment, _ = cached_voice(settings, key, _build)
+        link_into(cached_path, final_path)
+    else:
+        alignment = _build(final_path)
+    if alignment is not None:
+        write_json(alignment_path, alignment)
     return final_path
+
+
+def _synthesize_unmastered(
+    settings,
+    model_path: Path,
+    text: str,
+    sentences: List[str],
+    raw_path: Path,
+    wav_path: Path,
+    length_scale: float | None,
+    job_id: str | None = None,
+) -> dict | None:
+    """Write Piper's output to wav_path with no FFmpeg pass; timings are already at the final speed."""
+    wav_path.unlink(missing_ok=True)
+    if sentences:
+        try:
+            # Sentence parts live next to raw_path in the job dir, then the joined file moves over.
+            alignment = _synthesize_sentences(
+                settings, model_path, sentences, raw_path, job_id=job_id, length_scale=length_scale
+            )
+            shutil.move(str(raw_path), str(wav_path))
+            alignment["speech_speed"] = 1.0
+            return alignment
+        except SubprocessCancelled:
+            raw_path.unlink(missing_ok=True)
+            raise
+        except Exception:
+            raw_path.unlink(missing_ok=True)
+    _piper_synthesize(settings, model_path, [(text, wav_path)], job_id=job_id, length_scale=length_scale)
+    return None
+
+
+def beat_clip_key(text: str, voice: str, model_path: Path, length_scale: float | None = None) -> str:
+    """Clips are raw Piper output; speed only matters when Piper itself applies it via length_scale."""
+    stat = model_path.stat()
+    payload = [text, voice, str(model_path), stat.st_size, stat.st_mtime_ns, length_scale]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def synthesize_beats(
+    settings,
+    beats: List[dict],
+    voice: str,
+    out_dir: Path,
+    speech_speed: float,
+    job_id: str | None = None,
+    with_alignment: bool = False,
+) -> Tuple[Path, List[dict]]:
+    """Synthesize each beat as its own clip and join them into voice.wav.
+
+    Clips are kept in out_dir/beat_clips, so re-rendering after a beat edit only
+    synthesizes the beats whose text changed. Missing clips are split across
+    TTS_BEAT_WORKERS concurrent Piper batches. Returns the voice path and the
+    start/end of every spoken beat in final (post-atempo) seconds, which are
+    also written to beat_timings.json. With VOICE_MASTER_IN_RENDER the clips are
+    spoken at the target speed and joined straight into voice.wav.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    raw_path = out_dir / "voice_raw.wav"
+    final_path = out_dir / "voice.wav"
+    clips_dir = out_dir / "beat_clips"
+    clips_dir.mkdir(parents=True, exist_ok=True)
+
+    model_path = _require_model(settings, voice)
+    length_scale = render_length_scale(settings, speech_speed)
+
+    spoken = [(idx, str(beat.get("text", "")).strip()) for idx, beat in enumerate(beats)]
+    spoken = [(idx, text) for idx, text in spoken if text]
+    if not spoken:
+        raise ValueError("No beat text to synthesize")
+    clip_paths = {
+        text: clips_dir / f"{beat_clip_key(text, voice, model_path, length_scale)}.wav" for _, text in spoken
+    }
+    missing = [(text, path) for text, path in clip_paths.items() if not path.exists()]
+    if missing:
+        workers = max(1, min(settings.TTS_BEAT_WORKERS, len(missing)))
+        batches = [missing[offset::workers] for offset in range(workers)]
+
+        def _render(batch: List[Tuple[str, Path]]) -> None:
+            # Write to temp names so a cancelled run never leaves a truncated clip behind.
+            temp_items = [(text, path.with_suffix(".tmp.wav")) for text, path in batch]
+            try:
+                _piper_synthesize(settings, model_path, temp_items, job_id=job_id, length_scale=length_scale)
+                for (_, path), (_, temp_path) in zip(batch, temp_items):
+                    temp_path.replace(path)
+            finally:
+                for _, temp_path in temp_items:
+                    temp_path.unlink(missing_ok=True)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(_render, batch) for batch in batches]:
+                future.result()
+
+    parts = [(text, clip_paths[text]) for _, text in spoken]
+    if settings.VOICE_MASTER_IN_RENDER:
+        final_path.unlink(missing_ok=True)
+        boundaries, raw_duration = _join_wavs(parts, final_path, settings.TTS_BEAT_GAP_SECONDS)
+        speed = 1.0
+    else:
+        boundaries, raw_duration = _join_wavs(parts, raw_path, settings.TTS_BEAT_GAP_SECONDS)
+        _master_voice(settings, raw_path, final_path, speech_speed, job_id=job_id)
+        speed = speech_speed if abs(speech_speed - 1.0) >= 0.01 else 1.0
+    timings = [
+        {
+            "index": idx,
+            "text": text,
+            "start": round(bounds["start"] / speed, 3),
+            "end": round(bounds["end"] / speed, 3),
+        }
+        for (idx, text), bounds in zip(spoken, boundaries)
+    ]
+    write_json(
+        out_dir / "beat_timings.json",
+        {"voice": voice, "speech_speed": speech_speed, "synthesized": len(missing), "beats": timings},
+    )
+
+    alignment_path = out_dir / "voice_alignment.json"
+    alignment_path.unlink(missing_ok=True)
+    if with_alignment:
+        write_json(
+            alignment_path,
+            {
+                "source": "piper_beats",
+                "sentences": boundaries,
+                "raw_duration": raw_duration,
+                "speech_speed": speed,
+            },
+        )
+
+    keep = {path.name for path in clip_paths.values()}
+    for stale in clips_dir.glob("*.wav"):
+        if stale.name not in keep:
+            stale.unlink(missing_ok=True)
+    return final_path, timings
+
+
+def synthesize_preview(settings, text: str, voice: str, out_dir: Path) -> Path:
+    """Render a voice sample.
+
+    With TTS_CACHE_ENABLED the cache entry itself is returned: repeated texts are
+    instant and concurrent previews never overwrite each other's file.
+    """
+    model_path = _require_model(settings, voice)
+    if not settings.TTS_CACHE_ENABLED:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        raw_path = out_dir / f"{voice}_raw.wav"
+        final_path = out_dir / f"{voice}.wav"
+        _piper_synthesize(settings, model_path, [(text, raw_path)])
+        _master_voice(settings, raw_path, final_path, 1.0)
+        return final_path
+
+    def _build(wav_path: Path) -> None:
+        raw_path = wav_path.with_name(f"{wav_path.stem}.raw")
+        try:
+            _piper_synthesize(settings, model_path, [(text, raw_path)])
+            _master_voice(settings, raw_path, wav_path, 1.0)
+        finally:
+            raw_path.unlink(missing_ok=True)
+
+    cached_path, _, _ = cached_voice(settings, tts_cache_key(text, model_path, 1.0, _voice_filters(1.0)), _build)
+    return cached_path
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from .utils import ensure_dir
+
+_LOCK = threading.Lock()
+_KEY_LOCKS: Dict[str, threading.Lock] = {}
+_STATS: Dict[str, float] = {
+    "hits": 0,
+    "misses": 0,
+    "failures": 0,
+    "evictions": 0,
+    "entries": 0,
+    "bytes": 0,
+    "build_seconds": 0.0,
+}
+
+
+def cache_dir(settings) -> Path:
+    return settings.OUTPUTS_DIR / "tts_cache"
+
+
+def model_identity(model_path: Path) -> list:
+    """Path, size and mtime of the voice model and its .json sidecar, so a replaced model misses."""
+    identity = []
+    for path in (Path(model_path), Path(f"{model_path}.json")):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        identity.append([str(path), stat.st_size, stat.st_mtime_ns])
+    return identity
+
+
+def tts_cache_key(text: str, model_path: Path, speech_speed: float, filter_chain: str, mode: str = "full") -> str:
+    """Hash of everything that shapes the final WAV: text, model, speed and post-filters."""
+    payload = [text, model_identity(model_path), round(speech_speed, 4), filter_chain, mode]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def link_into(source: Path, target: Path) -> Path:
+    """Hardlink source to target (copying across filesystems), replacing whatever target was."""
+    ensure_dir(target.parent)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    return target
+
+
+def cached_voice(
+    settings,
+    key: str,
+    build: Callable[[Path], dict | None],
+) -> Tuple[Path, dict | None, bool]:
+    """Return the cached WAV for key, running build(temp_wav) on a miss.
+
+    build may return a metadata dict (e.g. sentence alignment), stored next to the
+    WAV and handed back on later hits. Concurrent callers with the same key wait
+    for the first one instead of synthesizing twice. Returns (wav, meta, hit).
+    """
+    root = cache_dir(settings)
+    wav_path = root / f"{key}.wav"
+    meta_path = root / f"{key}.json"
+    with _LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        if wav_path.exists():
+            os.utime(wav_path)
+            _bump("hits")
+            return wav_path, _read_meta(meta_path), True
+        _bump("misses")
+        ensure_dir(root)
+        temp_path = root / f"{key}.tmp.wav"
+        start = time.time()
+        try:
+            meta = build(temp_path)
+            if meta is not None:
+                meta_path.write_text(json.dumps(meta), encoding="utf-8")
+            temp_path.replace(wav_path)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            _bump("failures")
+            raise
+        _bump("build_seconds", time.time() - start)
+    _prune(settings)
+    return wav_path, meta, False
+
+
+def tts_cache_stats() -> Dict[str, object]:
+    with _LOCK:
+        stats = dict(_STATS)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["build_seconds"] = round(stats["build_seconds"], 3)
+    return stats
+
+
+def _read_meta(meta_path: Path) -> dict | None:
+    if not meta_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def _prune(settings) -> None:
+    """Evict least recently used entries until the cache fits in TTS_CACHE_MAX_MB."""
+    limit = max(1, settings.TTS_CACHE_MAX_MB) * 1024 * 1024
+    entries = []
+    for path in cache_dir(settings).glob("*.wav"):
+        if path.name.endswith(".tmp.wav"):
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort(reverse=True)
+    total = 0
+    kept = 0
+    evicted = 0
+    for idx, (_, size, path) in enumerate(entries):
+        # Always keep the newest entry, even when it alone is over the limit.
+        if idx and total + size > limit:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+            evicted += 1
+            continue
+        total += size
+        kept += 1
+    with _LOCK:
+        _STATS["evictions"] += evicted
+        _STATS["entries"] = kept
+        _STATS["bytes"] = total
+
+
+def _bump(name: str, amount: float = 1) -> None:
+    with _LOCK:
+        _STATS[name] = _STATS.get(name, 0) + amount
@@ -25,6 +25,7 @@ def run_subprocess(
     args: List[str],
     job_id: str | None = None,
     timeout: float | None = None,
+    input_text: str | None = None,
 ) -> subprocess.CompletedProcess:
     try:
         from .subprocess_manager import get_manager
@@ -34,10 +35,11 @@ def run_subprocess(
     if get_manager:
         manager = get_manager()
         if manager:
-            return manager.run(args, job_id=job_id, timeout=timeout)
+            return manager.run(args, job_id=job_id, timeout=timeout, input_text=input_text)
 
     return subprocess.run(
         args,
+        input=input_text,
         capture_output=True,
         text=True,
         check=True,
@@ -45,6 +47,20 @@ def run_subprocess(
     )
 
 
+def run_piped_subprocess(
+    producer_args: List[str],
+    consumer_args: List[str],
+    job_id: str | None = None,
+    timeout: float | None = None,
+    input_text: str | None = None,
+) -> None:
+    """Run `producer | consumer` through the SubprocessManager so cancellation kills both ends."""
+    from .subprocess_manager import SubprocessManager, get_manager
+
+    manager = get_manager() or SubprocessManager(timeout if timeout is not None else 1800.0)
+    manager.run_piped(producer_args, consumer_args, job_id=job_id, timeout=timeout, input_text=input_text)
+
+
 def ffmpeg_filter_path(path: Path) -> str:
     raw = str(path).replace("\\", "/")
     return raw.replace(":", "\\:")
@@ -4,6 +4,7 @@ import json
 import random
 from typing import List
 
+from .json_grammar import CANDIDATES_SHAPE, VARIANTS_SHAPE
 from .llm import generate_text
 from .metrics import score_hook
 from .models import GenerateRequest
@@ -50,7 +51,7 @@ def rewrite_hook(settings, hook_text: str, style: str) -> List[str]:
         f"Style: {style}\n"
         "Return JSON: {\"candidates\": [\"...\", \"...\", \"...\", \"...\", \"...\"]}"
     )
-    raw = generate_text(settings, system, prompt, seed=None)
+    raw = generate_text(settings, system, prompt, seed=None, json_shape=CANDIDATES_SHAPE)
     payload = _extract_json(raw)
     candidates = payload.get("candidates", [])
     return [str(item).strip() for item in candidates if str(item).strip()][:5]
@@ -64,7 +65,7 @@ def generate_variants(settings, topic_prompt: str, style: str, num_hooks: int, n
         f"Generate {num_hooks} hook ideas and {num_titles} title ideas.\n"
         "Return JSON: {\"hooks\": [\"...\"], \"titles\": [\"...\"]}"
     )
-    raw = generate_text(settings, system, prompt, seed=None)
+    raw = generate_text(settings, system, prompt, seed=None, json_shape=VARIANTS_SHAPE)
     payload = _extract_json(raw)
     hooks = [str(item).strip() for item in payload.get("hooks", [])][:num_hooks]
     titles = [str(item).strip() for item in payload.get("titles", [])][:num_titles]
@@ -8,6 +8,7 @@ from typing import List, Tuple
 from .metrics import compute_metrics, score_hook
 from .models import ScriptOutput
 from .utils import write_json
+from .word_timeline import WordTimeline, load_timeline
 
 
 def compute_virality_score(settings, job_id: str) -> dict:
@@ -24,13 +25,7 @@ def compute_virality_score(settings, job_id: str) -> dict:
 
     metrics = compute_metrics(settings, job_id)
     hook_score, hook_reasons = score_hook(script.get("hook", ""))
-    words = []
-    if transcript_path.exists():
-        try:
-            transcript = json.loads(transcript_path.read_text(encoding="utf-8"))
-            words = transcript.get("words", [])
-        except Exception:
-            words = []
+    timeline = load_timeline(transcript_path)
 
     beat_density = metrics.get("beat_density", [])
     words_per_second = metrics.get("words_per_second", [])
@@ -39,7 +34,7 @@ def compute_virality_score(settings, job_id: str) -> dict:
     beat_score, beat_reason = _score_range(_beats_per_10s(beat_density), 4.0, 7.0, "beats/10s")
     wps_score, wps_reason = _score_range(_avg(words_per_second), 2.5, 4.2, "words/sec")
     cut_score, cut_reason = _score_range(_avg_per_10s(cut_frequency), 4.0, 8.0, "cuts/10s")
-    stability_score = _caption_stability(words)
+    stability_score = _caption_stability(timeline)
 
     score = _weighted_score(
         {
@@ -122,12 +117,10 @@ def _avg_per_10s(series: List[int]) -> float:
     return per_second * 10.0
 
 
-def _caption_stability(words: List[dict]) -> int:
-    if not words:
+def _caption_stability(timeline: WordTimeline) -> int:
+    if not len(timeline):
         return 90
-    durations = [max(0.0, float(w.get("end", 0)) - float(w.get("start", 0))) for w in words]
-    short = [d for d in durations if d < 0.18]
-    ratio = len(short) / max(1, len(durations))
+    ratio = timeline.short_ratio(0.18)
     return max(0, min(100, int(round(100 - ratio * 100))))
 
 
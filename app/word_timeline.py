@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_CACHE_MAX = 16
+_CACHE_LOCK = threading.Lock()
+_CACHE: "OrderedDict[Tuple[str, int], WordTimeline]" = OrderedDict()
+
+
+class WordTimeline:
+    """Word timings as parallel start/end arrays for vectorized caption analytics.
+
+    The original word dicts are kept alongside so compressed timelines can be
+    written back to transcript.json unchanged.
+    """
+
+    __slots__ = ("starts", "ends", "texts", "_words")
+
+    def __init__(self, words: Sequence[Dict]) -> None:
+        self._words: List[Dict] = list(words)
+        self.starts = np.fromiter(
+            (float(w.get("start", 0.0)) for w in self._words), dtype=np.float64, count=len(self._words)
+        )
+        self.ends = np.fromiter(
+            (float(w.get("end", 0.0)) for w in self._words), dtype=np.float64, count=len(self._words)
+        )
+        self.texts: List[str] = [str(w.get("text", "")) for w in self._words]
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def duration(self) -> float:
+        return float(self.ends.max()) if len(self) else 0.0
+
+    def to_words(self) -> List[Dict]:
+        return list(self._words)
+
+    def per_second(self, total_seconds: int | None = None) -> np.ndarray:
+        """Word starts per whole second; out-of-range starts clamp to the first/last bucket."""
+        seconds = np.floor(self.starts).astype(np.int64)
+        if total_seconds is None:
+            total_seconds = int(seconds.max()) + 1 if len(self) else 0
+        total_seconds = max(1, total_seconds)
+        return np.bincount(np.clip(seconds, 0, total_seconds - 1), minlength=total_seconds)
+
+    def max_per_second(self) -> float:
+        return float(self.per_second().max()) if len(self) else 0.0
+
+    def density(self, window_seconds: int, total_seconds: int | None = None) -> np.ndarray:
+        """Words started in each sliding window of window_seconds, one value per start second."""
+        counts = self.per_second(total_seconds)
+        window = max(1, min(window_seconds, len(counts)))
+        cumulative = np.concatenate(([0], np.cumsum(counts)))
+        return cumulative[window:] - cumulative[:-window]
+
+    def short_ratio(self, min_duration: float) -> float:
+        """Fraction of words shown for less than min_duration seconds."""
+        if not len(self):
+            return 0.0
+        durations = np.maximum(0.0, self.ends - self.starts)
+        return float(np.count_nonzero(durations < min_duration)) / len(self)
+
+    def compress(self, max_wps: float) -> "WordTimeline":
+        """Thin every over-dense second to at most max_wps words by keeping every n-th word."""
+        if not len(self):
+            return self
+        total_seconds = max(1, int(np.ceil(self.duration)))
+        counts = self.per_second(total_seconds)
+        if counts.max() <= max_wps:
+            return self
+        seconds = np.clip(np.floor(self.starts).astype(np.int64), 0, total_seconds - 1)
+        order = np.argsort(seconds, kind="stable")
+        bucket_of = seconds[order]
+        bucket_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rank = np.arange(len(order)) - bucket_start[bucket_of]
+        bucket_counts = counts[bucket_of]
+        stride = np.where(bucket_counts > max_wps, np.maximum(1, np.ceil(bucket_counts / max_wps)), 1)
+        kept = order[rank % stride.astype(np.int64) == 0]
+        kept = kept[np.argsort(self.starts[kept], kind="stable")]
+        return WordTimeline([self._words[idx] for idx in kept])
+
+
+def load_timeline(transcript_path: Path) -> WordTimeline:
+    """Load transcript.json once per file version; missing or unreadable files give an empty timeline."""
+    path = Path(transcript_path)
+    try:
+        key = (str(path.resolve()), path.stat().st_mtime_ns)
+    except OSError:
+        return WordTimeline([])
+    with _CACHE_LOCK:
+        timeline = _CACHE.get(key)
+        if timeline is not None:
+            _CACHE.move_to_end(key)
+            return timeline
+    try:
+        words = json.loads(path.read_text(encoding="utf-8")).get("words", [])
+    except Exception:
+        words = []
+    timeline = WordTimeline(words)
+    with _CACHE_LOCK:
+        _CACHE[key] = timeline
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return timeline